@@ -46,11 +46,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'app.orcamento_consultas.OrcamentoConsultasMiddleware',
     'django_htmx.middleware.HtmxMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'app.autorizacao.PapelMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -67,6 +69,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'app.autorizacao.contexto_papel',
             ],
         },
     },
@@ -78,13 +81,44 @@ WSGI_APPLICATION = 'Projeto_Inventario.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Conexões persistentes (CONN_MAX_AGE, em segundos) evitam
+# reabrir o arquivo e reaplicar os PRAGMAs a cada requisição.
+# transaction_mode IMMEDIATE: transações reservam a escrita ao
+# começar, em vez de falhar com "database is locked" ao tentar
+# promover uma leitura a escrita enquanto outra conexão escreve.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# ==========================================================
+# Ajustes do SQLite aplicados a cada nova conexão
+# ----------------------------------------------------------
+# (app/banco.py, sinal connection_created)
+# - journal_mode WAL: leituras não esperam pelas escritas
+# - busy_timeout: espera (ms) pela trava antes de desistir
+# - synchronous NORMAL: seguro com WAL, menos fsync por commit
+# - mmap_size / cache_size: leitura mapeada em memória e cache
+#   de páginas (negativo = KiB)
+# - temp_store MEMORY: ordenações e tabelas temporárias em RAM
+# Um dicionário vazio desativa os ajustes.
+# ==========================================================
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "busy_timeout": 5000,
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64000,
+    "temp_store": "MEMORY",
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -136,6 +170,88 @@ STATICFILES_DIRS = [
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# ==========================================================
+# Importação de planilhas
+# ----------------------------------------------------------
+# As importações rodam em segundo plano (app/tarefas.py).
+# True executa a importação dentro da própria requisição,
+# útil em testes e depuração.
+# ==========================================================
+IMPORTACAO_SINCRONA = False
+
+# ==========================================================
+# Paginação da lista de patrimônios
+# ----------------------------------------------------------
+# "cursor": paginação por keyset, sem COUNT(*) nem OFFSET
+#           (recomendada para tabelas grandes)
+# "offset": Paginator tradicional, com números de página
+# ==========================================================
+PATRIMONIO_PAGINACAO = "cursor"
+PATRIMONIO_ITENS_POR_PAGINA = 6
+
+# ==========================================================
+# Orçamento de consultas SQL por requisição
+# ----------------------------------------------------------
+# Requisições que excedem o orçamento são registradas no log
+# "app.orcamento_consultas" (app/orcamento_consultas.py).
+# Chave: nome da rota; demais rotas usam o valor padrão.
+# ==========================================================
+ORCAMENTO_CONSULTAS_PADRAO = 15
+ORCAMENTO_CONSULTAS = {}
+
+# ==========================================================
+# Cache
+# ----------------------------------------------------------
+# Memória local do processo. Papéis e fragmentos usam chaves
+# com a versão dos dados (VersaoTabela, SQLite) e continuam
+# corretos com vários processos; fora do SQLite, ou para
+# compartilhar as entradas entre processos/servidores, usar
+# um backend compartilhado (Redis, Memcached).
+# ==========================================================
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "inventario",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    }
+}
+
+# Tempo (segundos) de vida dos fragmentos HTML em cache. As
+# chaves incluem a versão dos dados (app/cache_fragmentos.py),
+# então o prazo só limita a memória ocupada por versões antigas.
+FRAGMENTOS_CACHE_SEGUNDOS = 600
+
+# ==========================================================
+# Papel do usuário (app/autorizacao.py)
+# ----------------------------------------------------------
+# Tempo (segundos) que o papel resolvido fica no cache.
+# Alterações em inventariante, usuário ou grupos mudam a
+# versão "papel" da chave antes disso. Sem versão (fora do
+# SQLite), apenas os sinais invalidam a entrada, no cache do
+# próprio processo: exige um backend compartilhado em CACHES.
+# ==========================================================
+PAPEL_CACHE_SEGUNDOS = 300
+
+# ==========================================================
+# Log de registros (registros.xlsx)
+# ----------------------------------------------------------
+# Quantidade de linhas pendentes no log que dispara uma
+# compactação em segundo plano. Também é possível compactar
+# sob demanda: python manage.py compactar_planilha
+# ==========================================================
+PLANILHA_COMPACTAR_A_CADA = 100
+
+# ==========================================================
+# Exclusão de patrimônios em blocos (app/exclusao.py)
+# ----------------------------------------------------------
+# Excluir a planilha ou desfazer uma importação remove os
+# registros em blocos, cada um na sua transação, com uma pausa
+# entre eles para que escritas de outros usuários não fiquem
+# esperando a exclusão inteira.
+# ==========================================================
+EXCLUSAO_BLOCO = 2000
+EXCLUSAO_PAUSA_SEGUNDOS = 0.02
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
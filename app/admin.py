@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Inventariante, Patrimonio
+from .models import Campanha, Inventariante, Patrimonio, ImportacaoPlanilha
 
 # ==========================================================
 # REGISTRO DE INVENTARIANTE NO ADMIN
@@ -26,3 +26,29 @@ class PatrimonioAdmin(admin.ModelAdmin):
     list_display = ["tombo", "descricao", "setor", "situacao", "inventariante"]
     search_fields = ["tombo", "descricao", "setor", "inventariante__user__username"]
     list_filter = ["situacao", "setor", "conta_contabil"]
+
+
+
+# ==========================================================
+# REGISTRO DE IMPORTAÇÕES DE PLANILHA NO ADMIN
+# ----------------------------------------------------------
+# Permite acompanhar o histórico das tarefas de importação.
+# ==========================================================
+@admin.register(ImportacaoPlanilha)
+class ImportacaoPlanilhaAdmin(admin.ModelAdmin):
+    """Administração do modelo ImportacaoPlanilha."""
+    list_display = ["id", "nome_original", "status", "inseridos", "rejeitados", "data_criacao"]
+    list_filter = ["status"]
+
+
+# ==========================================================
+# REGISTRO DE CAMPANHAS NO ADMIN
+# ----------------------------------------------------------
+# Consulta das campanhas anuais. Abertura e encerramento são
+# feitos pelos comandos abrir_campanha e encerrar_campanha.
+# ==========================================================
+@admin.register(Campanha)
+class CampanhaAdmin(admin.ModelAdmin):
+    """Administração do modelo Campanha."""
+    list_display = ["ano", "data_abertura", "data_encerramento", "arquivados"]
+    readonly_fields = ["data_encerramento", "arquivados"]
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class AppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        # Registra os sinais de invalidação do papel em cache
+        from . import autorizacao  # noqa: F401
+
+        # Registra os ajustes (PRAGMAs) das conexões SQLite
+        from . import banco  # noqa: F401
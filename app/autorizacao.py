@@ -0,0 +1,153 @@
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import SimpleLazyObject
+
+from .models import Inventariante
+from .versoes import carimbo
+
+
+# ==========================================================
+# CAMADA ÚNICA DE AUTORIZAÇÃO
+# ----------------------------------------------------------
+# O papel do usuário é resolvido uma vez e guardado no cache
+# (chave "papel:<versão dos papéis>:<id do usuário>"),
+# evitando consultar inventariante e grupos a cada
+# verificação.
+#
+# A versão "papel" de VersaoTabela (migração 0018) muda a
+# cada escrita em inventariante, superusuário ou grupos, por
+# qualquer processo e inclusive em lote (update() sem
+# sinais): as entradas antigas deixam de ser lidas, mesmo com
+# cache local em cada processo. Ler a versão custa uma
+# consulta simples por papel resolvido.
+#
+# Papéis:
+# - superusuario: acesso total
+# - presidente: Inventariante.presidente=True ou membro do
+#   grupo "Presidente"; acesso total
+# - inventariante: acesso apenas aos próprios patrimônios
+# - usuario: autenticado, sem inventariante vinculado
+#
+# - PapelMiddleware: disponibiliza request.papel
+# - contexto_papel: disponibiliza {{ papel }} nos templates
+# - Sinais invalidam o cache quando mudam o inventariante,
+#   o usuário ou os grupos do usuário; fora do SQLite (sem
+#   versão) são a única invalidação, e o cache precisa ser
+#   compartilhado entre os processos (settings.CACHES)
+# ==========================================================
+
+GRUPO_PRESIDENTE = "Presidente"
+
+
+@dataclass(frozen=True)
+class Papel:
+    nome: str
+    inventariante_id: int | None = None
+
+    @property
+    def is_admin(self):
+        """Superusuário ou presidente: enxerga e administra tudo."""
+        return self.nome in ("superusuario", "presidente")
+
+    @property
+    def escopo(self):
+        return "todos" if self.is_admin else "proprio"
+
+
+ANONIMO = Papel("anonimo")
+
+
+def chave_papel(user_id, versao=None):
+    if versao is None:
+        return f"papel:{user_id}"
+    return f"papel:{versao}:{user_id}"
+
+
+def resolver_papel(user):
+    """Calcula o papel consultando o banco (sem cache)."""
+    if not user.is_authenticated:
+        return ANONIMO
+
+    inventariante = Inventariante.objects.filter(user_id=user.pk).values_list("id", "presidente").first()
+    inventariante_id, presidente = inventariante or (None, False)
+
+    if user.is_superuser:
+        nome = "superusuario"
+    elif presidente or user.groups.filter(name=GRUPO_PRESIDENTE).exists():
+        nome = "presidente"
+    elif inventariante_id is not None:
+        nome = "inventariante"
+    else:
+        nome = "usuario"
+    return Papel(nome, inventariante_id)
+
+
+def papel_do_usuario(user):
+    """Papel do usuário, lido do cache quando disponível."""
+    if not user.is_authenticated:
+        return ANONIMO
+
+    versao, _atualizado_em = carimbo("papel")
+    chave = chave_papel(user.pk, versao)
+    papel = cache.get(chave)
+    if papel is None:
+        papel = resolver_papel(user)
+        cache.set(chave, papel, settings.PAPEL_CACHE_SEGUNDOS)
+    return papel
+
+
+def invalidar_papel(user_id):
+    # Chave sem versão; com versão, a troca de versão já invalida.
+    cache.delete(chave_papel(user_id))
+
+
+class PapelMiddleware:
+    """Define request.papel (resolvido sob demanda, uma vez por requisição)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.papel = SimpleLazyObject(lambda: papel_do_usuario(request.user))
+        return self.get_response(request)
+
+
+def contexto_papel(request):
+    """Context processor: {{ papel }} nos templates."""
+    return {"papel": getattr(request, "papel", ANONIMO)}
+
+
+# ----------------------------------------------------------
+# Invalidação do cache
+# ----------------------------------------------------------
+@receiver([post_save, post_delete], sender=Inventariante)
+def inventariante_alterado(sender, instance, **kwargs):
+    invalidar_papel(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def usuario_alterado(sender, instance, **kwargs):
+    invalidar_papel(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def grupos_alterados(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # user.groups.add/remove/clear
+        if action.startswith("post_"):
+            invalidar_papel(instance.pk)
+    elif action == "pre_clear":
+        # group.user_set.clear() não informa os usuários afetados
+        instance._usuarios_papel = list(instance.user_set.values_list("pk", flat=True))
+    elif action == "post_clear":
+        for user_id in getattr(instance, "_usuarios_papel", []):
+            invalidar_papel(user_id)
+    elif action.startswith("post_"):
+        # group.user_set.add/remove
+        for user_id in pk_set or ():
+            invalidar_papel(user_id)
@@ -0,0 +1,50 @@
+import re
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+# ==========================================================
+# CONFIGURAÇÃO DAS CONEXÕES SQLITE
+# ----------------------------------------------------------
+# Aplica settings.SQLITE_PRAGMAS a cada conexão aberta com o
+# SQLite (WAL, busy_timeout, synchronous, mmap, cache...).
+#
+# Os PRAGMAs são executados direto na conexão do driver, fora
+# dos wrappers do Django: não entram no orçamento de consultas
+# da requisição que abriu a conexão.
+#
+# Com CONN_MAX_AGE as conexões são reaproveitadas e o custo se
+# limita à primeira requisição de cada thread.
+# ==========================================================
+
+_VALOR_PRAGMA = re.compile(r"-?\w+")
+
+
+def pragmas_configurados():
+    """PRAGMAs válidos de settings.SQLITE_PRAGMAS, como [(nome, valor)]."""
+    pragmas = []
+    for nome, valor in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+        if not nome.isidentifier() or not _VALOR_PRAGMA.fullmatch(str(valor)):
+            raise ValueError(f"PRAGMA inválido em SQLITE_PRAGMAS: {nome}={valor!r}")
+        pragmas.append((nome, valor))
+    return pragmas
+
+
+def aplicar_pragmas(conexao, pragmas):
+    """Executa os PRAGMAs na conexão sqlite3 (não a do Django)."""
+    for nome, valor in pragmas:
+        conexao.execute(f"PRAGMA {nome} = {valor}")
+
+
+def ler_pragmas(conexao, nomes):
+    """{nome: valor atual} dos PRAGMAs informados."""
+    return {nome: conexao.execute(f"PRAGMA {nome}").fetchone()[0] for nome in nomes}
+
+
+@receiver(connection_created)
+def configurar_sqlite(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    aplicar_pragmas(connection.connection, pragmas_configurados())
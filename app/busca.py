@@ -0,0 +1,159 @@
+import re
+
+from django.db import connection
+from django.db.models import Case, FloatField, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from .models import Patrimonio
+from .validacao import TOMBO_MAXIMO
+
+
+# ==========================================================
+# BUSCA DE PATRIMÔNIOS
+# ----------------------------------------------------------
+# No SQLite a busca textual consulta o índice FTS5
+# app_patrimonio_fts (criado na migração 0009 e mantido por
+# triggers), em vez de um icontains sobre sete colunas, que
+# obriga a varrer a tabela inteira a cada tecla digitada.
+#
+# - Cada palavra digitada vira um termo com prefixo ("cad"*),
+#   combinados com AND
+# - Acentos são ignorados pelo tokenizador (remove_diacritics)
+# - Os resultados trazem a anotação "relevancia" (rank BM25
+#   do FTS5; menor = mais relevante)
+# - A tabela FTS5 entra na consulta uma única vez, junto de
+#   app_patrimonio (rowid = id): o MATCH e o rank são
+#   calculados numa só passada, também no filtro do cursor
+#   sobre "relevancia". Uma subconsulta correlacionada
+#   refaria o MATCH para cada linha encontrada
+#
+# A junção usa QuerySet.extra(tables=...), que o UPDATE do
+# Django ignora: para atualizar os resultados de uma busca,
+# filtre por pk__in=resultado.values("pk").
+#
+# Buscas só com dígitos seguem outro caminho: o tombo é
+# procurado por faixas no índice único (12345, 123450–123459,
+# 1234500–1234599, ...), sem converter a coluna em texto, e o
+# acerto exato aparece primeiro. As demais colunas continuam
+# sendo consultadas pelo índice de texto.
+#
+# Sem FTS5 disponível (outro banco ou SQLite compilado sem o
+# módulo), a busca volta ao filtro icontains original.
+# ==========================================================
+
+TABELA_FTS = "app_patrimonio_fts"
+
+# Colunas textuais do índice (o tombo é buscado por faixa).
+CAMPOS_TEXTO = [
+    "descricao", "setor", "dependencia",
+    "fornecedor", "numero_documento", "conta_contabil",
+]
+
+NUMERICO = re.compile(r"\d+", re.ASCII)
+
+_fts_disponivel = {}
+
+
+def fts_disponivel():
+    """Indica se o índice FTS5 existe no banco atual (resultado memorizado)."""
+    chave = connection.settings_dict["NAME"]
+    if chave not in _fts_disponivel:
+        _fts_disponivel[chave] = (
+            connection.vendor == "sqlite"
+            and TABELA_FTS in connection.introspection.table_names()
+        )
+    return _fts_disponivel[chave]
+
+
+def expressao_fts(termo, colunas=None):
+    """
+    Converte o texto digitado numa expressão MATCH do FTS5,
+    opcionalmente restrita a algumas colunas.
+    Retorna None quando não há palavras pesquisáveis.
+    """
+    palavras = re.findall(r"\w+", termo)
+    if not palavras:
+        return None
+    expressao = " ".join('"{}"*'.format(palavra.replace('"', '""')) for palavra in palavras)
+    if colunas:
+        expressao = "{%s} : (%s)" % (" ".join(colunas), expressao)
+    return expressao
+
+
+def filtro_icontains(termo):
+    filtro = Q()
+    for campo in CAMPOS_TEXTO:
+        filtro |= Q(**{f"{campo}__icontains": termo})
+    return filtro
+
+
+def filtro_fts(expressao):
+    return Q(id__in=RawSQL(
+        f"SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s",
+        [expressao],
+    ))
+
+
+def intervalos_tombo(digitos):
+    """
+    Faixas de tombos cuja representação decimal começa com os
+    dígitos informados: 123 → (123, 123), (1230, 1239), (12300, 12399)...
+    """
+    if digitos.startswith("0"):
+        return []
+
+    numero = int(digitos)
+    intervalos = []
+    escala = 1
+    while numero * escala <= TOMBO_MAXIMO:
+        intervalos.append((numero * escala, min((numero + 1) * escala - 1, TOMBO_MAXIMO)))
+        escala *= 10
+    return intervalos
+
+
+def buscar_por_tombo(queryset, digitos):
+    """Busca numérica: faixas de tombo OU demais colunas, acerto exato primeiro."""
+    filtro = Q()
+    for inicio, fim in intervalos_tombo(digitos):
+        filtro |= Q(tombo__range=(inicio, fim))
+
+    if fts_disponivel():
+        filtro |= filtro_fts(expressao_fts(digitos, colunas=CAMPOS_TEXTO))
+    else:
+        filtro |= filtro_icontains(digitos)
+
+    return queryset.filter(filtro).annotate(
+        exato=Case(
+            When(tombo=int(digitos), then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    ).order_by("exato", "tombo", "id")
+
+
+def buscar_patrimonios(queryset, termo):
+    """Filtra o queryset pelo termo e o ordena por relevância quando há FTS5."""
+    termo = termo.strip()
+    if NUMERICO.fullmatch(termo):
+        return buscar_por_tombo(queryset, termo)
+
+    if not fts_disponivel():
+        return queryset.filter(filtro_icontains(termo))
+
+    expressao = expressao_fts(termo)
+    if expressao is None:
+        return queryset.filter(filtro_icontains(termo))
+
+    return juntar_fts(queryset, expressao).order_by("relevancia", "id")
+
+
+def juntar_fts(queryset, expressao):
+    """Junta o índice FTS5 ao queryset (apenas as linhas encontradas), com a anotação "relevancia"."""
+    tabela = Patrimonio._meta.db_table
+    return queryset.extra(
+        tables=[TABELA_FTS],
+        where=[f"{TABELA_FTS} MATCH %s", f"{TABELA_FTS}.rowid = {tabela}.id"],
+        params=[expressao],
+    ).annotate(
+        relevancia=RawSQL(f"{TABELA_FTS}.rank", [], output_field=FloatField()),
+    )
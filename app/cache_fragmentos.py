@@ -0,0 +1,84 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+
+# ==========================================================
+# CACHE DE FRAGMENTOS HTML VERSIONADO
+# ----------------------------------------------------------
+# Guarda o HTML renderizado de um fragmento sob uma chave que
+# inclui o carimbo de versão dos dados (ver app/versoes.py).
+# Uma escrita muda o carimbo, e as requisições seguintes passam
+# a procurar outra chave: não há leitura de dado obsoleto nem
+# invalidação chave a chave. Entradas antigas expiram sozinhas
+# (settings.FRAGMENTOS_CACHE_SEGUNDOS).
+#
+# Acertos e faltas são contados por fragmento no próprio cache
+# (ver estatisticas_fragmentos e a view cache_fragmentos).
+#
+# Uso:
+#   html, acerto = fragmento_em_cache(
+#       "tabela_patrimonios", versao, (escopo, busca, cursor), renderizar
+#   )
+# ==========================================================
+
+FRAGMENTOS = ("tabela_patrimonios",)
+
+
+def chave_fragmento(nome, versao, partes):
+    resumo = hashlib.md5(json.dumps(partes, default=str).encode()).hexdigest()
+    return f"fragmento:{nome}:{versao}:{resumo}"
+
+
+def _contar(nome, evento):
+    chave = f"fragmento:{nome}:{evento}"
+    try:
+        cache.incr(chave)
+    except ValueError:
+        cache.add(chave, 0, timeout=None)
+        cache.incr(chave)
+
+
+def fragmento_em_cache(nome, versao, partes, renderizar):
+    """
+    Retorna (html, acerto). Sem versão (None), apenas renderiza
+    e acerto é None.
+    """
+    if versao is None:
+        return renderizar(), None
+
+    chave = chave_fragmento(nome, versao, partes)
+    html = cache.get(chave)
+    if html is not None:
+        _contar(nome, "acertos")
+        return mark_safe(html), True
+
+    html = renderizar()
+    cache.set(chave, str(html), settings.FRAGMENTOS_CACHE_SEGUNDOS)
+    _contar(nome, "faltas")
+    return html, False
+
+
+def estatisticas_fragmentos():
+    """{fragmento: {"acertos", "faltas", "taxa_acerto"}} para ajuste do cache."""
+    estatisticas = {}
+    for nome in FRAGMENTOS:
+        contagens = cache.get_many([f"fragmento:{nome}:acertos", f"fragmento:{nome}:faltas"])
+        acertos = contagens.get(f"fragmento:{nome}:acertos", 0)
+        faltas = contagens.get(f"fragmento:{nome}:faltas", 0)
+        total = acertos + faltas
+        estatisticas[nome] = {
+            "acertos": acertos,
+            "faltas": faltas,
+            "taxa_acerto": round(acertos / total, 3) if total else None,
+        }
+    return estatisticas
+
+
+def zerar_estatisticas():
+    cache.delete_many(
+        [f"fragmento:{nome}:{evento}" for nome in FRAGMENTOS for evento in ("acertos", "faltas")]
+    )
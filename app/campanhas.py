@@ -0,0 +1,135 @@
+from dataclasses import dataclass, field
+
+from django.db import connection, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .models import Campanha, Patrimonio, ResultadoCampanha
+
+
+# ==========================================================
+# CAMPANHAS ANUAIS DE INVENTÁRIO
+# ----------------------------------------------------------
+# A tabela de patrimônios guarda apenas a campanha aberta
+# (situação e data de inventário do ano corrente). Ao encerrar
+# a campanha:
+#
+# 1. Os resultados por tombo são copiados para o arquivo
+#    (ResultadoCampanha) com um único INSERT ... SELECT
+# 2. A situação dos patrimônios volta a "nao_localizado" e a
+#    data de inventário é limpa, exceto perdas por calamidade,
+#    preparando a conferência do ano seguinte
+#
+# O arquivo é particionado por campanha: o índice único
+# (campanha, tombo) mantém os resultados de cada ano contíguos
+# e permite comparar duas campanhas tombo a tombo pelo índice.
+# ==========================================================
+
+COLUNAS_ARQUIVADAS = ["tombo", "situacao", "data_inventario", "setor", "valor", "inventariante_id"]
+
+
+def campanha_aberta():
+    return Campanha.objects.filter(data_encerramento__isnull=True).first()
+
+
+def abrir_campanha(ano):
+    """Cria a campanha do ano; falha se outra estiver aberta ou o ano já existir."""
+    aberta = campanha_aberta()
+    if aberta:
+        raise ValueError(f"A campanha {aberta.ano} ainda está aberta.")
+    if Campanha.objects.filter(ano=ano).exists():
+        raise ValueError(f"Já existe campanha para {ano}.")
+    return Campanha.objects.create(ano=ano)
+
+
+def encerrar_campanha(reiniciar=True):
+    """
+    Arquiva os resultados da campanha aberta e a encerra. Com
+    reiniciar=False, a situação dos patrimônios é mantida.
+    """
+    with transaction.atomic():
+        campanha = campanha_aberta()
+        if campanha is None:
+            raise ValueError("Nenhuma campanha aberta.")
+
+        colunas = ", ".join(COLUNAS_ARQUIVADAS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {ResultadoCampanha._meta.db_table} (campanha_id, {colunas}) "
+                f"SELECT %s, {colunas} FROM {Patrimonio._meta.db_table} WHERE tombo IS NOT NULL",
+                [campanha.pk],
+            )
+            campanha.arquivados = cursor.rowcount
+
+        campanha.data_encerramento = timezone.now()
+        campanha.save(update_fields=["data_encerramento", "arquivados"])
+
+        if reiniciar:
+            Patrimonio.objects.exclude(situacao="calamidade").update(
+                situacao="nao_localizado", data_inventario=None
+            )
+
+    return campanha
+
+
+# ==========================================================
+# COMPARAÇÃO ENTRE CAMPANHAS
+# ----------------------------------------------------------
+# Parte dos resultados arquivados da campanha anterior e busca
+# a situação do mesmo tombo na outra campanha (arquivada, ou a
+# tabela de patrimônios se estiver aberta), sempre por índice:
+#
+# - perdidos: localizados antes, não localizados/perdidos agora
+# - encontrados: não localizados antes, localizados agora
+#
+# Cada lista contém (tombo, setor, situação anterior, atual),
+# em ordem de tombo.
+#
+# A campanha aberta só é comparada depois do primeiro check-in:
+# logo após a abertura, a situação de todos os patrimônios foi
+# reiniciada pelo encerramento anterior e cada item localizado
+# antes apareceria como perdido.
+# ==========================================================
+@dataclass
+class ComparacaoCampanhas:
+    perdidos: list = field(default_factory=list)
+    encontrados: list = field(default_factory=list)
+
+
+def _situacoes(campanha):
+    if campanha.aberta:
+        return Patrimonio.objects.all()
+    return ResultadoCampanha.objects.filter(campanha=campanha)
+
+
+def comparar_campanhas(anterior, atual=None):
+    """Compara a campanha encerrada `anterior` com `atual` (padrão: a aberta)."""
+    if anterior.aberta:
+        raise ValueError(f"A campanha {anterior.ano} ainda não foi encerrada.")
+    if atual is None:
+        atual = campanha_aberta()
+        if atual is None:
+            raise ValueError("Nenhuma campanha aberta.")
+    if atual.aberta and not Patrimonio.objects.filter(situacao="localizado").exists():
+        raise ValueError(f"A campanha {atual.ano} ainda não tem check-ins.")
+
+    linhas = (
+        ResultadoCampanha.objects
+        .filter(campanha=anterior)
+        .annotate(situacao_atual=Subquery(
+            _situacoes(atual).filter(tombo=OuterRef("tombo")).values("situacao")[:1]
+        ))
+        .order_by("tombo")
+    )
+    colunas = ("tombo", "setor", "situacao", "situacao_atual")
+
+    return ComparacaoCampanhas(
+        perdidos=list(
+            linhas.filter(situacao="localizado", situacao_atual__in=["nao_localizado", "calamidade"])
+            .values_list(*colunas)
+        ),
+        encontrados=list(
+            linhas.exclude(situacao="localizado").filter(situacao_atual="localizado")
+            .values_list(*colunas)
+        ),
+    )
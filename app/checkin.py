@@ -0,0 +1,95 @@
+import re
+from dataclasses import dataclass, field
+
+from django.utils import timezone
+
+from .models import Patrimonio
+from .validacao import TOMBO_MAXIMO
+
+
+# ==========================================================
+# CONFERÊNCIA POR LEITOR DE CÓDIGO DE BARRAS (CHECK-IN)
+# ----------------------------------------------------------
+# Recebe lotes de tombos lidos no inventário físico e marca
+# os encontrados como "localizado" com a data do inventário.
+#
+# Cada lote custa duas consultas, qualquer que seja o tamanho:
+# - SELECT pelos tombos (índice único de tombo)
+# - UPDATE único dos patrimônios a marcar
+#
+# Classificação de cada tombo lido:
+# - conferidos: marcados agora
+# - ja_conferidos: já localizados na data (ou repetidos no lote)
+# - desconhecidos: tombo não cadastrado
+# - fora_do_escopo: pertence a outro inventariante
+# - invalidos: leitura que não é um tombo
+# ==========================================================
+
+LOTE_MAXIMO = 500
+
+SEPARADORES = re.compile(r"[\s,;]+")
+
+
+@dataclass
+class ResultadoCheckin:
+    conferidos: list = field(default_factory=list)
+    ja_conferidos: list = field(default_factory=list)
+    desconhecidos: list = field(default_factory=list)
+    fora_do_escopo: list = field(default_factory=list)
+    invalidos: list = field(default_factory=list)
+
+    @property
+    def total(self):
+        return sum(map(len, (
+            self.conferidos, self.ja_conferidos, self.desconhecidos, self.fora_do_escopo, self.invalidos
+        )))
+
+
+def separar_leituras(texto):
+    """Divide o texto recebido (uma leitura por linha, espaço, vírgula ou ';')."""
+    return [leitura for leitura in SEPARADORES.split(texto or "") if leitura]
+
+
+def conferir_tombos(leituras, inventariante_id=None, data=None):
+    """
+    Marca como localizados os tombos lidos. Com inventariante_id,
+    apenas os patrimônios desse inventariante são alterados.
+    """
+    data = data or timezone.localdate()
+    resultado = ResultadoCheckin()
+
+    tombos = []
+    for leitura in leituras:
+        if leitura.isdigit() and 0 < int(leitura) <= TOMBO_MAXIMO:
+            tombos.append(int(leitura))
+        else:
+            resultado.invalidos.append(leitura)
+
+    encontrados = {
+        tombo: (pk, situacao, data_inventario, dono)
+        for pk, tombo, situacao, data_inventario, dono in Patrimonio.objects
+        .filter(tombo__in=set(tombos))
+        .values_list("pk", "tombo", "situacao", "data_inventario", "inventariante_id")
+    } if tombos else {}
+
+    marcar = []
+    vistos = set()
+    for tombo in tombos:
+        if tombo not in encontrados:
+            resultado.desconhecidos.append(tombo)
+            continue
+
+        pk, situacao, data_inventario, dono = encontrados[tombo]
+        if inventariante_id is not None and dono != inventariante_id:
+            resultado.fora_do_escopo.append(tombo)
+        elif tombo in vistos or (situacao == "localizado" and data_inventario == data):
+            resultado.ja_conferidos.append(tombo)
+        else:
+            marcar.append(pk)
+            resultado.conferidos.append(tombo)
+        vistos.add(tombo)
+
+    if marcar:
+        Patrimonio.objects.filter(pk__in=marcar).update(situacao="localizado", data_inventario=data)
+
+    return resultado
@@ -0,0 +1,127 @@
+import csv
+from dataclasses import dataclass, asdict
+from decimal import Decimal
+
+from .importacao import TAMANHO_LOTE_PADRAO, dividir_em_lotes, ler_linhas
+from .models import Patrimonio
+from .validacao import ValidadorPlanilha
+
+
+# ==========================================================
+# CONCILIAÇÃO ENTRE PLANILHA OFICIAL E SISTEMA
+# ----------------------------------------------------------
+# Compara a planilha enviada (mesmo leitor e validação da
+# importação) com os patrimônios cadastrados, sem gravar nada:
+#
+# - somente_planilha: tombo na planilha, ausente no sistema
+# - somente_sistema: tombo no sistema, ausente da planilha
+# - divergentes: tombo nos dois lados com setor ou valor
+#   diferentes
+#
+# Uma passada em cada lado:
+# 1. Planilha lida em lotes, guardando apenas
+#    {tombo: (setor, valor)} num dicionário
+# 2. Patrimônios percorridos em ordem de tombo com iterator();
+#    cada tombo encontrado sai do dicionário, e o que sobra ao
+#    final existe somente na planilha
+#
+# As diferenças são gravadas em CSV (";", UTF-8 com BOM) à
+# medida que aparecem, ordenadas por tombo em cada grupo.
+# ==========================================================
+
+CABECALHO_DIFERENCAS = [
+    "tombo", "diferenca", "setor_planilha", "setor_sistema", "valor_planilha", "valor_sistema",
+]
+
+CENTAVOS = Decimal("0.01")
+
+
+@dataclass
+class ResumoConciliacao:
+    """Contadores devolvidos ao final de uma conciliação."""
+
+    linhas_processadas: int = 0
+    ignorados: int = 0
+    rejeitados: int = 0
+    somente_planilha: int = 0
+    somente_sistema: int = 0
+    divergentes: int = 0
+
+    def como_dict(self):
+        return asdict(self)
+
+
+def _normalizar(setor, valor):
+    """Setor sem espaços nas bordas ('' se vazio) e valor em centavos."""
+    return (setor or "").strip(), (None if valor is None else Decimal(valor).quantize(CENTAVOS))
+
+
+def _formatar_valor(valor):
+    return "" if valor is None else str(valor).replace(".", ",")
+
+
+def conciliar_planilha(arquivo, caminho_diferencas, tamanho_lote=TAMANHO_LOTE_PADRAO,
+                       progresso=None, relatorio=None):
+    """
+    Gera o CSV de diferenças em `caminho_diferencas` e devolve o
+    ResumoConciliacao. `relatorio` e `progresso` funcionam como em
+    importar_planilha (linhas rejeitadas ficam fora da comparação).
+    """
+    validador = ValidadorPlanilha()
+    resumo = ResumoConciliacao()
+
+    # ------------------------------------------------------
+    # 1. Planilha: {tombo: (setor, valor)}
+    # ------------------------------------------------------
+    planilha = {}
+    for lote in dividir_em_lotes(validador.linhas_de_dados(ler_linhas(arquivo)), tamanho_lote):
+        resultado = validador.validar_lote(lote)
+        resumo.linhas_processadas += len(lote)
+        resumo.ignorados += resultado.ignorados
+        resumo.rejeitados += resultado.rejeitados
+
+        for _numero, dados in resultado.registros:
+            planilha[dados["tombo"]] = _normalizar(dados["setor"], dados["valor"])
+
+        if relatorio:
+            relatorio.registrar(resultado.erros)
+        if progresso:
+            progresso(resumo)
+
+    # ------------------------------------------------------
+    # 2. Sistema, em ordem de tombo, consumindo o dicionário
+    # ------------------------------------------------------
+    with open(caminho_diferencas, "w", newline="", encoding="utf-8-sig") as saida:
+        writer = csv.writer(saida, delimiter=";")
+        writer.writerow(CABECALHO_DIFERENCAS)
+
+        sistema = (
+            Patrimonio.objects
+            .filter(tombo__isnull=False)
+            .order_by("tombo")
+            .values_list("tombo", "setor", "valor")
+            .iterator(chunk_size=2000)
+        )
+        for tombo, setor, valor in sistema:
+            setor, valor = _normalizar(setor, valor)
+            na_planilha = planilha.pop(tombo, None)
+
+            if na_planilha is None:
+                resumo.somente_sistema += 1
+                writer.writerow([tombo, "somente_sistema", "", setor, "", _formatar_valor(valor)])
+            elif na_planilha != (setor, valor):
+                resumo.divergentes += 1
+                writer.writerow([
+                    tombo, "divergente",
+                    na_planilha[0], setor,
+                    _formatar_valor(na_planilha[1]), _formatar_valor(valor),
+                ])
+
+        for tombo in sorted(planilha):
+            setor, valor = planilha[tombo]
+            resumo.somente_planilha += 1
+            writer.writerow([tombo, "somente_planilha", setor, "", _formatar_valor(valor), ""])
+
+    if progresso:
+        progresso(resumo)
+    return resumo
@@ -0,0 +1,64 @@
+import hashlib
+from functools import wraps
+
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from .versoes import carimbo_da_requisicao
+
+
+# ==========================================================
+# GET CONDICIONAL PARA LISTAGENS HTMX
+# ----------------------------------------------------------
+# As listagens são recarregadas a todo momento por gatilhos
+# HTMX (reload, reloadInventariantes, planilhaAtualizada).
+# Com ETag e Last-Modified derivados da versão das tabelas
+# (ver app/versoes.py), o navegador revalida com If-None-Match
+# e recebe 304 sem que a view consulte patrimônios ou renderize
+# o fragmento: custa sessão, usuário e uma leitura de versão.
+#
+# A ETag combina versão dos dados, usuário, papel e parâmetros
+# da requisição (fragmentos diferem por escopo e busca).
+#
+# Só vale para requisições HTMX: a página completa carrega o
+# token CSRF, que não deve ser reaproveitado de um cache.
+# ==========================================================
+
+
+def _validadores(request, tabelas):
+    if not request.headers.get("HX-Request"):
+        return None, None
+    versao, atualizado_em = carimbo_da_requisicao(request, *tabelas)
+    if versao is None:
+        return None, None
+
+    identidade = "|".join([
+        versao,
+        str(request.user.pk),
+        request.papel.nome,
+        request.headers.get("HX-Target", ""),
+        request.GET.urlencode(),
+    ])
+    return hashlib.md5(identidade.encode()).hexdigest(), atualizado_em
+
+
+def listagem_condicional(*tabelas):
+    """Decorador: ETag/Last-Modified pelas versões das tabelas e 304 quando inalterado."""
+
+    def decorador(view_func):
+        condicional = condition(
+            etag_func=lambda request, *args, **kwargs: _validadores(request, tabelas)[0],
+            last_modified_func=lambda request, *args, **kwargs: _validadores(request, tabelas)[1],
+        )(view_func)
+
+        def wrapper(request, *args, **kwargs):
+            response = condicional(request, *args, **kwargs)
+            # Respostas diferem entre requisição HTMX e página completa,
+            # e entre usuários: revalidar sempre, cache só do navegador.
+            patch_vary_headers(response, ("HX-Request", "HX-Target"))
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        return wraps(view_func)(wrapper)
+
+    return decorador
@@ -0,0 +1,193 @@
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Patrimonio, ResumoInventario
+
+
+# ==========================================================
+# CONTADORES E RESUMO DO INVENTÁRIO
+# ----------------------------------------------------------
+# Leitura dos totais mantidos em ResumoInventario pelos
+# triggers da migração 0011: quantidade e valor por situação
+# no total e por setor, dependência e inventariante, em vez
+# de COUNT(*)/GROUP BY sobre app_patrimonio.
+#
+# Fora do SQLite (sem triggers), os totais são calculados
+# diretamente na tabela de patrimônios.
+#
+# reconciliar() compara o resumo com a agregação real e
+# corrige divergências (comando reconciliar_contadores).
+# ==========================================================
+
+# Campo de Patrimonio que origina cada dimensão (None = total).
+CAMPOS_DIMENSAO = {
+    "total": None,
+    "setor": "setor",
+    "dependencia": "dependencia",
+    "inventariante": "inventariante_id",
+}
+
+
+def contadores_disponiveis():
+    return connection.vendor == "sqlite"
+
+
+def _linhas_resumo(inventariante=None):
+    if inventariante is None:
+        return ResumoInventario.objects.filter(dimensao="total")
+    return ResumoInventario.objects.filter(dimensao="inventariante", inventariante=inventariante)
+
+
+def contar_patrimonios(inventariante=None, situacao=None):
+    """Total de patrimônios, opcionalmente de um inventariante e/ou situação."""
+    if not contadores_disponiveis():
+        patrimonios = Patrimonio.objects.all()
+        if inventariante is not None:
+            patrimonios = patrimonios.filter(inventariante=inventariante)
+        if situacao is not None:
+            patrimonios = patrimonios.filter(situacao=situacao)
+        return patrimonios.count()
+
+    linhas = _linhas_resumo(inventariante)
+    if situacao is not None:
+        linhas = linhas.filter(situacao=situacao)
+    return linhas.aggregate(total=Sum("quantidade"))["total"] or 0
+
+
+def totais_por_situacao(inventariante=None):
+    """Dicionário {situacao: total} com todas as situações (zeros inclusos)."""
+    totais = {situacao: 0 for situacao, _rotulo in Patrimonio.STATUS_CHOICES}
+
+    if contadores_disponiveis():
+        linhas = _linhas_resumo(inventariante).values_list("situacao", "quantidade")
+    else:
+        patrimonios = Patrimonio.objects.all()
+        if inventariante is not None:
+            patrimonios = patrimonios.filter(inventariante=inventariante)
+        linhas = patrimonios.values("situacao").annotate(n=Count("id")).values_list("situacao", "n")
+
+    for situacao, total in linhas:
+        totais[situacao] = total
+    return totais
+
+
+def agregar_dimensao(dimensao):
+    """
+    Agregação real (GROUP BY em app_patrimonio) de uma dimensão:
+    {(chave, situacao): (quantidade, valor)}.
+    """
+    campo = CAMPOS_DIMENSAO[dimensao]
+    agrupamento = ["situacao"] + ([campo] if campo else [])
+    resultado = {}
+    for linha in (
+        Patrimonio.objects.values(*agrupamento)
+        .annotate(quantidade=Count("id"), soma=Coalesce(Sum("valor"), Decimal("0")))
+        .order_by()
+    ):
+        chave = "" if campo is None or linha[campo] is None else str(linha[campo])
+        resultado[(chave, linha["situacao"])] = (linha["quantidade"], linha["soma"])
+    return resultado
+
+
+def reconciliar(corrigir=True):
+    """
+    Compara o resumo com a agregação real e, se corrigir=True,
+    regrava as linhas divergentes. Retorna a lista de divergências
+    como (dimensao, chave, situacao, quantidade registrada, quantidade real).
+    """
+    divergencias = []
+    with transaction.atomic():
+        for dimensao in CAMPOS_DIMENSAO:
+            reais = agregar_dimensao(dimensao)
+            registrados = {
+                (chave, situacao): (quantidade, valor)
+                for chave, situacao, quantidade, valor in ResumoInventario.objects
+                .filter(dimensao=dimensao)
+                .values_list("chave", "situacao", "quantidade", "valor")
+            }
+
+            for chave, situacao in sorted(reais.keys() | registrados.keys()):
+                quantidade, valor = registrados.get((chave, situacao), (0, Decimal("0")))
+                quantidade_real, valor_real = reais.get((chave, situacao), (0, Decimal("0")))
+                if quantidade == quantidade_real and round(valor, 2) == round(valor_real, 2):
+                    continue
+
+                divergencias.append((dimensao, chave, situacao, quantidade, quantidade_real))
+                if not corrigir:
+                    continue
+
+                if quantidade_real:
+                    ResumoInventario.objects.update_or_create(
+                        dimensao=dimensao,
+                        chave=chave,
+                        situacao=situacao,
+                        defaults={
+                            "quantidade": quantidade_real,
+                            "valor": valor_real,
+                            "inventariante_id": int(chave) if dimensao == "inventariante" else None,
+                        },
+                    )
+                else:
+                    ResumoInventario.objects.filter(
+                        dimensao=dimensao, chave=chave, situacao=situacao
+                    ).delete()
+
+    return divergencias
+
+
+def _resumo_agregado():
+    """Linhas equivalentes às do resumo, calculadas na hora (sem triggers)."""
+    for dimensao in CAMPOS_DIMENSAO:
+        for (chave, situacao), (quantidade, valor) in agregar_dimensao(dimensao).items():
+            yield ResumoInventario(
+                dimensao=dimensao,
+                chave=chave,
+                situacao=situacao,
+                quantidade=quantidade,
+                valor=valor,
+                inventariante_id=int(chave) if dimensao == "inventariante" else None,
+            )
+
+
+def montar_resumo():
+    """
+    Monta o resumo do painel a partir de ResumoInventario numa única
+    consulta: totais gerais e linhas por setor, dependência e inventariante.
+    """
+    situacoes = [situacao for situacao, _rotulo in Patrimonio.STATUS_CHOICES]
+
+    def novo_grupo(rotulo):
+        grupo = {"rotulo": rotulo, "quantidade": 0, "valor": Decimal("0")}
+        grupo.update({situacao: 0 for situacao in situacoes})
+        return grupo
+
+    if contadores_disponiveis():
+        linhas = ResumoInventario.objects.select_related("inventariante__user")
+    else:
+        linhas = _resumo_agregado()
+
+    grupos = {dimensao: {} for dimensao in CAMPOS_DIMENSAO}
+    for linha in linhas:
+        if linha.dimensao == "inventariante":
+            usuario = linha.inventariante.user if linha.inventariante else None
+            rotulo = (usuario.get_full_name() or usuario.username) if usuario else f"#{linha.chave}"
+        elif linha.dimensao == "total":
+            rotulo = "Total"
+        else:
+            rotulo = linha.chave or "(não informado)"
+
+        grupo = grupos[linha.dimensao].setdefault(linha.chave, novo_grupo(rotulo))
+        grupo[linha.situacao] += linha.quantidade
+        grupo["quantidade"] += linha.quantidade
+        grupo["valor"] += linha.valor
+
+    for dimensao in grupos:
+        for grupo in grupos[dimensao].values():
+            grupo["progresso"] = round(100 * grupo["localizado"] / grupo["quantidade"]) if grupo["quantidade"] else 0
+        grupos[dimensao] = sorted(grupos[dimensao].values(), key=lambda grupo: -grupo["quantidade"])
+
+    total = grupos.pop("total")
+    return {"total": total[0] if total else dict(novo_grupo("Total"), progresso=0), **grupos}
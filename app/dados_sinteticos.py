@@ -0,0 +1,230 @@
+import csv
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from openpyxl import Workbook
+
+from .importacao import calcular_hash
+
+
+# ==========================================================
+# DADOS SINTÉTICOS DE PATRIMÔNIO
+# ----------------------------------------------------------
+# Gera registros realistas e determinísticos (mesma semente,
+# mesmos dados) para reproduzir a escala de produção em
+# benchmarks e testes de carga:
+#
+# - Descrições em português combinando bem, complemento e cor
+# - Valor em faixa própria de cada tipo de bem
+# - Setores com distribuição assimétrica (poucos setores
+#   concentram a maior parte dos bens, como no campus)
+# - Datas de aquisição entre 2005 e 2024, ateste alguns dias
+#   depois
+#
+# gerar_inventariantes() cria os responsáveis (usuários
+# "sintetico0001", "sintetico0002"...);
+# gerar_registros() devolve os campos já nos tipos do modelo
+# (com hash_linha calculado como na importação);
+# gerar_linhas() devolve as mesmas linhas formatadas como na
+# planilha oficial, e escrever_arquivos() as grava em XLSX,
+# CSV, TSV e texto de largura fixa.
+# ==========================================================
+
+CABECALHO = [
+    "Tombo", "Descrição", "Valor (R$)", "Conta Contábil", "Setor", "Empenho",
+    "Fornecedor", "Número Documento", "Data Aquisição", "Data Ateste", "Dependência",
+]
+
+# Largura de cada coluna no arquivo de largura fixa.
+LARGURAS = [10, 60, 14, 16, 14, 12, 22, 18, 16, 14, 20]
+
+# (bem, complementos, faixa de valor, conta contábil)
+BENS = [
+    ("CADEIRA", ["GIRATÓRIA COM BRAÇOS", "FIXA EMPILHÁVEL", "TIPO SECRETÁRIA", "UNIVERSITÁRIA COM PRANCHETA"],
+     (120, 1800), "142120001"),
+    ("MESA", ["EM MDF 120X60", "DE REUNIÃO OVAL", "EM L COM GAVETEIRO", "PARA COMPUTADOR"],
+     (300, 2500), "142120001"),
+    ("ARMÁRIO", ["DE AÇO 2 PORTAS", "ALTO EM MDF", "BAIXO COM CHAVE", "VESTIÁRIO 8 PORTAS"],
+     (450, 3200), "142120001"),
+    ("ESTANTE", ["DE AÇO 6 PRATELEIRAS", "EM MDF PARA LIVROS", "DUPLA FACE"],
+     (250, 1500), "142120001"),
+    ("COMPUTADOR", ["DESKTOP CORE I5 8GB", "DESKTOP CORE I7 16GB", "ALL IN ONE 24 POLEGADAS"],
+     (2500, 9000), "142120005"),
+    ("NOTEBOOK", ["14 POLEGADAS 8GB", "15 POLEGADAS 16GB SSD"],
+     (3000, 8500), "142120005"),
+    ("MONITOR", ["LED 21,5 POLEGADAS", "LED 24 POLEGADAS", "IPS 27 POLEGADAS"],
+     (600, 2200), "142120005"),
+    ("IMPRESSORA", ["LASER MONOCROMÁTICA", "MULTIFUNCIONAL COLORIDA"],
+     (900, 6000), "142120005"),
+    ("PROJETOR", ["MULTIMÍDIA 3500 LUMENS", "MULTIMÍDIA FULL HD"],
+     (1800, 5500), "142120005"),
+    ("AR CONDICIONADO", ["SPLIT 12000 BTUS", "SPLIT 18000 BTUS", "SPLIT 24000 BTUS"],
+     (1500, 6500), "142120002"),
+    ("BEBEDOURO", ["DE COLUNA INOX", "DE PRESSÃO INDUSTRIAL"],
+     (500, 2800), "142120002"),
+    ("GELADEIRA", ["DUPLEX 400 LITROS", "FROST FREE 300 LITROS"],
+     (1800, 4500), "142120002"),
+    ("MICROSCÓPIO", ["BIOLÓGICO BINOCULAR", "ESTEREOSCÓPICO TRINOCULAR"],
+     (2500, 25000), "142120008"),
+    ("BALANÇA", ["ANALÍTICA DE PRECISÃO", "SEMIANALÍTICA DIGITAL"],
+     (1200, 12000), "142120008"),
+    ("QUADRO", ["BRANCO 300X120", "DE AVISOS EM CORTIÇA"],
+     (150, 900), "142120001"),
+]
+
+CORES = ["PRETA", "CINZA", "AZUL", "BRANCA", "BEGE", "MARROM"]
+
+SETORES = [
+    "BJL-DG", "BJL-DAP", "BJL-UTIC", "BJL-SB", "BJL-LAB", "BJL-DDE", "BJL-CGP", "BJL-CAE",
+    "BJL-BIB", "BJL-REG", "BJL-ALM", "BJL-PAT", "BJL-COAD", "BJL-CDA", "BJL-CPI", "BJL-NAPNE",
+    "BJL-LABQUIM", "BJL-LABFIS", "BJL-LABINF1", "BJL-LABINF2", "BJL-LABBIO", "BJL-AUD",
+    "BJL-REF", "BJL-GIN", "BJL-ENF", "BJL-PSI", "BJL-CCS", "BJL-CEX", "BJL-TRA", "BJL-SEG",
+]
+
+# Pesos ~ 1/posição: os primeiros setores concentram os bens.
+PESOS_SETORES = list(accumulate(1 / (posicao + 1) ** 1.1 for posicao in range(len(SETORES))))
+
+DEPENDENCIAS = [
+    "BLOCO A", "BLOCO B", "BLOCO C", "BLOCO D", "REITORIA", "BIBLIOTECA",
+    "GINÁSIO", "REFEITÓRIO", "LABORATÓRIOS", "ALMOXARIFADO",
+]
+
+FORNECEDORES = [
+    f"{prefixo} {nome} {sufixo}"
+    for prefixo in ("COMERCIAL", "DISTRIBUIDORA", "INDÚSTRIA")
+    for nome in ("NORDESTE", "SÃO JOSÉ", "PIAUÍ", "BOM JESUS", "CENTRAL", "PAULISTA")
+    for sufixo in ("LTDA", "EIRELI", "ME")
+]
+
+# Situação no inventário: a maior parte localizada.
+SITUACOES = [("localizado", 0.85), ("nao_localizado", 0.97), ("calamidade", 1.0)]
+
+NOMES = ["ANA", "JOÃO", "MARIA", "JOSÉ", "FRANCISCA", "ANTÔNIO", "RAIMUNDA", "PEDRO", "LUCIANA", "PAULO"]
+SOBRENOMES = ["SILVA", "SOUSA", "OLIVEIRA", "PEREIRA", "CARVALHO", "RODRIGUES", "ALVES", "LIMA", "GOMES", "BARROS"]
+FUNCOES = ["TÉCNICO ADMINISTRATIVO", "PROFESSOR", "ASSISTENTE EM ADMINISTRAÇÃO", "AUXILIAR"]
+
+PREFIXO_USUARIO = "sintetico"
+PREFIXO_MATRICULA = "SINT"
+
+CENTAVOS = Decimal("0.01")
+INICIO_AQUISICOES = date(2005, 1, 1)
+DIAS_AQUISICOES = (date(2024, 12, 31) - INICIO_AQUISICOES).days
+
+
+def gerar_inventariantes(quantidade, semente=42):
+    """Dados de usuário e inventariante: {"user": {...}, "inventariante": {...}}."""
+    aleatorio = random.Random(semente)
+    for indice in range(1, quantidade + 1):
+        yield {
+            "user": {
+                "username": f"{PREFIXO_USUARIO}{indice:04d}",
+                "first_name": aleatorio.choice(NOMES).title(),
+                "last_name": aleatorio.choice(SOBRENOMES).title(),
+            },
+            "inventariante": {
+                "matricula": f"{PREFIXO_MATRICULA}{indice:04d}",
+                "funcao": aleatorio.choice(FUNCOES),
+                "telefone": f"(89) 9{aleatorio.randrange(10000000):08d}",
+            },
+        }
+
+
+def gerar_registros(quantidade, semente=42, tombo_inicial=100000):
+    """Campos da planilha (tipos do modelo) mais hash_linha, situacao e data_inventario."""
+    aleatorio = random.Random(semente)
+    for indice in range(quantidade):
+        bem, complementos, (minimo, maximo), conta = aleatorio.choice(BENS)
+        aquisicao = INICIO_AQUISICOES + timedelta(days=aleatorio.randrange(DIAS_AQUISICOES))
+        dados = {
+            "tombo": tombo_inicial + indice,
+            "descricao": f"{bem} {aleatorio.choice(complementos)} {aleatorio.choice(CORES)}",
+            "valor": Decimal(aleatorio.uniform(minimo, maximo)).quantize(CENTAVOS),
+            "conta_contabil": conta,
+            "setor": aleatorio.choices(SETORES, cum_weights=PESOS_SETORES)[0],
+            "empenho": f"{aquisicao.year}NE{aleatorio.randrange(1, 3000):06d}",
+            "fornecedor": aleatorio.choice(FORNECEDORES),
+            "numero_documento": str(aleatorio.randrange(1, 999999)).zfill(6),
+            "data_documento": aquisicao,
+            "data_ateste": aquisicao + timedelta(days=aleatorio.randrange(1, 30)),
+            "dependencia": aleatorio.choice(DEPENDENCIAS),
+        }
+        dados["hash_linha"] = calcular_hash(dados)
+
+        sorteio = aleatorio.random()
+        dados["situacao"] = next(situacao for situacao, limite in SITUACOES if sorteio < limite)
+        dados["data_inventario"] = (
+            date(2025, 3, 1) + timedelta(days=aleatorio.randrange(120))
+            if dados["situacao"] == "localizado" else None
+        )
+        yield dados
+
+
+def formatar_linha(dados):
+    """Registro no formato da planilha oficial (texto, decimal com vírgula, dd/mm/aaaa)."""
+    return [
+        str(dados["tombo"]),
+        dados["descricao"],
+        str(dados["valor"]).replace(".", ","),
+        dados["conta_contabil"],
+        dados["setor"],
+        dados["empenho"],
+        dados["fornecedor"],
+        dados["numero_documento"],
+        dados["data_documento"].strftime("%d/%m/%Y"),
+        dados["data_ateste"].strftime("%d/%m/%Y"),
+        dados["dependencia"],
+    ]
+
+
+def gerar_linhas(quantidade, semente=42, tombo_inicial=100000):
+    for dados in gerar_registros(quantidade, semente, tombo_inicial):
+        yield formatar_linha(dados)
+
+
+FORMATOS = ("xlsx", "csv", "tsv", "largura_fixa")
+
+EXTENSOES = {"xlsx": "xlsx", "csv": "csv", "tsv": "tsv", "largura_fixa": "txt"}
+
+
+def escrever_arquivos(diretorio, quantidade, formatos=FORMATOS, semente=42, tombo_inicial=100000,
+                      nome="bench"):
+    """Grava as mesmas linhas em cada formato; retorna {formato: caminho}."""
+    caminhos = {formato: diretorio / f"{nome}.{EXTENSOES[formato]}" for formato in formatos}
+
+    workbook = sheet = None
+    if "xlsx" in caminhos:
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Patrimonios")
+        sheet.append(CABECALHO)
+
+    arquivos = {
+        formato: open(caminhos[formato], "w", newline="", encoding="utf-8")
+        for formato in ("csv", "tsv", "largura_fixa") if formato in caminhos
+    }
+    try:
+        escritores = {}
+        if "csv" in arquivos:
+            escritores["csv"] = csv.writer(arquivos["csv"], delimiter=";").writerow
+        if "tsv" in arquivos:
+            escritores["tsv"] = csv.writer(arquivos["tsv"], delimiter="\t").writerow
+        if "largura_fixa" in arquivos:
+            escritores["largura_fixa"] = lambda row: arquivos["largura_fixa"].write(
+                "".join(v[:w - 2].ljust(w) for v, w in zip(row, LARGURAS)).rstrip() + "\n"
+            )
+
+        for escrever in escritores.values():
+            escrever(CABECALHO)
+        for row in gerar_linhas(quantidade, semente, tombo_inicial):
+            for escrever in escritores.values():
+                escrever(row)
+            if sheet is not None:
+                sheet.append(row)
+    finally:
+        for arquivo in arquivos.values():
+            arquivo.close()
+
+    if workbook is not None:
+        workbook.save(caminhos["xlsx"])
+    return caminhos
@@ -1,17 +1,29 @@
+from functools import wraps
+
 from django.shortcuts import render
 from django.http import HttpResponseForbidden, HttpResponse
-from django.contrib.auth.decorators import user_passes_test
-
+from django.contrib.auth.views import redirect_to_login
+
+
+# ==========================================================
+# RESTRIÇÃO A ADMINISTRADORES
+# ----------------------------------------------------------
+# Libera a view apenas para superusuário ou presidente, com
+# base em request.papel (ver app/autorizacao.py): o papel vem
+# do cache, sem consultas extras.
+#
+# - Não autenticado: redireciona para o login
+# - Sem permissão: modal de acesso negado
+# ==========================================================
 def admin_required(view_func):
+    @wraps(view_func)
     def wrapper(request, *args, **kwargs):
 
-        is_presidente = (
-            hasattr(request.user, "inventariante")
-            and request.user.inventariante.presidente
-        )
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
 
         # Usuário sem permissão
-        if not request.user.is_superuser and not is_presidente:
+        if not request.papel.is_admin:
 
             # --- Requisição HTMX (modal) ---
             if request.headers.get("HX-Request"):
@@ -32,5 +44,3 @@ def admin_required(view_func):
         return view_func(request, *args, **kwargs)
 
     return wrapper
-
-def presidente_ou_superuser(user): return ( user.is_authenticated and ( user.is_superuser or user.groups.filter(name="Presidente").exists() ) )
\ No newline at end of file
@@ -0,0 +1,88 @@
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import ImportacaoPlanilha, Patrimonio
+
+
+# ==========================================================
+# EXCLUSÃO DE PATRIMÔNIOS EM BLOCOS
+# ----------------------------------------------------------
+# Remove patrimônios com DELETE direto no banco, sem carregar
+# as instâncias no Python (não há sinais nem cascatas a partir
+# de Patrimonio; resumo, busca textual e versões continuam
+# mantidos pelos triggers do SQLite).
+#
+# A exclusão é feita em blocos de settings.EXCLUSAO_BLOCO
+# linhas, cada bloco numa instrução própria (em autocommit,
+# uma transação por bloco):
+#
+#   DELETE FROM app_patrimonio WHERE id IN (
+#       SELECT id FROM app_patrimonio [WHERE importacao_id = %s]
+#       ORDER BY id LIMIT %s
+#   )
+#
+# Entre um bloco e outro a trava de escrita é liberada, e
+# escritas de outros usuários são intercaladas em vez de
+# esperar a exclusão inteira.
+#
+# - excluir_patrimonios(): todos os patrimônios (planilha)
+# - excluir_importacao(): apenas os inseridos por um upload,
+#   pelo índice da coluna importacao_id
+# - excluir_de_inventariantes(): os patrimônios dos
+#   inventariantes informados (dados sintéticos, por exemplo)
+# ==========================================================
+
+
+def _excluir_em_blocos(filtro="", parametros=(), tamanho=None, pausa=None):
+    """Executa o DELETE em blocos até esgotar as linhas; retorna o total excluído."""
+    tamanho = tamanho or settings.EXCLUSAO_BLOCO
+    pausa = settings.EXCLUSAO_PAUSA_SEGUNDOS if pausa is None else pausa
+
+    tabela = connection.ops.quote_name(Patrimonio._meta.db_table)
+    sql = (
+        f"DELETE FROM {tabela} WHERE id IN ("
+        f"SELECT id FROM {tabela} {filtro} ORDER BY id LIMIT %s)"
+    )
+
+    total = 0
+    while True:
+        with transaction.mark_for_rollback_on_error(), connection.cursor() as cursor:
+            cursor.execute(sql, [*parametros, tamanho])
+            excluidos = cursor.rowcount
+        total += excluidos
+        if excluidos < tamanho:
+            return total
+        if pausa:
+            time.sleep(pausa)
+
+
+def excluir_patrimonios(tamanho=None, pausa=None):
+    """Exclui todos os patrimônios."""
+    return _excluir_em_blocos(tamanho=tamanho, pausa=pausa)
+
+
+def excluir_importacao(importacao, tamanho=None, pausa=None):
+    """
+    Exclui os patrimônios inseridos por uma importação e a marca
+    como desfeita. Registros apenas atualizados pelo upload não
+    são alterados.
+    """
+    total = _excluir_em_blocos(
+        "WHERE importacao_id = %s", [importacao.pk], tamanho=tamanho, pausa=pausa
+    )
+    ImportacaoPlanilha.objects.filter(pk=importacao.pk).update(status="desfeita")
+    importacao.status = "desfeita"
+    return total
+
+
+def excluir_de_inventariantes(inventariantes_ids, tamanho=None, pausa=None):
+    """Exclui os patrimônios dos inventariantes informados."""
+    inventariantes_ids = list(inventariantes_ids)
+    if not inventariantes_ids:
+        return 0
+    marcadores = ", ".join(["%s"] * len(inventariantes_ids))
+    return _excluir_em_blocos(
+        f"WHERE inventariante_id IN ({marcadores})", inventariantes_ids, tamanho=tamanho, pausa=pausa
+    )
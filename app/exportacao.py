@@ -0,0 +1,109 @@
+import codecs
+import csv
+import tempfile
+
+from openpyxl import Workbook
+
+
+# ==========================================================
+# EXPORTAÇÃO DE PATRIMÔNIOS
+# ----------------------------------------------------------
+# Gera CSV ou XLSX a partir de um queryset de Patrimonio com
+# uso de memória constante:
+#
+# - As linhas são lidas com QuerySet.iterator(chunk_size=...)
+#   e values_list (sem instanciar modelos)
+# - CSV é produzido sob demanda, linha a linha, para um
+#   StreamingHttpResponse
+# - XLSX usa a pasta de trabalho write-only do openpyxl. O
+#   formato é um ZIP que só pode ser fechado ao final, por isso
+#   é gravado em arquivo temporário e então enviado em blocos
+#
+# Os cabeçalhos coincidem com os reconhecidos pela importação,
+# permitindo reimportar o arquivo exportado.
+# ==========================================================
+
+# Linhas buscadas no banco por vez.
+TAMANHO_BLOCO = 2000
+
+# (cabeçalho, campo do values_list)
+COLUNAS_EXPORTACAO = [
+    ("Tombo", "tombo"),
+    ("Descrição", "descricao"),
+    ("Valor (R$)", "valor"),
+    ("Conta Contábil", "conta_contabil"),
+    ("Setor", "setor"),
+    ("Empenho", "empenho"),
+    ("Fornecedor", "fornecedor"),
+    ("Número Documento", "numero_documento"),
+    ("Data Documento", "data_documento"),
+    ("Data Ateste", "data_ateste"),
+    ("Dependência", "dependencia"),
+    ("Situação", "situacao"),
+    ("Observações", "observacoes"),
+    ("Data Inventário", "data_inventario"),
+    ("Inventariante", "inventariante__user__username"),
+]
+
+CABECALHOS = [cabecalho for cabecalho, _campo in COLUNAS_EXPORTACAO]
+CAMPOS = [campo for _cabecalho, campo in COLUNAS_EXPORTACAO]
+
+INDICE_VALOR = CAMPOS.index("valor")
+INDICE_SITUACAO = CAMPOS.index("situacao")
+INDICES_DATA = [CAMPOS.index(campo) for campo in ("data_documento", "data_ateste", "data_inventario")]
+
+
+def linhas_exportacao(queryset):
+    """
+    Percorre o queryset em blocos devolvendo listas na ordem das
+    colunas, com a situação já convertida para o rótulo legível.
+    """
+    situacoes = dict(queryset.model.STATUS_CHOICES)
+    for row in queryset.values_list(*CAMPOS).iterator(chunk_size=TAMANHO_BLOCO):
+        row = list(row)
+        row[INDICE_SITUACAO] = situacoes.get(row[INDICE_SITUACAO], row[INDICE_SITUACAO])
+        yield row
+
+
+class _Eco:
+    """Pseudo-arquivo: write() devolve o texto em vez de armazená-lo."""
+
+    def write(self, valor):
+        return valor
+
+
+def exportar_csv(queryset):
+    """Gerador de blocos de bytes CSV (separador ";", decimal "," e datas dd/mm/aaaa)."""
+    writer = csv.writer(_Eco(), delimiter=";")
+    yield codecs.BOM_UTF8 + writer.writerow(CABECALHOS).encode("utf-8")
+
+    bloco = []
+    for row in linhas_exportacao(queryset):
+        for indice in INDICES_DATA:
+            if row[indice]:
+                row[indice] = row[indice].strftime("%d/%m/%Y")
+        if row[INDICE_VALOR] is not None:
+            row[INDICE_VALOR] = str(row[INDICE_VALOR]).replace(".", ",")
+        bloco.append(writer.writerow(row))
+
+        if len(bloco) >= 500:
+            yield "".join(bloco).encode("utf-8")
+            bloco = []
+
+    if bloco:
+        yield "".join(bloco).encode("utf-8")
+
+
+def exportar_xlsx(queryset):
+    """Grava a pasta de trabalho em arquivo temporário e o devolve aberto no início."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Patrimônios")
+    sheet.append(CABECALHOS)
+
+    for row in linhas_exportacao(queryset):
+        sheet.append(row)
+
+    arquivo = tempfile.TemporaryFile(suffix=".xlsx")
+    workbook.save(arquivo)
+    arquivo.seek(0)
+    return arquivo
@@ -0,0 +1,424 @@
+import codecs
+import csv
+import hashlib
+import os
+import re
+from dataclasses import dataclass, asdict
+from itertools import islice
+
+from django.db import transaction
+from openpyxl import load_workbook
+
+from .models import Patrimonio
+from .validacao import COLUNAS_PLANILHA, LINHAS_BUSCA_CABECALHO, ValidadorPlanilha, mapear_cabecalho
+
+
+# ==========================================================
+# MOTOR DE IMPORTAÇÃO DE PLANILHAS
+# ----------------------------------------------------------
+# Centraliza a leitura da planilha oficial de patrimônios e a
+# gravação dos registros no banco de dados.
+#
+# Características:
+# - Leitura em streaming (modo read-only do openpyxl), sem
+#   carregar a pasta de trabalho inteira em memória
+# - Caminho rápido para CSV, TSV e texto de largura fixa,
+#   lidos pelo módulo csv (implementado em C) sem openpyxl
+# - Validação vetorizada de cada lote (app/validacao.py),
+#   com colunas mapeadas pelo cabeçalho
+# - Montagem das instâncias em lotes de tamanho fixo
+# - Gravação com bulk_create dentro de uma única transação:
+#   se qualquer lote falhar, nada é gravado
+# - Modo "atualizar": upsert por tombo guiado pelo hash de
+#   cada linha, com custo proporcional às alterações
+# ==========================================================
+
+# Quantidade de linhas montadas e gravadas por vez.
+TAMANHO_LOTE_PADRAO = 1000
+
+
+@dataclass
+class ResumoImportacao:
+    """Contadores devolvidos ao final de uma importação."""
+
+    # Linhas de dados lidas (inclui vazias e rejeitadas).
+    linhas_processadas: int = 0
+
+    # Linhas gravadas como novos patrimônios.
+    inseridos: int = 0
+
+    # Tombos existentes cujo conteúdo mudou (modo "atualizar").
+    atualizados: int = 0
+
+    # Tombos existentes com hash idêntico, pulados (modo "atualizar").
+    inalterados: int = 0
+
+    # Linhas totalmente vazias, descartadas sem erro.
+    ignorados: int = 0
+
+    # Linhas com erro de validação ou (modo "inserir") tombo já existente.
+    rejeitados: int = 0
+
+    def como_dict(self):
+        return asdict(self)
+
+
+# ==========================================================
+# LEITURA EM STREAMING
+# ----------------------------------------------------------
+# Percorre todas as linhas da planilha devolvendo
+# (número da linha, valores). A localização do cabeçalho fica
+# a cargo do ValidadorPlanilha.
+# ==========================================================
+def ler_linhas_xlsx(arquivo):
+    workbook = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        linhas = sheet.iter_rows(values_only=True)
+        for numero, row in enumerate(linhas, start=1):
+            yield numero, row
+    finally:
+        workbook.close()
+
+
+# ==========================================================
+# LEITURA DE ARQUIVOS TEXTO (CSV / TSV / LARGURA FIXA)
+# ----------------------------------------------------------
+# Exportações do sistema legado chegam em texto. A codificação
+# (UTF-8 ou Windows-1252) é detectada por amostragem e as
+# linhas seguem o mesmo formato (número, valores) do XLSX.
+# ==========================================================
+TAMANHO_AMOSTRA = 64 * 1024
+
+FORMATOS_POR_EXTENSAO = {
+    ".xlsx": "xlsx",
+    ".xlsm": "xlsx",
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".tab": "tsv",
+    ".txt": "texto",
+    ".prn": "texto",
+}
+
+# Extensões aceitas no upload.
+EXTENSOES_ACEITAS = sorted(FORMATOS_POR_EXTENSAO)
+
+# Separa colunas de texto alinhado: dois ou mais espaços.
+_SEPARADOR_LARGURA_FIXA = re.compile(r"\S+(?: \S+)*")
+
+
+def _detectar_codificacao(caminho):
+    with open(caminho, "rb") as arquivo:
+        amostra = arquivo.read(TAMANHO_AMOSTRA)
+    try:
+        # Decodificador incremental tolera caractere cortado no fim da amostra
+        codecs.getincrementaldecoder("utf-8")().decode(amostra, final=False)
+    except UnicodeDecodeError:
+        return "cp1252"
+    return "utf-8-sig"
+
+
+def _ler_amostra(caminho, codificacao):
+    with open(caminho, encoding=codificacao, newline="") as arquivo:
+        return arquivo.read(8 * 1024)
+
+
+def detectar_formato(caminho):
+    """Retorna "xlsx", "csv", "tsv" ou "largura_fixa"."""
+    extensao = os.path.splitext(str(caminho))[1].lower()
+    formato = FORMATOS_POR_EXTENSAO.get(extensao, "csv")
+    if formato != "texto":
+        return formato
+
+    # .txt/.prn: tabulação ou ";" em todas as linhas iniciais indicam
+    # texto delimitado; caso contrário, texto de largura fixa
+    linhas = [linha for linha in _ler_amostra(caminho, _detectar_codificacao(caminho)).splitlines() if linha.strip()]
+    iniciais = linhas[:5]
+    if iniciais and all("\t" in linha for linha in iniciais):
+        return "tsv"
+    if iniciais and all(";" in linha for linha in iniciais):
+        return "csv"
+    return "largura_fixa"
+
+
+def ler_linhas_csv(caminho, delimitador=None):
+    codificacao = _detectar_codificacao(caminho)
+    if delimitador is None:
+        try:
+            dialeto = csv.Sniffer().sniff(_ler_amostra(caminho, codificacao), delimiters=";,\t|")
+            delimitador = dialeto.delimiter
+        except csv.Error:
+            delimitador = ";"
+
+    with open(caminho, encoding=codificacao, newline="") as arquivo:
+        for numero, row in enumerate(csv.reader(arquivo, delimiter=delimitador), start=1):
+            yield numero, row
+
+
+def _fronteiras_largura_fixa(caminho, codificacao):
+    """
+    (número da linha do cabeçalho, posição inicial de cada coluna),
+    ou None sem cabeçalho reconhecível.
+
+    Entre dois títulos vizinhos, a fronteira é uma posição em
+    branco em todas as linhas do arquivo (a "calha" entre as
+    colunas), o que preserva valores alinhados à direita ou mais
+    longos que o título. Sem calha, o arquivo é ambíguo.
+    """
+    with open(caminho, encoding=codificacao) as arquivo:
+        titulos = None
+        for numero, linha in enumerate(arquivo, start=1):
+            linha = linha.rstrip("\r\n")
+
+            if titulos is None:
+                if numero > LINHAS_BUSCA_CABECALHO:
+                    return None
+                partes = list(_SEPARADOR_LARGURA_FIXA.finditer(linha))
+                if mapear_cabecalho([parte.group() for parte in partes]):
+                    titulos = partes
+                    cabecalho = numero
+                    # Posições candidatas: entre o fim de um título e o início do próximo
+                    livres = [
+                        set(range(anterior.end(), proximo.start()))
+                        for anterior, proximo in zip(partes, partes[1:])
+                    ]
+                continue
+
+            for posicoes in livres:
+                posicoes.difference_update(
+                    [posicao for posicao in posicoes if posicao < len(linha) and not linha[posicao].isspace()]
+                )
+
+    if titulos is None:
+        return None
+
+    for posicoes, anterior, proximo in zip(livres, titulos, titulos[1:]):
+        if not posicoes:
+            raise ValueError(
+                f"Largura fixa ambígua: nenhuma coluna em branco separa "
+                f"\"{anterior.group()}\" de \"{proximo.group()}\" em todas as linhas."
+            )
+    return cabecalho, [0] + [max(posicoes) for posicoes in livres]
+
+
+def ler_linhas_largura_fixa(caminho):
+    """
+    As colunas são delimitadas pelas calhas em branco entre os
+    títulos do cabeçalho (ver _fronteiras_largura_fixa). Sem
+    cabeçalho reconhecível, as colunas são separadas por dois ou
+    mais espaços.
+    """
+    codificacao = _detectar_codificacao(caminho)
+    layout = _fronteiras_largura_fixa(caminho, codificacao)
+    cabecalho, inicios = layout if layout else (None, None)
+
+    with open(caminho, encoding=codificacao) as arquivo:
+        for numero, linha in enumerate(arquivo, start=1):
+            linha = linha.rstrip("\r\n")
+
+            if cabecalho is None or numero <= cabecalho:
+                yield numero, [parte.group() for parte in _SEPARADOR_LARGURA_FIXA.finditer(linha)]
+                continue
+
+            fins = inicios[1:] + [None]
+            yield numero, [linha[inicio:fim].strip() for inicio, fim in zip(inicios, fins)]
+
+
+def ler_linhas(caminho):
+    """Escolhe o leitor adequado ao formato do arquivo."""
+    formato = detectar_formato(caminho)
+    if formato == "xlsx":
+        return ler_linhas_xlsx(caminho)
+    if formato == "tsv":
+        return ler_linhas_csv(caminho, delimitador="\t")
+    if formato == "largura_fixa":
+        return ler_linhas_largura_fixa(caminho)
+    return ler_linhas_csv(caminho)
+
+
+def dividir_em_lotes(iteravel, tamanho):
+    """Agrupa um iterável em listas de até `tamanho` elementos."""
+    iterador = iter(iteravel)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
+
+
+# ==========================================================
+# IMPRESSÃO DIGITAL DA LINHA
+# ----------------------------------------------------------
+# Calculada sobre os dados já validados e convertidos para os
+# tipos do modelo, garantindo hashes estáveis entre uploads.
+# ==========================================================
+def calcular_hash(dados):
+    """Impressão digital do conteúdo importado de uma linha."""
+    conteudo = "\x1f".join(
+        "" if dados[campo] is None else str(dados[campo])
+        for campo in COLUNAS_PLANILHA
+    )
+    return hashlib.md5(conteudo.encode("utf-8")).hexdigest()
+
+
+# ==========================================================
+# GRAVAÇÃO DE LOTES
+# ----------------------------------------------------------
+# Cada função recebe os registros validados de um lote, pares
+# (número da linha, dados) com tombos únicos na planilha,
+# atualiza o resumo e devolve os erros gerados na gravação.
+#
+# Patrimônios novos recebem a importação (lote) de origem,
+# usada para desfazer o upload (ver app/exclusao.py).
+# ==========================================================
+def _inserir_lote(registros, inventariante, resumo, tamanho_lote, importacao=None):
+    # Uma única consulta por lote para descartar tombos existentes
+    existentes = set(
+        Patrimonio.objects
+        .filter(tombo__in=[dados["tombo"] for _numero, dados in registros])
+        .values_list("tombo", flat=True)
+    )
+
+    novos = []
+    erros = []
+    for numero, dados in registros:
+        if dados["tombo"] in existentes:
+            erros.append({
+                "linha": numero,
+                "coluna": "tombo",
+                "valor": dados["tombo"],
+                "erro": "Tombo já cadastrado",
+            })
+        else:
+            novos.append(Patrimonio(inventariante=inventariante, situacao="localizado", importacao=importacao, **dados))
+    resumo.rejeitados += len(erros)
+
+    Patrimonio.objects.bulk_create(novos, batch_size=tamanho_lote)
+    resumo.inseridos += len(novos)
+    return erros
+
+
+def _atualizar_lote(registros, inventariante, resumo, tamanho_lote, importacao=None):
+    por_tombo = {dados["tombo"]: dados for _numero, dados in registros}
+
+    # 1ª consulta: apenas tombo e hash, suficiente para as linhas inalteradas
+    hashes = dict(
+        Patrimonio.objects
+        .filter(tombo__in=por_tombo)
+        .values_list("tombo", "hash_linha")
+    )
+
+    novos = []
+    alterados = []
+    for tombo, dados in por_tombo.items():
+        if tombo not in hashes:
+            novos.append(Patrimonio(inventariante=inventariante, situacao="localizado", importacao=importacao, **dados))
+        elif hashes[tombo] == dados["hash_linha"]:
+            resumo.inalterados += 1
+        else:
+            alterados.append(tombo)
+
+    Patrimonio.objects.bulk_create(novos, batch_size=tamanho_lote)
+    resumo.inseridos += len(novos)
+
+    if not alterados:
+        return []
+
+    # 2ª consulta: registros alterados, para comparar campo a campo
+    campos_alterados = {"hash_linha"}
+    objetos = list(
+        Patrimonio.objects
+        .filter(tombo__in=alterados)
+        .only("id", *COLUNAS_PLANILHA, "hash_linha")
+    )
+    for patrimonio in objetos:
+        dados = por_tombo[patrimonio.tombo]
+        for campo, valor in dados.items():
+            if getattr(patrimonio, campo) != valor:
+                setattr(patrimonio, campo, valor)
+                campos_alterados.add(campo)
+
+    Patrimonio.objects.bulk_update(objetos, sorted(campos_alterados), batch_size=500)
+    resumo.atualizados += len(objetos)
+    return []
+
+
+def _validar_lote(registros, inventariante, resumo, tamanho_lote, importacao=None):
+    # Modo "validar": nada é gravado
+    return []
+
+
+GRAVACAO_POR_MODO = {
+    "inserir": _inserir_lote,
+    "atualizar": _atualizar_lote,
+    "validar": _validar_lote,
+}
+
+
+# ==========================================================
+# LEITURA E VALIDAÇÃO EM LOTES
+# ----------------------------------------------------------
+# Etapa sem acesso ao banco, comum ao upload pela web e à
+# importação paralela pela linha de comando (ver
+# app/importacao_paralela.py, onde roda em outros processos).
+# Cada lote sai validado e com o hash_linha já calculado.
+# ==========================================================
+def validar_planilha(arquivo, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """Gera (linhas lidas, ResultadoLote) para cada lote da planilha."""
+    validador = ValidadorPlanilha()
+    linhas = validador.linhas_de_dados(ler_linhas(arquivo))
+
+    for lote in dividir_em_lotes(linhas, tamanho_lote):
+        resultado = validador.validar_lote(lote)
+        for _numero, dados in resultado.registros:
+            dados["hash_linha"] = calcular_hash(dados)
+        yield len(lote), resultado
+
+
+def gravar_resultado(linhas, resultado, inventariante, resumo, modo="inserir",
+                     tamanho_lote=TAMANHO_LOTE_PADRAO, importacao=None):
+    """Grava um lote validado conforme o modo; devolve os erros de validação e de gravação."""
+    resumo.linhas_processadas += linhas
+    resumo.ignorados += resultado.ignorados
+    resumo.rejeitados += resultado.rejeitados
+    return resultado.erros + GRAVACAO_POR_MODO[modo](
+        resultado.registros, inventariante, resumo, tamanho_lote, importacao
+    )
+
+
+# ==========================================================
+# IMPORTAÇÃO
+# ----------------------------------------------------------
+# Lê a planilha (XLSX, CSV, TSV ou largura fixa) em lotes,
+# valida cada lote e grava os patrimônios vinculados ao
+# inventariante informado.
+#
+# Regras:
+# - Linhas vazias são ignoradas
+# - Linhas com qualquer erro de validação são rejeitadas
+#   (tombo ausente/inválido/repetido, valor ou data inválidos)
+# - modo "inserir": tombos já cadastrados são rejeitados
+# - modo "atualizar": tombos novos são inseridos, linhas com
+#   hash igual ao gravado são puladas e as demais recebem
+#   bulk_update apenas dos campos que mudaram
+# - modo "validar": apenas gera o relatório, sem gravar nada
+#
+# `importacao`, se informada, marca os patrimônios inseridos
+# (os atualizados mantêm a importação que os criou).
+#
+# `relatorio`, se informado, recebe os erros de cada lote
+# (ver validacao.RelatorioErros). `progresso`, se informado,
+# é chamado com o resumo parcial ao final de cada lote.
+# ==========================================================
+def importar_planilha(arquivo, inventariante, modo="inserir",
+                      tamanho_lote=TAMANHO_LOTE_PADRAO, progresso=None, relatorio=None,
+                      importacao=None):
+    resumo = ResumoImportacao()
+
+    with transaction.atomic():
+        for linhas, resultado in validar_planilha(arquivo, tamanho_lote):
+            erros = gravar_resultado(linhas, resultado, inventariante, resumo, modo, tamanho_lote, importacao)
+            if relatorio:
+                relatorio.registrar(erros)
+
+            if progresso:
+                progresso(resumo)
+
+    return resumo
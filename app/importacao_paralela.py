@@ -0,0 +1,212 @@
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .exclusao import excluir_importacao
+from .importacao import TAMANHO_LOTE_PADRAO, ResumoImportacao, gravar_resultado
+from .leitura_paralela import FALHA, FIM, LOTE, iniciar_processo, ler_arquivo
+from .models import ImportacaoPlanilha
+from .validacao import RelatorioErros
+
+
+# ==========================================================
+# IMPORTAÇÃO PARALELA DE VÁRIAS PLANILHAS
+# ----------------------------------------------------------
+# Para lotes de planilhas enviados de uma vez pelos campi
+# (comando import_planilhas):
+#
+# - Leitura e validação (validar_planilha, a mesma etapa do
+#   upload pela web) em um pool de processos, um arquivo por
+#   tarefa, sem acesso ao banco (ver app/leitura_paralela.py;
+#   funciona com fork, spawn e forkserver)
+# - Os lotes validados seguem por uma fila limitada até um
+#   único escritor (o processo principal): o SQLite admite um
+#   escritor por vez, e a fila cheia segura a leitura quando
+#   a gravação fica para trás
+# - O escritor grava lotes de vários arquivos na mesma
+#   transação, confirmando a cada `linhas_por_transacao` linhas
+#   (menos transações, menos fsync e trocas de trava)
+#
+# Cada arquivo gera a sua ImportacaoPlanilha (histórico,
+# relatório de erros e "desfazer" do painel). Um arquivo é
+# tudo ou nada:
+# - modo "inserir": os lotes são gravados à medida que chegam;
+#   se a leitura falhar, ou a gravação for interrompida antes
+#   de o arquivo ser confirmado, os patrimônios já inseridos
+#   por ele são excluídos (pela coluna importacao_id)
+# - modo "atualizar": atualizações não podem ser desfeitas por
+#   exclusão, então os lotes do arquivo ficam em memória até o
+#   fim da leitura e são gravados juntos, dentro de uma única
+#   transação (memória limitada aos arquivos em leitura)
+# Em ambos os casos a importação com falha fica com status
+# "erro".
+# ==========================================================
+
+LINHAS_POR_TRANSACAO = 50000
+
+
+@dataclass
+class ArquivoImportado:
+    caminho: str
+    importacao: ImportacaoPlanilha
+    relatorio: RelatorioErros
+    nome_relatorio: str
+    resumo: ResumoImportacao = field(default_factory=ResumoImportacao)
+
+    # Tempo de leitura e validação (no processo do pool) e tempo
+    # desde o início do comando até a confirmação da gravação.
+    segundos_leitura: float = 0.0
+    segundos: float = 0.0
+
+    mensagem_erro: str = ""
+    confirmado: bool = False
+
+    # Lotes validados aguardando o fim da leitura (modo "atualizar").
+    lotes_pendentes: list = field(default_factory=list)
+
+    @property
+    def linhas_por_segundo(self):
+        """Vazão da leitura e validação do arquivo."""
+        return self.resumo.linhas_processadas / self.segundos_leitura if self.segundos_leitura else 0
+
+
+def _proxima_mensagem(fila, futuros):
+    while True:
+        try:
+            return fila.get(timeout=1)
+        except queue.Empty:
+            # Processo do pool encerrado sem avisar (BrokenProcessPool)
+            for futuro in futuros:
+                if futuro.done() and futuro.exception():
+                    raise futuro.exception()
+
+
+def _criar_importacao(caminho, inventariante, modo):
+    importacao = ImportacaoPlanilha.objects.create(
+        inventariante=inventariante,
+        arquivo=os.path.abspath(caminho),
+        nome_original=os.path.basename(caminho),
+        modo=modo,
+        status="processando",
+        data_inicio=timezone.now(),
+    )
+    nome_relatorio = f"importacoes/{importacao.pk}_erros.csv"
+    relatorio = RelatorioErros(os.path.join(settings.MEDIA_ROOT, nome_relatorio))
+    return ArquivoImportado(caminho, importacao, relatorio, nome_relatorio)
+
+
+def _gravar(arquivo, linhas, resultado, inventariante, modo, tamanho_lote):
+    arquivo.relatorio.registrar(gravar_resultado(
+        linhas, resultado, inventariante, arquivo.resumo, modo, tamanho_lote, arquivo.importacao,
+    ))
+    return linhas
+
+
+def _concluir(arquivo):
+    arquivo.relatorio.fechar()
+    ImportacaoPlanilha.objects.filter(pk=arquivo.importacao.pk).update(
+        status="concluida",
+        relatorio_erros=arquivo.nome_relatorio if arquivo.relatorio.total else "",
+        data_conclusao=timezone.now(),
+        **arquivo.resumo.como_dict(),
+    )
+    arquivo.importacao.status = "concluida"
+
+
+def _falhar(arquivo, mensagem):
+    """Desfaz o que o arquivo já gravou e registra o erro."""
+    arquivo.relatorio.fechar()
+    excluir_importacao(arquivo.importacao, pausa=0)
+    ImportacaoPlanilha.objects.filter(pk=arquivo.importacao.pk).update(
+        status="erro",
+        mensagem_erro=mensagem,
+        data_conclusao=timezone.now(),
+    )
+    arquivo.importacao.status = "erro"
+    arquivo.mensagem_erro = mensagem
+
+
+def importar_planilhas(caminhos, inventariante, modo="inserir", processos=None,
+                       tamanho_lote=TAMANHO_LOTE_PADRAO, linhas_por_transacao=LINHAS_POR_TRANSACAO,
+                       ao_confirmar=None, contexto=None):
+    """
+    Importa os arquivos em paralelo; devolve a lista de
+    ArquivoImportado. `ao_confirmar`, se informado, é chamado com
+    cada arquivo assim que a transação que o concluiu é confirmada.
+    `contexto` é o contexto do multiprocessing (padrão: o da
+    plataforma).
+    """
+    if modo not in ("inserir", "atualizar", "validar"):
+        raise ValueError(f"Modo inválido para importação paralela: {modo}")
+
+    os.makedirs(os.path.join(settings.MEDIA_ROOT, "importacoes"), exist_ok=True)
+    arquivos = [_criar_importacao(str(caminho), inventariante, modo) for caminho in caminhos]
+    if not arquivos:
+        return arquivos
+    processos = processos or max(min(len(arquivos), (os.cpu_count() or 2) - 1), 1)
+
+    contexto = contexto or multiprocessing.get_context()
+    fila = contexto.Queue(maxsize=processos * 4)
+    inicio = time.perf_counter()
+
+    with ProcessPoolExecutor(processos, mp_context=contexto,
+                             initializer=iniciar_processo, initargs=(fila,)) as executor:
+        futuros = [
+            executor.submit(ler_arquivo, indice, arquivo.caminho, tamanho_lote)
+            for indice, arquivo in enumerate(arquivos)
+        ]
+        try:
+            pendentes = len(arquivos)
+            while pendentes:
+                concluidos = []
+                with transaction.atomic():
+                    gravadas = 0
+                    while pendentes and gravadas < linhas_por_transacao:
+                        tipo, indice, *dados = _proxima_mensagem(fila, futuros)
+                        arquivo = arquivos[indice]
+                        if tipo == LOTE:
+                            if modo == "atualizar":
+                                arquivo.lotes_pendentes.append(dados)
+                            else:
+                                gravadas += _gravar(arquivo, *dados, inventariante, modo, tamanho_lote)
+                            continue
+
+                        if tipo == FIM:
+                            arquivo.segundos_leitura = dados[0]
+                            for linhas, resultado in arquivo.lotes_pendentes:
+                                gravadas += _gravar(arquivo, linhas, resultado, inventariante, modo, tamanho_lote)
+                            arquivo.lotes_pendentes = []
+                            _concluir(arquivo)
+                        else:
+                            arquivo.lotes_pendentes = []
+                            _falhar(arquivo, dados[0])
+                        concluidos.append(arquivo)
+                        pendentes -= 1
+
+                for arquivo in concluidos:
+                    arquivo.confirmado = True
+                    arquivo.segundos = time.perf_counter() - inicio
+                    if ao_confirmar:
+                        ao_confirmar(arquivo)
+        except BaseException as exc:
+            # Esvazia a fila para os processos do pool terminarem
+            executor.shutdown(wait=False, cancel_futures=True)
+            while not all(futuro.done() for futuro in futuros):
+                try:
+                    fila.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+            for arquivo in arquivos:
+                if not arquivo.confirmado:
+                    _falhar(arquivo, arquivo.mensagem_erro or f"Importação interrompida: {exc!r}")
+            raise
+
+    return arquivos
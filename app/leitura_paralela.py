@@ -0,0 +1,53 @@
+import time
+
+import django
+from django.apps import apps
+from django.db import connections
+
+
+# ==========================================================
+# PROCESSOS DE LEITURA DA IMPORTAÇÃO PARALELA
+# ----------------------------------------------------------
+# Código executado nos processos do pool de
+# app/importacao_paralela.py. O módulo não importa models no
+# topo: com o método de início "spawn" (padrão no Windows e
+# no macOS) o processo começa vazio e carrega este módulo
+# antes de o Django estar configurado.
+#
+# O inicializador prepara o processo conforme o método:
+# - spawn / forkserver: configura o Django (django.setup)
+# - fork (Linux): fecha as conexões herdadas do processo
+#   principal, que não podem ser usadas depois do fork
+#
+# A leitura não consulta o banco: os lotes validados seguem
+# pela fila para o escritor único.
+# ==========================================================
+
+# Mensagens dos processos de leitura para o escritor.
+LOTE, FIM, FALHA = "lote", "fim", "falha"
+
+_fila = None
+
+
+def iniciar_processo(fila):
+    global _fila
+    _fila = fila
+    if apps.ready:
+        connections.close_all()
+    else:
+        django.setup()
+
+
+def ler_arquivo(indice, caminho, tamanho_lote):
+    """Tarefa do pool: envia ao escritor os lotes validados de um arquivo."""
+    # Importado aqui: exige o Django configurado (iniciar_processo)
+    from .importacao import validar_planilha
+
+    inicio = time.perf_counter()
+    try:
+        for linhas, resultado in validar_planilha(caminho, tamanho_lote):
+            _fila.put((LOTE, indice, linhas, resultado))
+    except Exception as exc:
+        _fila.put((FALHA, indice, f"{type(exc).__name__}: {exc}"))
+    else:
+        _fila.put((FIM, indice, time.perf_counter() - inicio))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.campanhas import abrir_campanha
+
+
+# ==========================================================
+# ABERTURA DE CAMPANHA DE INVENTÁRIO
+# ----------------------------------------------------------
+# Registra a campanha do ano. Só é possível abrir uma nova
+# campanha depois de encerrar a anterior.
+#
+# Uso:
+#   python manage.py abrir_campanha 2026
+# ==========================================================
+class Command(BaseCommand):
+    help = "Abre a campanha de inventário do ano informado."
+
+    def add_arguments(self, parser):
+        parser.add_argument("ano", type=int)
+
+    def handle(self, *args, **options):
+        try:
+            campanha = abrir_campanha(options["ano"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(f"Campanha {campanha.ano} aberta."))
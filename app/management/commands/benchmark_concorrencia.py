@@ -0,0 +1,198 @@
+import multiprocessing
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.db.models import F, Max
+from django.test.utils import override_settings
+
+from app.contadores import contar_patrimonios
+from app.models import Patrimonio
+
+
+# ==========================================================
+# BENCHMARK DE CONCORRÊNCIA (LEITURAS HTMX x IMPORTAÇÃO)
+# ----------------------------------------------------------
+# Simula o uso real do SQLite por vários processos (como os
+# workers do servidor, sem a disputa pelo GIL de threads):
+#
+# - leitores: página da listagem (cursor + responsável) e
+#   contagem do painel, em laço, medindo a latência
+# - editor: lê e grava um patrimônio na mesma transação, como
+#   as views de edição (é aqui que aparece "database is locked"
+#   quando a leitura precisa ser promovida a escrita)
+# - escritor: transações em lotes sobre app_patrimonio, como
+#   uma importação, sem alterar os dados (data_inventario
+#   regravada com o próprio valor; triggers disparam)
+#
+# Com --comparar, executa primeiro sem os ajustes (journal
+# DELETE, synchronous FULL, sem mmap, transações DEFERRED) e
+# depois com settings.SQLITE_PRAGMAS e o transaction_mode de
+# DATABASES, exibindo latências p50/p95/máxima, leituras por
+# segundo e erros "database is locked".
+#
+# Uso:
+#   python manage.py benchmark_concorrencia [--leitores 4]
+#       [--duracao 5] [--lote 2000] [--comparar]
+# ==========================================================
+
+PRAGMAS_PADRAO = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "mmap_size": 0,
+    "cache_size": -2000,
+    "temp_store": "DEFAULT",
+}
+
+
+class Command(BaseCommand):
+    help = "Mede latência de leitura com uma escrita em lotes concorrente."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--leitores", type=int, default=4)
+        parser.add_argument("--duracao", type=float, default=5.0, help="Segundos por cenário.")
+        parser.add_argument("--lote", type=int, default=2000, help="Linhas por transação do escritor.")
+        parser.add_argument(
+            "--comparar", action="store_true",
+            help="Executa também o cenário sem os ajustes de SQLITE_PRAGMAS.",
+        )
+
+    @staticmethod
+    def _ler(maior_id, duracao, fila):
+        aleatorio = random.Random()
+        latencias, erros = [], 0
+        fim = time.perf_counter() + duracao
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            try:
+                list(
+                    Patrimonio.objects.select_related("inventariante__user")
+                    .filter(id__gt=aleatorio.randrange(maior_id))
+                    .order_by("id")[:7]
+                )
+                contar_patrimonios()
+            except OperationalError:
+                erros += 1
+                continue
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        connections.close_all()
+        fila.put(("leitor", latencias, erros))
+
+    @staticmethod
+    def _editar(maior_id, duracao, fila):
+        aleatorio = random.Random()
+        edicoes, erros = 0, 0
+        fim = time.perf_counter() + duracao
+        while time.perf_counter() < fim:
+            try:
+                with transaction.atomic():
+                    pk, observacoes = (
+                        Patrimonio.objects.filter(id__gt=aleatorio.randrange(maior_id))
+                        .order_by("id").values_list("id", "observacoes")[:1].get()
+                    )
+                    Patrimonio.objects.filter(pk=pk).update(observacoes=observacoes)
+                edicoes += 1
+            except OperationalError:
+                erros += 1
+            except Patrimonio.DoesNotExist:
+                pass
+            time.sleep(0.005)
+        connections.close_all()
+        fila.put(("editor", edicoes, erros))
+
+    @staticmethod
+    def _escrever(maior_id, lote, duracao, fila):
+        escritas, erros = 0, 0
+        inicio_lote = 0
+        fim = time.perf_counter() + duracao
+        while time.perf_counter() < fim:
+            try:
+                with transaction.atomic():
+                    Patrimonio.objects.filter(
+                        id__gt=inicio_lote, id__lte=inicio_lote + lote
+                    ).update(data_inventario=F("data_inventario"))
+                escritas += 1
+            except OperationalError:
+                erros += 1
+            inicio_lote = (inicio_lote + lote) % maior_id
+            time.sleep(0.01)
+        connections.close_all()
+        fila.put(("escritor", escritas, erros))
+
+    def _cenario(self, pragmas, modo_transacao, options, maior_id):
+        # Cada processo abre a sua conexão, com os PRAGMAs e o modo
+        # de transação do cenário
+        contexto = multiprocessing.get_context("fork")
+        fila = contexto.Queue()
+        connections.close_all()
+        opcoes = connection.settings_dict.setdefault("OPTIONS", {})
+        modo_configurado = opcoes.get("transaction_mode")
+        opcoes["transaction_mode"] = modo_transacao
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            connection.ensure_connection()
+            connections.close_all()
+
+            processos = [
+                contexto.Process(target=self._ler, args=(maior_id, options["duracao"], fila))
+                for _ in range(options["leitores"])
+            ]
+            processos += [
+                contexto.Process(target=self._editar, args=(maior_id, options["duracao"], fila)),
+                contexto.Process(
+                    target=self._escrever, args=(maior_id, options["lote"], options["duracao"], fila)
+                ),
+            ]
+            for processo in processos:
+                processo.start()
+            resultados = [fila.get() for _ in processos]
+            for processo in processos:
+                processo.join()
+        opcoes["transaction_mode"] = modo_configurado
+
+        latencias, erros_leitura = [], 0
+        contagens = {}
+        for papel, valores, erros in resultados:
+            if papel == "leitor":
+                latencias.extend(valores)
+                erros_leitura += erros
+            else:
+                contagens[papel] = (valores, erros)
+
+        if len(latencias) < 2:
+            return {"leituras": len(latencias), "erros_leitura": erros_leitura}
+        percentis = statistics.quantiles(latencias, n=100)
+        return {
+            "leituras_por_s": round(len(latencias) / options["duracao"]),
+            "p50_ms": round(percentis[49], 2),
+            "p95_ms": round(percentis[94], 2),
+            "max_ms": round(max(latencias), 2),
+            "erros_leitura": erros_leitura,
+            "edicoes": contagens["editor"][0],
+            "erros_edicao": contagens["editor"][1],
+            "transacoes_escrita": contagens["escritor"][0],
+            "erros_escrita": contagens["escritor"][1],
+        }
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Benchmark disponível apenas no SQLite.")
+
+        maior_id = Patrimonio.objects.aggregate(maior=Max("id"))["maior"]
+        if not maior_id:
+            raise CommandError("Nenhum patrimônio cadastrado para o benchmark.")
+
+        configurado = connection.settings_dict.get("OPTIONS", {}).get("transaction_mode")
+        cenarios = [("ajustado", settings.SQLITE_PRAGMAS, configurado)]
+        if options["comparar"]:
+            cenarios.insert(0, ("padrão", PRAGMAS_PADRAO, None))
+
+        for nome, pragmas, modo_transacao in cenarios:
+            resultado = self._cenario(pragmas, modo_transacao, options, maior_id)
+            self.stdout.write(f"{nome}: " + ", ".join(f"{chave}={valor}" for chave, valor in resultado.items()))
+
+        # Deixa o banco no modo configurado
+        connections.close_all()
+        connection.ensure_connection()
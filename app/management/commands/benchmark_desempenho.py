@@ -0,0 +1,263 @@
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+
+from app.autorizacao import papel_do_usuario
+from app.contadores import contar_patrimonios
+from app.dados_sinteticos import escrever_arquivos
+from app.exportacao import exportar_csv
+from app.importacao import importar_planilha
+from app.models import Inventariante, Patrimonio
+from app.paginacao import codificar_cursor, paginar_por_cursor
+from app.plano_consultas import CONSULTAS_QUENTES
+from app.views_admin import patrimonio_list
+
+
+# ==========================================================
+# SUÍTE DE BENCHMARKS DE DESEMPENHO
+# ----------------------------------------------------------
+# Mede, sobre o banco atual (popule antes com
+# gerar_dados_sinteticos), os caminhos críticos da aplicação:
+#
+# - importação: leitura + validação de CSV e XLSX sintéticos
+#   e gravação de CSV (transação desfeita ao final)
+# - busca: texto (FTS5) e tombo
+# - paginação: primeira página e página do meio por cursor, e
+#   página do meio por offset (Paginator)
+# - exportação CSV da tabela inteira
+# - listagem HTMX: fragmento da tabela com falta e com acerto
+#   no cache de fragmentos, e página completa
+#
+# Cada caso é executado uma vez para aquecimento e depois
+# --repeticoes vezes. O resultado (mediana, mínimo e máximo em
+# ms, commit atual e tamanho do banco) é gravado em JSON; com
+# --comparar, as medianas são comparadas com um JSON anterior
+# (por exemplo, do commit base).
+#
+# Uso:
+#   python manage.py benchmark_desempenho [--saida resultado.json]
+#       [--repeticoes 5] [--linhas-importacao 5000] [--casos busca,paginacao]
+#       [--comparar base.json] [--tolerancia 10]
+# ==========================================================
+
+HX_TABELA = {"HTTP_HX_REQUEST": "true", "HTTP_HX_TARGET": "conteudo-patrimonios"}
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _medir(funcao, repeticoes):
+    funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        "mediana_ms": round(statistics.median(tempos), 3),
+        "min_ms": round(min(tempos), 3),
+        "max_ms": round(max(tempos), 3),
+        "repeticoes": repeticoes,
+    }
+
+
+class Command(BaseCommand):
+    help = "Mede importação, busca, paginação, exportação e renderização da listagem; grava JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--saida", type=Path, help="Arquivo JSON do resultado (padrão: apenas exibe).")
+        parser.add_argument("--repeticoes", type=int, default=5)
+        parser.add_argument("--linhas-importacao", type=int, default=5000)
+        parser.add_argument(
+            "--casos", default="",
+            help="Prefixos dos casos separados por vírgula (ex.: busca,paginacao).",
+        )
+        parser.add_argument("--comparar", type=Path, metavar="JSON", help="Resultado anterior para comparação.")
+        parser.add_argument(
+            "--tolerancia", type=float, default=10.0,
+            help="Variação (%%) da mediana acima da qual o caso é destacado como regressão.",
+        )
+
+    def handle(self, *args, **options):
+        if options["repeticoes"] < 1:
+            raise CommandError("--repeticoes deve ser ao menos 1.")
+        base = None
+        if options["comparar"]:
+            try:
+                base = json.loads(options["comparar"].read_text(encoding="utf-8"))
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Não foi possível ler {options['comparar']}: {exc}")
+
+        total = contar_patrimonios()
+        maior_id = Patrimonio.objects.aggregate(maior=Max("id"))["maior"]
+        if not maior_id:
+            raise CommandError("Nenhum patrimônio cadastrado: use gerar_dados_sinteticos.")
+        admin = User.objects.filter(is_superuser=True, is_active=True).order_by("pk").first()
+        if admin is None:
+            raise CommandError("É necessário um superusuário ativo para medir a listagem.")
+
+        prefixos = [prefixo.strip() for prefixo in options["casos"].split(",") if prefixo.strip()]
+        resultados = {}
+        with tempfile.TemporaryDirectory() as diretorio:
+            casos = self.casos(Path(diretorio), options["linhas_importacao"], total, maior_id, admin)
+            for nome, (preparar, linhas) in casos.items():
+                if prefixos and not nome.startswith(tuple(prefixos)):
+                    continue
+                resultado = _medir(preparar(), options["repeticoes"])
+                if linhas:
+                    resultado["linhas_por_s"] = round(linhas / resultado["mediana_ms"] * 1000)
+                resultados[nome] = resultado
+                self.stdout.write(
+                    f"{nome:<28}{resultado['mediana_ms']:>12.2f} ms"
+                    f"  (min {resultado['min_ms']:.2f}, max {resultado['max_ms']:.2f})"
+                )
+
+        relatorio = {
+            "gerado_em": timezone.now().isoformat(),
+            "commit": _commit_atual(),
+            "ambiente": {
+                "python": sys.version.split()[0],
+                "django": django.get_version(),
+                "banco": connection.vendor,
+            },
+            "banco": {
+                "patrimonios": total,
+                "inventariantes": Inventariante.objects.count(),
+            },
+            "parametros": {
+                "repeticoes": options["repeticoes"],
+                "linhas_importacao": options["linhas_importacao"],
+                "itens_por_pagina": settings.PATRIMONIO_ITENS_POR_PAGINA,
+            },
+            "resultados": resultados,
+        }
+        if options["saida"]:
+            options["saida"].write_text(json.dumps(relatorio, indent=2, ensure_ascii=False), encoding="utf-8")
+            self.stdout.write(self.style.SUCCESS(f"Resultado gravado em {options['saida']}."))
+
+        if base is not None:
+            self.comparar(base, relatorio, options["tolerancia"])
+
+    # ------------------------------------------------------
+    # Casos: nome → (função que prepara e devolve a medição,
+    # linhas processadas por execução, para vazão)
+    # ------------------------------------------------------
+    def casos(self, diretorio, linhas_importacao, total, maior_id, admin):
+        tamanho = settings.PATRIMONIO_ITENS_POR_PAGINA
+        meio = maior_id // 2
+        caminhos = {}
+
+        def todos():
+            return Patrimonio.objects.select_related("inventariante__user").order_by("id")
+
+        def arquivo(formato):
+            # Gerados só se algum caso de importação for executado, com
+            # tombos acima dos existentes (a gravação insere todas as linhas)
+            if not caminhos:
+                maior_tombo = Patrimonio.objects.aggregate(maior=Max("tombo"))["maior"] or 0
+                caminhos.update(escrever_arquivos(
+                    diretorio, linhas_importacao, ("csv", "xlsx"), tombo_inicial=maior_tombo + 1
+                ))
+            return caminhos[formato]
+
+        def validar(formato):
+            caminho = arquivo(formato)
+            return lambda: importar_planilha(caminho, None, modo="validar")
+
+        def gravar():
+            caminho = arquivo("csv")
+
+            def executar():
+                with transaction.atomic():
+                    usuario = User.objects.create(username="__benchmark_desempenho__")
+                    inventariante = Inventariante.objects.create(user=usuario, matricula="__benchmark__")
+                    importar_planilha(caminho, inventariante)
+                    transaction.set_rollback(True)
+            return executar
+
+        def pagina_offset():
+            paginator = Paginator(todos(), tamanho)
+            paginator.count = total
+            return lambda: list(paginator.page(max(total // tamanho // 2, 1)))
+
+        def listagem(parametros, cabecalhos, variar_cursor=False):
+            fabrica = RequestFactory()
+            aleatorio = random.Random(42)
+
+            def executar():
+                consulta = dict(parametros)
+                if variar_cursor:
+                    # Cursor diferente a cada execução: falta no cache
+                    consulta["apos"] = codificar_cursor([aleatorio.randrange(maior_id)])
+                request = fabrica.get(reverse("patrimonio_list"), consulta, **cabecalhos)
+                request.user = admin
+                request.papel = papel_do_usuario(admin)
+                response = patrimonio_list(request)
+                if response.status_code != 200:
+                    raise CommandError(f"Listagem respondeu {response.status_code}.")
+            return executar
+
+        return {
+            "importacao_csv_validar": (lambda: validar("csv"), linhas_importacao),
+            "importacao_xlsx_validar": (lambda: validar("xlsx"), linhas_importacao),
+            "importacao_csv_gravar": (gravar, linhas_importacao),
+            "busca_texto": (lambda: lambda: list(CONSULTAS_QUENTES["busca_texto"]()), None),
+            "busca_tombo": (lambda: lambda: list(CONSULTAS_QUENTES["busca_tombo"]()), None),
+            "paginacao_cursor_inicio": (lambda: lambda: list(paginar_por_cursor(todos(), tamanho)), None),
+            "paginacao_cursor_meio": (
+                lambda: lambda: list(paginar_por_cursor(todos(), tamanho, apos=codificar_cursor([meio]))),
+                None,
+            ),
+            "paginacao_offset_meio": (pagina_offset, None),
+            "exportacao_csv": (lambda: lambda: b"".join(exportar_csv(Patrimonio.objects.all())), total),
+            "listagem_fragmento_falta": (lambda: listagem({}, HX_TABELA, variar_cursor=True), None),
+            "listagem_fragmento_acerto": (lambda: listagem({}, HX_TABELA), None),
+            "listagem_pagina_completa": (lambda: listagem({}, {}), None),
+        }
+
+    def comparar(self, base, atual, tolerancia):
+        self.stdout.write(
+            f"\nComparação com {base.get('commit') or 'base'} "
+            f"({base.get('banco', {}).get('patrimonios')} patrimônios):"
+        )
+        regressoes = 0
+        for nome, resultado in atual["resultados"].items():
+            anterior = base.get("resultados", {}).get(nome)
+            if not anterior:
+                self.stdout.write(f"{nome:<28}{'—':>12}  (sem base)")
+                continue
+            variacao = (resultado["mediana_ms"] / anterior["mediana_ms"] - 1) * 100
+            linha = f"{nome:<28}{anterior['mediana_ms']:>10.2f} → {resultado['mediana_ms']:.2f} ms ({variacao:+.1f}%)"
+            if variacao > tolerancia:
+                regressoes += 1
+                self.stdout.write(self.style.WARNING(linha))
+            else:
+                self.stdout.write(linha)
+
+        if regressoes:
+            self.stdout.write(self.style.WARNING(f"{regressoes} caso(s) acima da tolerância de {tolerancia:.0f}%."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Nenhuma regressão acima da tolerância."))
@@ -0,0 +1,68 @@
+import tempfile
+import time
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.dados_sinteticos import escrever_arquivos
+from app.importacao import importar_planilha
+from app.models import Inventariante
+
+
+# ==========================================================
+# BENCHMARK DE IMPORTAÇÃO POR FORMATO
+# ----------------------------------------------------------
+# Gera o mesmo conjunto sintético de linhas (ver
+# app/dados_sinteticos.py) em XLSX, CSV, TSV e texto de
+# largura fixa e mede a vazão (linhas/s) de cada formato no
+# pipeline de importação.
+#
+# Por padrão mede leitura + validação (modo "validar").
+# Com --gravar, inclui a gravação no banco dentro de uma
+# transação que é desfeita ao final.
+#
+# Uso:
+#   python manage.py benchmark_importacao --linhas 80000
+# ==========================================================
+
+
+class Command(BaseCommand):
+    help = "Compara a vazão (linhas/s) da importação em XLSX, CSV, TSV e largura fixa."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--linhas", type=int, default=20000, help="Linhas por arquivo.")
+        parser.add_argument("--gravar", action="store_true", help="Inclui a gravação no banco (desfeita ao final).")
+
+    def handle(self, *args, **options):
+        quantidade = options["linhas"]
+
+        with tempfile.TemporaryDirectory() as diretorio:
+            self.stdout.write(f"Gerando {quantidade} linhas por formato...")
+            caminhos = escrever_arquivos(Path(diretorio), quantidade)
+
+            self.stdout.write(f"{'formato':<14}{'tamanho':>12}{'segundos':>10}{'linhas/s':>12}")
+            for formato, caminho in caminhos.items():
+                segundos, resumo = self.medir(caminho, options["gravar"])
+                self.stdout.write(
+                    f"{formato:<14}{caminho.stat().st_size // 1024:>10}KB"
+                    f"{segundos:>10.2f}{resumo.linhas_processadas / segundos:>12.0f}"
+                )
+
+    def medir(self, caminho, gravar):
+        if not gravar:
+            inicio = time.perf_counter()
+            resumo = importar_planilha(caminho, None, modo="validar")
+            return time.perf_counter() - inicio, resumo
+
+        with transaction.atomic():
+            usuario = User.objects.create(username="__benchmark_importacao__")
+            inventariante = Inventariante.objects.create(user=usuario, matricula="__benchmark__")
+
+            inicio = time.perf_counter()
+            resumo = importar_planilha(caminho, inventariante)
+            segundos = time.perf_counter() - inicio
+
+            transaction.set_rollback(True)
+        return segundos, resumo
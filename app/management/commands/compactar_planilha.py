@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from app.registros import caminho_planilha, compactar_registros, registros_pendentes
+
+
+# ==========================================================
+# COMPACTAÇÃO DE registros.xlsx
+# ----------------------------------------------------------
+# Materializa na planilha as linhas pendentes do log
+# RegistroPlanilha. Pode ser agendado (cron) ou executado
+# sob demanda.
+#
+# Uso:
+#   python manage.py compactar_planilha
+# ==========================================================
+class Command(BaseCommand):
+    help = "Materializa em registros.xlsx as linhas pendentes do log de registros."
+
+    def handle(self, *args, **options):
+        pendentes = registros_pendentes().count()
+        if not pendentes:
+            self.stdout.write("Nenhuma linha pendente.")
+            return
+
+        gravadas = compactar_registros()
+        self.stdout.write(self.style.SUCCESS(
+            f"{gravadas} linha(s) gravada(s) em {caminho_planilha()}."
+        ))
@@ -0,0 +1,52 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.campanhas import comparar_campanhas
+from app.models import Campanha
+
+
+# ==========================================================
+# COMPARAÇÃO ENTRE CAMPANHAS (ANO A ANO)
+# ----------------------------------------------------------
+# Lista os patrimônios perdidos e encontrados de uma campanha
+# encerrada para outra (por padrão, a campanha aberta).
+#
+# Uso:
+#   python manage.py comparar_campanhas 2025 [2026] [--csv diferencas.csv]
+# ==========================================================
+class Command(BaseCommand):
+    help = "Compara duas campanhas: patrimônios perdidos e encontrados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("anterior", type=int)
+        parser.add_argument("atual", type=int, nargs="?")
+        parser.add_argument("--csv", help="Grava as diferenças neste arquivo CSV.")
+
+    def _campanha(self, ano):
+        try:
+            return Campanha.objects.get(ano=ano)
+        except Campanha.DoesNotExist:
+            raise CommandError(f"Campanha {ano} não encontrada.")
+
+    def handle(self, *args, **options):
+        anterior = self._campanha(options["anterior"])
+        atual = self._campanha(options["atual"]) if options["atual"] else None
+
+        try:
+            comparacao = comparar_campanhas(anterior, atual)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options["csv"]:
+            with open(options["csv"], "w", newline="", encoding="utf-8-sig") as saida:
+                writer = csv.writer(saida, delimiter=";")
+                writer.writerow(["tombo", "diferenca", "setor", "situacao_anterior", "situacao_atual"])
+                for diferenca, linhas in (("perdido", comparacao.perdidos), ("encontrado", comparacao.encontrados)):
+                    for tombo, setor, antes, depois in linhas:
+                        writer.writerow([tombo, diferenca, setor or "", antes, depois])
+
+        destino = atual.ano if atual else "campanha aberta"
+        self.stdout.write(f"{anterior.ano} → {destino}:")
+        self.stdout.write(f"  perdidos: {len(comparacao.perdidos)}")
+        self.stdout.write(f"  encontrados: {len(comparacao.encontrados)}")
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.campanhas import encerrar_campanha
+
+
+# ==========================================================
+# ENCERRAMENTO DE CAMPANHA DE INVENTÁRIO
+# ----------------------------------------------------------
+# Arquiva a situação de cada patrimônio na campanha aberta
+# (ResultadoCampanha) e prepara a tabela de patrimônios para
+# a campanha seguinte (ver app/campanhas.py).
+#
+# Uso:
+#   python manage.py encerrar_campanha [--manter-situacao]
+# ==========================================================
+class Command(BaseCommand):
+    help = "Encerra a campanha aberta, arquivando os resultados por tombo."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--manter-situacao", action="store_true",
+            help="Não reinicia a situação dos patrimônios após arquivar.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            campanha = encerrar_campanha(reiniciar=not options["manter_situacao"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Campanha {campanha.ano} encerrada: {campanha.arquivados} resultado(s) arquivado(s)."
+        ))
@@ -0,0 +1,139 @@
+import random
+import time
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app.dados_sinteticos import (
+    FORMATOS, PREFIXO_USUARIO, escrever_arquivos, gerar_inventariantes, gerar_registros,
+)
+from app.exclusao import excluir_de_inventariantes
+from app.importacao import dividir_em_lotes
+from app.models import Inventariante, Patrimonio
+
+
+# ==========================================================
+# GERAÇÃO DE DADOS SINTÉTICOS
+# ----------------------------------------------------------
+# Popula o banco com inventariantes e patrimônios realistas
+# (ver app/dados_sinteticos.py) na escala de produção, para
+# benchmarks e testes de carga. A mesma semente gera sempre os
+# mesmos dados.
+#
+# - Usuários "sintetico0001"... sem senha utilizável
+# - Patrimônios inseridos com bulk_create, uma transação por
+#   lote; resumo, busca textual e versões são mantidos pelos
+#   triggers do SQLite
+# - Com --arquivos, grava também planilhas com as mesmas
+#   linhas (XLSX, CSV...) para testar a importação
+# - Com --limpar, remove os dados sintéticos existentes antes
+#   de gerar (ou apenas remove, com --patrimonios 0)
+#
+# Uso:
+#   python manage.py gerar_dados_sinteticos [--patrimonios 200000]
+#       [--inventariantes 300] [--semente 42] [--tombo-inicial 100000]
+#       [--arquivos DIR [--linhas N] [--formatos xlsx,csv]]
+#       [--sem-banco] [--limpar]
+# ==========================================================
+
+TAMANHO_LOTE = 5000
+
+
+class Command(BaseCommand):
+    help = "Gera inventariantes, patrimônios e planilhas sintéticos e determinísticos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--patrimonios", type=int, default=200000)
+        parser.add_argument("--inventariantes", type=int, default=300)
+        parser.add_argument("--semente", type=int, default=42)
+        parser.add_argument("--tombo-inicial", type=int, default=100000)
+        parser.add_argument("--arquivos", type=Path, metavar="DIR", help="Diretório das planilhas geradas.")
+        parser.add_argument(
+            "--linhas", type=int,
+            help="Linhas por planilha (padrão: o mesmo número de patrimônios).",
+        )
+        parser.add_argument(
+            "--formatos", default="xlsx,csv",
+            help=f"Formatos separados por vírgula ({', '.join(FORMATOS)}).",
+        )
+        parser.add_argument("--sem-banco", action="store_true", help="Apenas grava as planilhas.")
+        parser.add_argument("--limpar", action="store_true", help="Remove os dados sintéticos existentes.")
+
+    def handle(self, *args, **options):
+        formatos = [formato.strip() for formato in options["formatos"].split(",") if formato.strip()]
+        invalidos = set(formatos) - set(FORMATOS)
+        if invalidos:
+            raise CommandError(f"Formato(s) desconhecido(s): {', '.join(sorted(invalidos))}.")
+
+        if options["limpar"]:
+            self.limpar()
+
+        if not options["sem_banco"] and options["patrimonios"]:
+            self.popular(options)
+
+        if options["arquivos"]:
+            options["arquivos"].mkdir(parents=True, exist_ok=True)
+            linhas = options["linhas"] if options["linhas"] is not None else options["patrimonios"]
+            caminhos = escrever_arquivos(
+                options["arquivos"], linhas, formatos,
+                semente=options["semente"], tombo_inicial=options["tombo_inicial"], nome="patrimonios",
+            )
+            for caminho in caminhos.values():
+                self.stdout.write(f"{caminho} ({caminho.stat().st_size // 1024} KB, {linhas} linhas)")
+
+    def limpar(self):
+        sinteticos = Inventariante.objects.filter(user__username__startswith=PREFIXO_USUARIO)
+        excluidos = excluir_de_inventariantes(sinteticos.values_list("pk", flat=True))
+        usuarios, _ = User.objects.filter(username__startswith=PREFIXO_USUARIO).delete()
+        self.stdout.write(f"Removidos {excluidos} patrimônios e os objetos de {usuarios} usuários sintéticos.")
+
+    def popular(self, options):
+        quantidade = options["patrimonios"]
+        tombo_inicial = options["tombo_inicial"]
+        if Patrimonio.objects.filter(tombo__gte=tombo_inicial, tombo__lt=tombo_inicial + quantidade).exists():
+            raise CommandError(
+                f"Já existem tombos entre {tombo_inicial} e {tombo_inicial + quantidade - 1}: "
+                "use --limpar ou outro --tombo-inicial."
+            )
+        if User.objects.filter(username__startswith=PREFIXO_USUARIO).exists():
+            raise CommandError("Já existem usuários sintéticos: use --limpar.")
+
+        inicio = time.perf_counter()
+        with transaction.atomic():
+            inventariantes = []
+            for dados in gerar_inventariantes(max(options["inventariantes"], 1), options["semente"]):
+                usuario = User(**dados["user"])
+                usuario.set_unusable_password()
+                inventariantes.append((usuario, Inventariante(**dados["inventariante"])))
+            User.objects.bulk_create([usuario for usuario, _ in inventariantes])
+            usuarios = dict(
+                User.objects.filter(username__startswith=PREFIXO_USUARIO).values_list("username", "pk")
+            )
+            for usuario, inventariante in inventariantes:
+                inventariante.user_id = usuarios[usuario.username]
+            Inventariante.objects.bulk_create([inventariante for _, inventariante in inventariantes])
+            ids = list(
+                Inventariante.objects.filter(user_id__in=usuarios.values()).order_by("pk").values_list("pk", flat=True)
+            )
+
+        # Responsável sorteado com uma semente própria: os campos da
+        # planilha continuam iguais aos das planilhas geradas
+        aleatorio = random.Random(options["semente"] + 1)
+        registros = gerar_registros(quantidade, options["semente"], tombo_inicial)
+        inseridos = 0
+        for lote in dividir_em_lotes(registros, TAMANHO_LOTE):
+            with transaction.atomic():
+                Patrimonio.objects.bulk_create(
+                    [Patrimonio(**dados, inventariante_id=aleatorio.choice(ids)) for dados in lote]
+                )
+            inseridos += len(lote)
+            self.stdout.write(f"\r{inseridos}/{quantidade}", ending="")
+            self.stdout.flush()
+
+        segundos = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"\n{len(ids)} inventariantes e {inseridos} patrimônios gerados em {segundos:.1f} s "
+            f"({inseridos / segundos:.0f} linhas/s)."
+        ))
@@ -0,0 +1,117 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.importacao import EXTENSOES_ACEITAS, TAMANHO_LOTE_PADRAO
+from app.importacao_paralela import LINHAS_POR_TRANSACAO, importar_planilhas
+from app.models import Inventariante
+
+
+# ==========================================================
+# IMPORTAÇÃO DE VÁRIAS PLANILHAS PELA LINHA DE COMANDO
+# ----------------------------------------------------------
+# Alternativa ao upload pelo painel (um arquivo por vez, preso
+# à requisição) para as dezenas de planilhas enviadas de uma
+# vez pelos campi. Aceita arquivos e diretórios (arquivos com
+# extensão aceita no upload, sem percorrer subdiretórios).
+#
+# A leitura e a validação rodam em paralelo e a gravação em um
+# único processo, em transações grandes (ver
+# app/importacao_paralela.py). Cada arquivo aparece no
+# histórico de importações, com relatório de erros e a opção
+# de desfazer.
+#
+# Ao final de cada arquivo exibe as linhas processadas, a
+# vazão da leitura + validação e o tempo até a gravação.
+#
+# Uso:
+#   python manage.py import_planilhas DIR_OU_ARQUIVO [...]
+#       --inventariante MATRICULA [--modo inserir|atualizar|validar]
+#       [--processos N] [--linhas-por-transacao 50000]
+# ==========================================================
+
+
+def listar_arquivos(caminhos):
+    """Arquivos informados e os de cada diretório, em ordem, sem repetições."""
+    arquivos = []
+    for caminho in map(Path, caminhos):
+        if caminho.is_dir():
+            arquivos += sorted(
+                item for item in caminho.iterdir()
+                if item.is_file()
+                and item.suffix.lower() in EXTENSOES_ACEITAS
+                # Arquivos ocultos e de trava do Excel (~$planilha.xlsx)
+                and not item.name.startswith((".", "~$"))
+            )
+        elif caminho.is_file():
+            arquivos.append(caminho)
+        else:
+            raise CommandError(f"Arquivo ou diretório não encontrado: {caminho}")
+    return list(dict.fromkeys(arquivo.resolve() for arquivo in arquivos))
+
+
+class Command(BaseCommand):
+    help = "Importa várias planilhas em paralelo (leitura em processos, gravação única)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("caminhos", nargs="+", help="Planilhas ou diretórios de planilhas.")
+        parser.add_argument(
+            "--inventariante", required=True, metavar="MATRICULA",
+            help="Matrícula do inventariante ao qual os patrimônios serão vinculados.",
+        )
+        parser.add_argument("--modo", choices=["inserir", "atualizar", "validar"], default="inserir")
+        parser.add_argument("--processos", type=int, help="Processos de leitura (padrão: CPUs - 1).")
+        parser.add_argument("--tamanho-lote", type=int, default=TAMANHO_LOTE_PADRAO)
+        parser.add_argument(
+            "--linhas-por-transacao", type=int, default=LINHAS_POR_TRANSACAO,
+            help="Linhas gravadas por transação (valores menores liberam a trava de escrita mais cedo).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            inventariante = Inventariante.objects.get(matricula=options["inventariante"])
+        except Inventariante.DoesNotExist:
+            raise CommandError(f"Inventariante com matrícula {options['inventariante']} não encontrado.")
+
+        arquivos = listar_arquivos(options["caminhos"])
+        if not arquivos:
+            raise CommandError("Nenhuma planilha encontrada.")
+        self.stdout.write(f"{len(arquivos)} planilha(s), modo {options['modo']}.")
+
+        inicio = time.perf_counter()
+        resultados = importar_planilhas(
+            arquivos,
+            inventariante,
+            modo=options["modo"],
+            processos=options["processos"],
+            tamanho_lote=options["tamanho_lote"],
+            linhas_por_transacao=options["linhas_por_transacao"],
+            ao_confirmar=self.exibir,
+        )
+        segundos = time.perf_counter() - inicio
+
+        linhas = sum(arquivo.resumo.linhas_processadas for arquivo in resultados if not arquivo.mensagem_erro)
+        falhas = [arquivo for arquivo in resultados if arquivo.mensagem_erro]
+        resumo = f"{linhas} linhas em {segundos:.1f} s ({linhas / segundos:.0f} linhas/s)."
+        if falhas:
+            self.stdout.write(self.style.WARNING(f"{len(falhas)} planilha(s) com erro. {resumo}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Concluído: {resumo}"))
+
+    def exibir(self, arquivo):
+        nome = Path(arquivo.caminho).name
+        if arquivo.mensagem_erro:
+            self.stdout.write(self.style.ERROR(
+                f"{nome}: erro ({arquivo.mensagem_erro}); nada gravado [importação #{arquivo.importacao.pk}]"
+            ))
+            return
+
+        resumo = arquivo.resumo
+        self.stdout.write(
+            f"{nome}: {resumo.linhas_processadas} linhas, {arquivo.linhas_por_segundo:.0f} linhas/s "
+            f"na leitura ({arquivo.segundos_leitura:.1f} s), gravado em {arquivo.segundos:.1f} s — "
+            f"inseridos {resumo.inseridos}, atualizados {resumo.atualizados}, "
+            f"inalterados {resumo.inalterados}, rejeitados {resumo.rejeitados} "
+            f"[importação #{arquivo.importacao.pk}]"
+        )
@@ -0,0 +1,109 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+# ==========================================================
+# MANUTENÇÃO DO BANCO SQLITE
+# ----------------------------------------------------------
+# Rotina para agendar (cron) fora do horário de uso:
+#
+# 1. ANALYZE (com --analyze) ou PRAGMA optimize: estatísticas
+#    para o planejador escolher os índices
+# 2. PRAGMA incremental_vacuum: devolve ao sistema as páginas
+#    livres deixadas por exclusões (requer auto_vacuum
+#    incremental, ativado uma única vez com --ativar-auto-vacuum,
+#    que reescreve o arquivo com VACUUM)
+# 3. wal_checkpoint(TRUNCATE): incorpora o WAL ao banco e
+#    zera o arquivo -wal
+#
+# Uso:
+#   python manage.py manutencao_sqlite [--analyze]
+#       [--vacuum-paginas N] [--ativar-auto-vacuum] [--verificar]
+# ==========================================================
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class Command(BaseCommand):
+    help = "Atualiza estatísticas, libera páginas livres e faz checkpoint do WAL."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--analyze", action="store_true",
+            help="Executa ANALYZE completo em vez de PRAGMA optimize.",
+        )
+        parser.add_argument(
+            "--vacuum-paginas", type=int, default=0, metavar="N",
+            help="Máximo de páginas liberadas pelo vacuum incremental (0 = todas).",
+        )
+        parser.add_argument(
+            "--ativar-auto-vacuum", action="store_true",
+            help="Ativa auto_vacuum incremental e reescreve o banco (VACUUM).",
+        )
+        parser.add_argument(
+            "--verificar", action="store_true",
+            help="Executa PRAGMA quick_check ao final.",
+        )
+
+    def _estado(self, cursor):
+        estado = {}
+        for pragma in ("page_size", "page_count", "freelist_count", "auto_vacuum"):
+            cursor.execute(f"PRAGMA {pragma}")
+            estado[pragma] = cursor.fetchone()[0]
+        return estado
+
+    def _descrever(self, rotulo, estado):
+        tamanho = estado["page_size"] * estado["page_count"] / 1024 / 1024
+        livres = estado["page_size"] * estado["freelist_count"] / 1024 / 1024
+        self.stdout.write(f"{rotulo}: {tamanho:.1f} MiB, {livres:.1f} MiB em páginas livres")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Manutenção disponível apenas no SQLite.")
+
+        with connection.cursor() as cursor:
+            antes = self._estado(cursor)
+            self._descrever("Antes", antes)
+
+            if options["ativar_auto_vacuum"] and antes["auto_vacuum"] != AUTO_VACUUM_INCREMENTAL:
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                cursor.execute("VACUUM")
+                self.stdout.write("auto_vacuum incremental ativado (VACUUM concluído).")
+
+            if options["analyze"]:
+                cursor.execute("ANALYZE")
+                self.stdout.write("ANALYZE concluído.")
+            else:
+                cursor.execute("PRAGMA optimize")
+                self.stdout.write("PRAGMA optimize concluído.")
+
+            if self._estado(cursor)["auto_vacuum"] == AUTO_VACUUM_INCREMENTAL:
+                paginas = options["vacuum_paginas"]
+                cursor.execute(f"PRAGMA incremental_vacuum({paginas})" if paginas else "PRAGMA incremental_vacuum")
+                cursor.fetchall()
+            else:
+                self.stdout.write(self.style.WARNING(
+                    "auto_vacuum incremental desativado: páginas livres mantidas "
+                    "(use --ativar-auto-vacuum uma vez)."
+                ))
+
+            cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            ocupado, _paginas_wal, _copiadas = cursor.fetchone()
+            if ocupado:
+                self.stdout.write(self.style.WARNING("Checkpoint parcial: havia leitores ativos."))
+
+            self._descrever("Depois", self._estado(cursor))
+
+            if options["verificar"]:
+                cursor.execute("PRAGMA quick_check")
+                resultado = [linha[0] for linha in cursor.fetchall()]
+                if resultado != ["ok"]:
+                    raise CommandError("quick_check: " + "; ".join(resultado[:10]))
+                self.stdout.write("quick_check: ok")
+
+        nome = connection.settings_dict["NAME"]
+        if os.path.exists(f"{nome}-wal"):
+            self.stdout.write(f"WAL: {os.path.getsize(f'{nome}-wal') / 1024:.0f} KiB")
+        self.stdout.write(self.style.SUCCESS("Manutenção concluída."))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from app.contadores import reconciliar
+
+
+# ==========================================================
+# RECONCILIAÇÃO DOS CONTADORES DE PATRIMÔNIO
+# ----------------------------------------------------------
+# Compara ResumoInventario (quantidade e valor por dimensão)
+# com a agregação real da tabela app_patrimonio e corrige as
+# divergências encontradas.
+#
+# Uso:
+#   python manage.py reconciliar_contadores [--verificar]
+# ==========================================================
+class Command(BaseCommand):
+    help = "Verifica e corrige o resumo do inventário (contadores por dimensão e situação)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verificar", action="store_true",
+            help="Apenas lista as divergências, sem corrigir.",
+        )
+
+    def handle(self, *args, **options):
+        divergencias = reconciliar(corrigir=not options["verificar"])
+
+        if not divergencias:
+            self.stdout.write(self.style.SUCCESS("Contadores consistentes."))
+            return
+
+        for dimensao, chave, situacao, contador, real in divergencias:
+            self.stdout.write(
+                f"{dimensao} {chave!r} / {situacao}: contador={contador} real={real}"
+            )
+
+        if options["verificar"]:
+            self.stdout.write(self.style.WARNING(f"{len(divergencias)} divergência(s) encontrada(s)."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(divergencias)} contador(es) corrigido(s)."))
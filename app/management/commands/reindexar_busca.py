@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from app.busca import TABELA_FTS, fts_disponivel
+
+
+# ==========================================================
+# RECONSTRUÇÃO DO ÍNDICE DE BUSCA
+# ----------------------------------------------------------
+# Recria o índice FTS5 a partir da tabela app_patrimonio.
+# Útil após restaurar um backup ou alterar dados por fora
+# do banco (os triggers mantêm o índice no uso normal).
+#
+# Uso:
+#   python manage.py reindexar_busca [--otimizar]
+# ==========================================================
+class Command(BaseCommand):
+    help = "Reconstrói o índice de texto completo (FTS5) dos patrimônios."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--otimizar", action="store_true",
+            help="Funde os segmentos do índice após a reconstrução.",
+        )
+
+    def handle(self, *args, **options):
+        if not fts_disponivel():
+            raise CommandError("Índice FTS5 indisponível neste banco de dados.")
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')")
+            if options["otimizar"]:
+                cursor.execute(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('optimize')")
+            cursor.execute(f"SELECT count(*) FROM {TABELA_FTS}")
+            total = cursor.fetchone()[0]
+
+        self.stdout.write(self.style.SUCCESS(f"Índice reconstruído: {total} patrimônio(s)."))
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from app.plano_consultas import CONSULTAS_QUENTES, verificar_consultas
+
+
+# ==========================================================
+# VERIFICAÇÃO DOS PLANOS DAS CONSULTAS FREQUENTES
+# ----------------------------------------------------------
+# Executa EXPLAIN QUERY PLAN em cada consulta registrada em
+# app/plano_consultas.py e falha (código de saída 1) se alguma
+# passar a varrer uma tabela inteira. Útil em CI e depois de
+# alterar modelos, índices ou as próprias consultas.
+#
+# Uso:
+#   python manage.py verificar_indices [--consulta NOME ...]
+#       [--benchmark 20] [--plano]
+# ==========================================================
+class Command(BaseCommand):
+    help = "Verifica se as consultas frequentes usam índices (EXPLAIN QUERY PLAN)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--consulta", action="append", choices=sorted(CONSULTAS_QUENTES),
+            help="Verifica apenas esta consulta (pode ser repetido).",
+        )
+        parser.add_argument(
+            "--benchmark", type=int, default=0, metavar="N",
+            help="Executa cada consulta N vezes e informa o tempo mediano.",
+        )
+        parser.add_argument(
+            "--plano", action="store_true",
+            help="Exibe o plano completo de cada consulta.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Verificação disponível apenas no SQLite.")
+
+        planos = verificar_consultas(options["consulta"], options["benchmark"])
+
+        regressoes = []
+        for plano in planos:
+            observacoes = []
+            if plano.varreduras:
+                observacoes.append(f"varredura completa: {', '.join(plano.varreduras)}")
+                regressoes.append(plano.nome)
+            if plano.ordenacao_temporaria:
+                observacoes.append("ordenação temporária")
+            if plano.tempo_ms is not None:
+                observacoes.append(f"{plano.tempo_ms} ms")
+
+            estilo = self.style.ERROR if plano.varreduras else self.style.SUCCESS
+            self.stdout.write(estilo(f"{plano.nome}: {'; '.join(observacoes) or 'ok'}"))
+            if options["plano"]:
+                for linha in plano.linhas:
+                    self.stdout.write(f"    {linha}")
+
+        if regressoes:
+            raise CommandError(f"Consulta(s) sem índice: {', '.join(regressoes)}.")
+        self.stdout.write(self.style.SUCCESS(f"{len(planos)} consulta(s) verificada(s)."))
@@ -0,0 +1,20 @@
+# ==========================================================
+# SQL ESPECÍFICO DO SQLITE NAS MIGRAÇÕES
+# ----------------------------------------------------------
+# Triggers e tabelas virtuais (FTS5) criados pelas migrações
+# existem apenas no SQLite; nos demais bancos a operação não
+# faz nada e a aplicação usa os caminhos genéricos.
+#
+# Módulo sem dependências de models: as migrações o importam
+# em vez de importarem umas às outras.
+# ==========================================================
+
+
+def executar(comandos):
+    """Operação de RunPython que executa os comandos SQL em ordem (apenas no SQLite)."""
+    def operacao(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in comandos:
+            schema_editor.execute(sql)
+    return operacao
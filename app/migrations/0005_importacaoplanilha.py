@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_remove_patrimonio_patrimonio_patrimonio_tombo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportacaoPlanilha',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('arquivo', models.CharField(max_length=255)),
+                ('nome_original', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('pendente', 'Na fila'), ('processando', 'Processando'), ('concluida', 'Concluída'), ('erro', 'Erro')], default='pendente', max_length=20)),
+                ('linhas_processadas', models.PositiveIntegerField(default=0)),
+                ('inseridos', models.PositiveIntegerField(default=0)),
+                ('ignorados', models.PositiveIntegerField(default=0)),
+                ('rejeitados', models.PositiveIntegerField(default=0)),
+                ('mensagem_erro', models.TextField(blank=True)),
+                ('data_criacao', models.DateTimeField(auto_now_add=True)),
+                ('data_inicio', models.DateTimeField(blank=True, null=True)),
+                ('data_conclusao', models.DateTimeField(blank=True, null=True)),
+                ('inventariante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='importacoes', to='app.inventariante')),
+            ],
+        ),
+    ]
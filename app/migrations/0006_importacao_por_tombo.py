@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_importacaoplanilha'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importacaoplanilha',
+            name='atualizados',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='importacaoplanilha',
+            name='inalterados',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='importacaoplanilha',
+            name='modo',
+            field=models.CharField(choices=[('inserir', 'Inserir novos'), ('atualizar', 'Atualizar por tombo')], default='inserir', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='patrimonio',
+            name='hash_linha',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+    ]
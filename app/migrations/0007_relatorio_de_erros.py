@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_importacao_por_tombo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importacaoplanilha',
+            name='relatorio_erros',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='importacaoplanilha',
+            name='modo',
+            field=models.CharField(choices=[('inserir', 'Inserir novos'), ('atualizar', 'Atualizar por tombo'), ('validar', 'Somente validar')], default='inserir', max_length=20),
+        ),
+    ]
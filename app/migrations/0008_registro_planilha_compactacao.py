@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_relatorio_de_erros'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registroplanilha',
+            name='compactado_em',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,71 @@
+from django.db import migrations
+
+from app.migracoes_sql import executar
+
+
+# ==========================================================
+# ÍNDICE DE TEXTO COMPLETO (SQLite FTS5)
+# ----------------------------------------------------------
+# Tabela FTS5 de conteúdo externo sobre app_patrimonio,
+# mantida por triggers. Como a sincronização é feita no
+# próprio banco, inserções em lote (bulk_create/bulk_update
+# da importação) também atualizam o índice.
+#
+# O tokenizador unicode61 com remove_diacritics 2 torna a
+# busca insensível a acentos ("nao" encontra "Não").
+#
+# Em outros bancos a migração não faz nada e a busca usa o
+# filtro icontains (ver app/busca.py).
+# ==========================================================
+
+COLUNAS = "tombo, descricao, setor, dependencia, fornecedor, numero_documento, conta_contabil"
+NOVOS = ", ".join(f"new.{coluna}" for coluna in COLUNAS.split(", "))
+ANTIGOS = ", ".join(f"old.{coluna}" for coluna in COLUNAS.split(", "))
+
+CRIAR = [
+    f"""
+    CREATE VIRTUAL TABLE app_patrimonio_fts USING fts5(
+        {COLUNAS},
+        content='app_patrimonio',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER app_patrimonio_fts_ai AFTER INSERT ON app_patrimonio BEGIN
+        INSERT INTO app_patrimonio_fts(rowid, {COLUNAS}) VALUES (new.id, {NOVOS});
+    END
+    """,
+    f"""
+    CREATE TRIGGER app_patrimonio_fts_ad AFTER DELETE ON app_patrimonio BEGIN
+        INSERT INTO app_patrimonio_fts(app_patrimonio_fts, rowid, {COLUNAS})
+        VALUES ('delete', old.id, {ANTIGOS});
+    END
+    """,
+    f"""
+    CREATE TRIGGER app_patrimonio_fts_au AFTER UPDATE OF {COLUNAS} ON app_patrimonio BEGIN
+        INSERT INTO app_patrimonio_fts(app_patrimonio_fts, rowid, {COLUNAS})
+        VALUES ('delete', old.id, {ANTIGOS});
+        INSERT INTO app_patrimonio_fts(rowid, {COLUNAS}) VALUES (new.id, {NOVOS});
+    END
+    """,
+    "INSERT INTO app_patrimonio_fts(app_patrimonio_fts) VALUES ('rebuild')",
+]
+
+REMOVER = [
+    "DROP TRIGGER IF EXISTS app_patrimonio_fts_au",
+    "DROP TRIGGER IF EXISTS app_patrimonio_fts_ad",
+    "DROP TRIGGER IF EXISTS app_patrimonio_fts_ai",
+    "DROP TABLE IF EXISTS app_patrimonio_fts",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_registro_planilha_compactacao'),
+    ]
+
+    operations = [
+        migrations.RunPython(executar(CRIAR), executar(REMOVER)),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from app.migracoes_sql import executar
+
+
+# ==========================================================
+# CONTADORES DE PATRIMÔNIO MANTIDOS POR TRIGGERS (SQLite)
+# ----------------------------------------------------------
+# Cada inserção, exclusão, troca de inventariante ou de
+# situação em app_patrimonio ajusta app_contadorpatrimonio
+# na mesma instrução (e portanto na mesma transação),
+# incluindo gravações em lote da importação.
+#
+# Linhas que chegam a zero são removidas.
+# ==========================================================
+
+INCREMENTAR = """
+    INSERT INTO app_contadorpatrimonio(inventariante_id, situacao, total)
+    VALUES ({linha}.inventariante_id, {linha}.situacao, 1)
+    ON CONFLICT(inventariante_id, situacao) DO UPDATE SET total = total + 1;
+"""
+
+DECREMENTAR = """
+    UPDATE app_contadorpatrimonio SET total = total - 1
+    WHERE inventariante_id = {linha}.inventariante_id AND situacao = {linha}.situacao;
+    DELETE FROM app_contadorpatrimonio
+    WHERE inventariante_id = {linha}.inventariante_id AND situacao = {linha}.situacao AND total <= 0;
+"""
+
+CRIAR = [
+    f"""
+    CREATE TRIGGER app_contadorpatrimonio_ai AFTER INSERT ON app_patrimonio BEGIN
+        {INCREMENTAR.format(linha="new")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER app_contadorpatrimonio_ad AFTER DELETE ON app_patrimonio BEGIN
+        {DECREMENTAR.format(linha="old")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER app_contadorpatrimonio_au AFTER UPDATE OF inventariante_id, situacao ON app_patrimonio
+    WHEN old.inventariante_id IS NOT new.inventariante_id OR old.situacao IS NOT new.situacao
+    BEGIN
+        {DECREMENTAR.format(linha="old")}
+        {INCREMENTAR.format(linha="new")}
+    END
+    """,
+    """
+    INSERT INTO app_contadorpatrimonio(inventariante_id, situacao, total)
+    SELECT inventariante_id, situacao, COUNT(*) FROM app_patrimonio
+    GROUP BY inventariante_id, situacao
+    """,
+]
+
+REMOVER = [
+    "DROP TRIGGER IF EXISTS app_contadorpatrimonio_au",
+    "DROP TRIGGER IF EXISTS app_contadorpatrimonio_ad",
+    "DROP TRIGGER IF EXISTS app_contadorpatrimonio_ai",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_patrimonio_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorPatrimonio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('situacao', models.CharField(choices=[('localizado', 'Localizado'), ('nao_localizado', 'Não Localizado'), ('calamidade', 'Perda por Calamidade')], max_length=20)),
+                ('total', models.IntegerField(default=0)),
+                ('inventariante', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='contadores', to='app.inventariante')),
+            ],
+            options={
+                'unique_together': {('inventariante', 'situacao')},
+            },
+        ),
+        migrations.RunPython(executar(CRIAR), executar(REMOVER)),
+    ]
@@ -0,0 +1,175 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from app.migracoes_sql import executar
+
+
+# ==========================================================
+# RESUMO DO INVENTÁRIO MANTIDO POR TRIGGERS (SQLite)
+# ----------------------------------------------------------
+# Substitui os contadores da migração 0010 por uma tabela de
+# resumo mais ampla: quantidade e soma de valor por situação,
+# no total e por setor, dependência e inventariante.
+#
+# Cada escrita em app_patrimonio (inclusive em lote) ajusta as
+# quatro linhas afetadas na mesma instrução. Linhas que chegam
+# a zero são removidas.
+# ==========================================================
+
+# Contadores da migração 0010 (triggers removidos aqui e
+# recriados ao desfazer a migração). Cópia do SQL de 0010: as
+# migrações não importam umas às outras.
+INCREMENTAR_CONTADOR = """
+    INSERT INTO app_contadorpatrimonio(inventariante_id, situacao, total)
+    VALUES ({linha}.inventariante_id, {linha}.situacao, 1)
+    ON CONFLICT(inventariante_id, situacao) DO UPDATE SET total = total + 1;
+"""
+
+DECREMENTAR_CONTADOR = """
+    UPDATE app_contadorpatrimonio SET total = total - 1
+    WHERE inventariante_id = {linha}.inventariante_id AND situacao = {linha}.situacao;
+    DELETE FROM app_contadorpatrimonio
+    WHERE inventariante_id = {linha}.inventariante_id AND situacao = {linha}.situacao AND total <= 0;
+"""
+
+CRIAR_CONTADORES = [
+    f"""
+    CREATE TRIGGER app_contadorpatrimonio_ai AFTER INSERT ON app_patrimonio BEGIN
+        {INCREMENTAR_CONTADOR.format(linha="new")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER app_contadorpatrimonio_ad AFTER DELETE ON app_patrimonio BEGIN
+        {DECREMENTAR_CONTADOR.format(linha="old")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER app_contadorpatrimonio_au AFTER UPDATE OF inventariante_id, situacao ON app_patrimonio
+    WHEN old.inventariante_id IS NOT new.inventariante_id OR old.situacao IS NOT new.situacao
+    BEGIN
+        {DECREMENTAR_CONTADOR.format(linha="old")}
+        {INCREMENTAR_CONTADOR.format(linha="new")}
+    END
+    """,
+    """
+    INSERT INTO app_contadorpatrimonio(inventariante_id, situacao, total)
+    SELECT inventariante_id, situacao, COUNT(*) FROM app_patrimonio
+    GROUP BY inventariante_id, situacao
+    """,
+]
+
+REMOVER_CONTADORES = [
+    "DROP TRIGGER IF EXISTS app_contadorpatrimonio_au",
+    "DROP TRIGGER IF EXISTS app_contadorpatrimonio_ad",
+    "DROP TRIGGER IF EXISTS app_contadorpatrimonio_ai",
+]
+
+DIMENSOES = """
+    ('total', '', {linha}.situacao, NULL, {sinal}1, {sinal}COALESCE({linha}.valor, 0)),
+    ('setor', COALESCE({linha}.setor, ''), {linha}.situacao, NULL, {sinal}1, {sinal}COALESCE({linha}.valor, 0)),
+    ('dependencia', COALESCE({linha}.dependencia, ''), {linha}.situacao, NULL, {sinal}1, {sinal}COALESCE({linha}.valor, 0)),
+    ('inventariante', CAST({linha}.inventariante_id AS TEXT), {linha}.situacao,
+     {linha}.inventariante_id, {sinal}1, {sinal}COALESCE({linha}.valor, 0))
+"""
+
+APLICAR = """
+    INSERT INTO app_resumoinventario(dimensao, chave, situacao, inventariante_id, quantidade, valor)
+    VALUES {dimensoes}
+    ON CONFLICT(dimensao, chave, situacao) DO UPDATE SET
+        quantidade = quantidade + excluded.quantidade,
+        valor = valor + excluded.valor;
+"""
+
+LIMPAR = """
+    DELETE FROM app_resumoinventario
+    WHERE quantidade <= 0 AND situacao = {linha}.situacao AND (dimensao, chave) IN (VALUES
+        ('total', ''),
+        ('setor', COALESCE({linha}.setor, '')),
+        ('dependencia', COALESCE({linha}.dependencia, '')),
+        ('inventariante', CAST({linha}.inventariante_id AS TEXT))
+    );
+"""
+
+
+def incrementar(linha):
+    return APLICAR.format(dimensoes=DIMENSOES.format(linha=linha, sinal=""))
+
+
+def decrementar(linha):
+    return APLICAR.format(dimensoes=DIMENSOES.format(linha=linha, sinal="-")) + LIMPAR.format(linha=linha)
+
+
+COLUNAS = "situacao, valor, setor, dependencia, inventariante_id"
+
+CRIAR = [
+    f"""
+    CREATE TRIGGER app_resumoinventario_ai AFTER INSERT ON app_patrimonio BEGIN
+        {incrementar("new")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER app_resumoinventario_ad AFTER DELETE ON app_patrimonio BEGIN
+        {decrementar("old")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER app_resumoinventario_au AFTER UPDATE OF {COLUNAS} ON app_patrimonio
+    WHEN {" OR ".join(f"old.{coluna} IS NOT new.{coluna}" for coluna in COLUNAS.split(", "))}
+    BEGIN
+        {decrementar("old")}
+        {incrementar("new")}
+    END
+    """,
+    """
+    INSERT INTO app_resumoinventario(dimensao, chave, situacao, inventariante_id, quantidade, valor)
+    SELECT 'total', '', situacao, NULL, COUNT(*), COALESCE(SUM(valor), 0)
+    FROM app_patrimonio GROUP BY situacao
+    UNION ALL
+    SELECT 'setor', COALESCE(setor, ''), situacao, NULL, COUNT(*), COALESCE(SUM(valor), 0)
+    FROM app_patrimonio GROUP BY COALESCE(setor, ''), situacao
+    UNION ALL
+    SELECT 'dependencia', COALESCE(dependencia, ''), situacao, NULL, COUNT(*), COALESCE(SUM(valor), 0)
+    FROM app_patrimonio GROUP BY COALESCE(dependencia, ''), situacao
+    UNION ALL
+    SELECT 'inventariante', CAST(inventariante_id AS TEXT), situacao, inventariante_id, COUNT(*), COALESCE(SUM(valor), 0)
+    FROM app_patrimonio GROUP BY inventariante_id, situacao
+    """,
+]
+
+REMOVER = [
+    "DROP TRIGGER IF EXISTS app_resumoinventario_au",
+    "DROP TRIGGER IF EXISTS app_resumoinventario_ad",
+    "DROP TRIGGER IF EXISTS app_resumoinventario_ai",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_contadorpatrimonio'),
+    ]
+
+    operations = [
+        migrations.RunPython(executar(REMOVER_CONTADORES), executar(CRIAR_CONTADORES)),
+        migrations.CreateModel(
+            name='ResumoInventario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimensao', models.CharField(choices=[('total', 'Total'), ('setor', 'Setor'), ('dependencia', 'Dependência'), ('inventariante', 'Inventariante')], max_length=20)),
+                ('chave', models.CharField(blank=True, default='', max_length=100)),
+                ('situacao', models.CharField(choices=[('localizado', 'Localizado'), ('nao_localizado', 'Não Localizado'), ('calamidade', 'Perda por Calamidade')], max_length=20)),
+                ('quantidade', models.IntegerField(default=0)),
+                ('valor', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('inventariante', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='app.inventariante')),
+            ],
+            options={
+                'unique_together': {('dimensao', 'chave', 'situacao')},
+            },
+        ),
+        migrations.RunPython(executar(CRIAR), executar(REMOVER)),
+        migrations.DeleteModel(
+            name='ContadorPatrimonio',
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:06
+
+from django.db import migrations, models
+
+from app.migracoes_sql import executar
+
+
+# ==========================================================
+# VERSÃO DOS DADOS POR TABELA MANTIDA POR TRIGGERS (SQLite)
+# ----------------------------------------------------------
+# Qualquer escrita (inclusive em lote) incrementa a versão da
+# tabela e registra o instante da alteração:
+#
+# - patrimonio: app_patrimonio
+# - inventariante: app_inventariante
+# - usuario: auth_user, apenas colunas exibidas nas listagens
+#   (o last_login gravado a cada login não conta)
+# ==========================================================
+
+INCREMENTAR = """
+    UPDATE app_versaotabela
+    SET versao = versao + 1, atualizado_em = strftime('%Y-%m-%d %H:%M:%f', 'now')
+    WHERE tabela = '{nome}';
+"""
+
+TABELAS = {
+    "patrimonio": ("app_patrimonio", ""),
+    "inventariante": ("app_inventariante", ""),
+    "usuario": ("auth_user", " OF username, first_name, last_name, is_superuser"),
+}
+
+CRIAR = [
+    "INSERT INTO app_versaotabela(tabela, versao, atualizado_em) VALUES "
+    + ", ".join(f"('{nome}', 1, strftime('%Y-%m-%d %H:%M:%f', 'now'))" for nome in TABELAS),
+]
+REMOVER = []
+
+for nome, (tabela, colunas) in TABELAS.items():
+    for sufixo, evento in (("ai", "INSERT"), ("ad", "DELETE"), ("au", f"UPDATE{colunas}")):
+        CRIAR.append(f"""
+        CREATE TRIGGER app_versaotabela_{nome}_{sufixo} AFTER {evento} ON {tabela} BEGIN
+            {INCREMENTAR.format(nome=nome)}
+        END
+        """)
+        REMOVER.append(f"DROP TRIGGER IF EXISTS app_versaotabela_{nome}_{sufixo}")
+
+
+class Migration(migrations.Migration):
+
+    # auth_user recebe triggers: todas as alterações de auth que
+    # reconstroem a tabela precisam ter sido aplicadas antes.
+    dependencies = [
+        ('app', '0011_resumo_inventario'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersaoTabela',
+            fields=[
+                ('tabela', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('versao', models.PositiveBigIntegerField(default=0)),
+                ('atualizado_em', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(executar(CRIAR), executar(REMOVER)),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+from app.migracoes_sql import executar
+
+
+# ==========================================================
+# VERSÃO DE USUÁRIOS: INCLUI O E-MAIL
+# ----------------------------------------------------------
+# A listagem de inventariantes exibe o e-mail do usuário, e a
+# versão passa a validar respostas HTTP (ETag): o trigger de
+# alteração de auth_user também observa a coluna email.
+# ==========================================================
+
+# Mesmo incremento dos triggers da migração 0012.
+INCREMENTAR = """
+    UPDATE app_versaotabela
+    SET versao = versao + 1, atualizado_em = strftime('%Y-%m-%d %H:%M:%f', 'now')
+    WHERE tabela = '{nome}';
+"""
+
+
+def trigger_usuario(colunas):
+    return f"""
+    CREATE TRIGGER app_versaotabela_usuario_au AFTER UPDATE OF {colunas} ON auth_user BEGIN
+        {INCREMENTAR.format(nome="usuario")}
+    END
+    """
+
+
+REMOVER = ["DROP TRIGGER IF EXISTS app_versaotabela_usuario_au"]
+CRIAR = REMOVER + [trigger_usuario("username, first_name, last_name, email, is_superuser")]
+DESFAZER = REMOVER + [trigger_usuario("username, first_name, last_name, is_superuser")]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_versao_tabela'),
+    ]
+
+    operations = [
+        migrations.RunPython(executar(CRIAR), executar(DESFAZER)),
+    ]
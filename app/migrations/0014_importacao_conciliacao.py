@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_versao_tabela_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importacaoplanilha',
+            name='divergentes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='importacaoplanilha',
+            name='relatorio_conciliacao',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='importacaoplanilha',
+            name='somente_planilha',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='importacaoplanilha',
+            name='somente_sistema',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='importacaoplanilha',
+            name='modo',
+            field=models.CharField(choices=[('inserir', 'Inserir novos'), ('atualizar', 'Atualizar por tombo'), ('validar', 'Somente validar'), ('conciliar', 'Conciliar com o sistema')], default='inserir', max_length=20),
+        ),
+    ]
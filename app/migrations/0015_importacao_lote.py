@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_importacao_conciliacao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patrimonio',
+            name='importacao',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='patrimonios', to='app.importacaoplanilha'),
+        ),
+        migrations.AlterField(
+            model_name='importacaoplanilha',
+            name='status',
+            field=models.CharField(choices=[('pendente', 'Na fila'), ('processando', 'Processando'), ('concluida', 'Concluída'), ('erro', 'Erro'), ('desfeita', 'Desfeita')], default='pendente', max_length=20),
+        ),
+    ]
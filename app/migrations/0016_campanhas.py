@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0015_importacao_lote'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Campanha',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ano', models.PositiveSmallIntegerField(unique=True)),
+                ('data_abertura', models.DateTimeField(auto_now_add=True)),
+                ('data_encerramento', models.DateTimeField(blank=True, null=True)),
+                ('arquivados', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-ano'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResultadoCampanha',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tombo', models.IntegerField()),
+                ('situacao', models.CharField(choices=[('localizado', 'Localizado'), ('nao_localizado', 'Não Localizado'), ('calamidade', 'Perda por Calamidade')], max_length=20)),
+                ('data_inventario', models.DateField(blank=True, null=True)),
+                ('setor', models.CharField(blank=True, max_length=100, null=True)),
+                ('valor', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('campanha', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resultados', to='app.campanha')),
+                ('inventariante', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='app.inventariante')),
+            ],
+            options={
+                'unique_together': {('campanha', 'tombo')},
+            },
+        ),
+    ]
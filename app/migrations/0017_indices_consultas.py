@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0016_campanhas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='registroplanilha',
+            name='compactado_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='patrimonio',
+            index=models.Index(fields=['situacao'], name='patrimonio_situacao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patrimonio',
+            index=models.Index(fields=['setor', 'situacao'], name='patrimonio_setor_sit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patrimonio',
+            index=models.Index(fields=['conta_contabil'], name='patrimonio_conta_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registroplanilha',
+            index=models.Index(condition=models.Q(('compactado_em__isnull', True)), fields=['id'], name='registro_pendente_idx'),
+        ),
+    ]
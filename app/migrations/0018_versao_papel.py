@@ -0,0 +1,66 @@
+from django.db import migrations
+
+from app.migracoes_sql import executar
+
+
+# ==========================================================
+# VERSÃO DOS PAPÉIS (SQLite)
+# ----------------------------------------------------------
+# Nova linha "papel" em VersaoTabela, incrementada por toda
+# escrita que pode mudar o papel de algum usuário:
+#
+# - app_inventariante: vínculo com o usuário e presidente
+# - auth_user: superusuário (e exclusão)
+# - auth_user_groups: entrada e saída de grupos
+# - auth_group: nome (o grupo "Presidente") e exclusão
+#
+# A versão entra na chave do papel em cache
+# (app/autorizacao.py): a alteração vale em todos os
+# processos, mesmo com cache local e escritas em lote.
+# ==========================================================
+
+# Mesmo incremento dos triggers da migração 0012.
+INCREMENTAR = """
+    UPDATE app_versaotabela
+    SET versao = versao + 1, atualizado_em = strftime('%Y-%m-%d %H:%M:%f', 'now')
+    WHERE tabela = 'papel';
+"""
+
+TRIGGERS = {
+    "inventariante_ai": "INSERT ON app_inventariante",
+    "inventariante_ad": "DELETE ON app_inventariante",
+    "inventariante_au": "UPDATE OF user_id, presidente ON app_inventariante",
+    "usuario_ad": "DELETE ON auth_user",
+    "usuario_au": "UPDATE OF is_superuser ON auth_user",
+    "grupos_ai": "INSERT ON auth_user_groups",
+    "grupos_ad": "DELETE ON auth_user_groups",
+    "grupos_au": "UPDATE ON auth_user_groups",
+    "grupo_ad": "DELETE ON auth_group",
+    "grupo_au": "UPDATE OF name ON auth_group",
+}
+
+CRIAR = [
+    "INSERT INTO app_versaotabela(tabela, versao, atualizado_em) "
+    "VALUES ('papel', 1, strftime('%Y-%m-%d %H:%M:%f', 'now'))",
+]
+REMOVER = ["DELETE FROM app_versaotabela WHERE tabela = 'papel'"]
+
+for sufixo, evento in TRIGGERS.items():
+    CRIAR.append(f"""
+    CREATE TRIGGER app_versaotabela_papel_{sufixo} AFTER {evento} BEGIN
+        {INCREMENTAR}
+    END
+    """)
+    REMOVER.insert(0, f"DROP TRIGGER IF EXISTS app_versaotabela_papel_{sufixo}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0017_indices_consultas'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(executar(CRIAR), executar(REMOVER)),
+    ]
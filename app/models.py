@@ -104,6 +104,41 @@ class Patrimonio(models.Model):
         related_name='patrimonios'
     )
 
+    # Impressão digital (hash) da linha da planilha que originou o
+    # registro. Permite ignorar linhas inalteradas na reimportação.
+    hash_linha = models.CharField(max_length=32, blank=True, default='', editable=False)
+
+    # Importação (lote) que inseriu o registro. Permite desfazer um
+    # upload inteiro com uma exclusão pelo índice desta coluna.
+    importacao = models.ForeignKey(
+        'ImportacaoPlanilha',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='patrimonios'
+    )
+
+    # ==========================================================
+    # ÍNDICES DAS CONSULTAS FREQUENTES
+    # ----------------------------------------------------------
+    # Derivados das consultas registradas em app/plano_consultas.py
+    # (verificadas por python manage.py verificar_indices):
+    # - situacao: filtro do admin, em ordem de id
+    # - (setor, situacao): filtros do admin e lista de setores do
+    #   filtro lateral (DISTINCT coberto pelo índice)
+    # - conta_contabil: filtro do admin e lista de contas
+    #
+    # Inventariante + ordem por id dispensa índice composto: o
+    # índice da chave estrangeira já guarda o id (rowid) em ordem.
+    # ==========================================================
+    class Meta:
+        indexes = [
+            models.Index(fields=['situacao'], name='patrimonio_situacao_idx'),
+            models.Index(fields=['setor', 'situacao'], name='patrimonio_setor_sit_idx'),
+            models.Index(fields=['conta_contabil'], name='patrimonio_conta_idx'),
+        ]
+
     # ==========================================================
     # REPRESENTAÇÃO TEXTUAL
     # ----------------------------------------------------------
@@ -124,5 +159,237 @@ class RegistroPlanilha(models.Model):
     valor = models.DecimalField(max_digits=10, decimal_places=2)
     data_criacao = models.DateTimeField(auto_now_add=True)
 
+    # Preenchido quando a linha é materializada em registros.xlsx
+    # pela compactação (app/registros.py). Nulo = pendente.
+    compactado_em = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        # Índice parcial: apenas as linhas pendentes, poucas em
+        # qualquer momento, enquanto as compactadas só acumulam.
+        indexes = [
+            models.Index(
+                fields=['id'],
+                condition=models.Q(compactado_em__isnull=True),
+                name='registro_pendente_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.descricao} - {self.usuario.username}"
+
+class ImportacaoPlanilha(models.Model):
+    """Tarefa de importação de planilha executada fora da requisição."""
+
+    # ==========================================================
+    # CONJUNTO DE OPÇÕES DE STATUS
+    # ----------------------------------------------------------
+    # Ciclo de vida de uma importação:
+    # pendente → processando → concluida | erro
+    # concluida → desfeita (patrimônios inseridos excluídos)
+    # ==========================================================
+    STATUS_CHOICES = [
+        ('pendente', 'Na fila'),
+        ('processando', 'Processando'),
+        ('concluida', 'Concluída'),
+        ('erro', 'Erro'),
+        ('desfeita', 'Desfeita'),
+    ]
+
+    # ==========================================================
+    # CONJUNTO DE OPÇÕES DE MODO
+    # ----------------------------------------------------------
+    # - inserir: grava apenas tombos novos, rejeitando existentes
+    # - atualizar: upsert por tombo, atualizando apenas as linhas
+    #   cujo conteúdo mudou desde a última importação
+    # - validar: apenas gera o relatório de erros, sem gravar
+    # - conciliar: compara planilha e sistema (tombos só de um
+    #   lado e setor/valor divergentes), sem gravar
+    # ==========================================================
+    MODO_CHOICES = [
+        ('inserir', 'Inserir novos'),
+        ('atualizar', 'Atualizar por tombo'),
+        ('validar', 'Somente validar'),
+        ('conciliar', 'Conciliar com o sistema'),
+    ]
+
+    # Inventariante ao qual os patrimônios importados serão vinculados.
+    inventariante = models.ForeignKey(
+        Inventariante,
+        on_delete=models.CASCADE,
+        related_name='importacoes'
+    )
+
+    # Caminho do arquivo enviado, relativo ao MEDIA_ROOT.
+    arquivo = models.CharField(max_length=255)
+
+    # Nome do arquivo como enviado pelo usuário.
+    nome_original = models.CharField(max_length=255, blank=True)
+
+    # Situação atual da tarefa.
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pendente')
+
+    # Modo de gravação dos registros.
+    modo = models.CharField(max_length=20, choices=MODO_CHOICES, default='inserir')
+
+    # Contadores de progresso, atualizados ao final da tarefa.
+    linhas_processadas = models.PositiveIntegerField(default=0)
+    inseridos = models.PositiveIntegerField(default=0)
+    atualizados = models.PositiveIntegerField(default=0)
+    inalterados = models.PositiveIntegerField(default=0)
+    ignorados = models.PositiveIntegerField(default=0)
+    rejeitados = models.PositiveIntegerField(default=0)
+
+    # Resultado da conciliação (modo "conciliar").
+    somente_planilha = models.PositiveIntegerField(default=0)
+    somente_sistema = models.PositiveIntegerField(default=0)
+    divergentes = models.PositiveIntegerField(default=0)
+
+    # Mensagem de erro em caso de falha.
+    mensagem_erro = models.TextField(blank=True)
+
+    # Relatório CSV de erros por linha, relativo ao MEDIA_ROOT.
+    relatorio_erros = models.CharField(max_length=255, blank=True)
+
+    # CSV de diferenças da conciliação, relativo ao MEDIA_ROOT.
+    relatorio_conciliacao = models.CharField(max_length=255, blank=True)
+
+    # Marcos temporais da tarefa.
+    data_criacao = models.DateTimeField(auto_now_add=True)
+    data_inicio = models.DateTimeField(blank=True, null=True)
+    data_conclusao = models.DateTimeField(blank=True, null=True)
+
+    @property
+    def finalizada(self):
+        return self.status in ('concluida', 'erro', 'desfeita')
+
+    @property
+    def pode_desfazer(self):
+        return self.status == 'concluida' and self.modo in ('inserir', 'atualizar') and self.inseridos > 0
+
+    def __str__(self):
+        return f"Importação #{self.pk} - {self.nome_original} ({self.get_status_display()})"
+
+
+class ResumoInventario(models.Model):
+    """
+    Resumo do inventário (quantidade e valor por situação) em várias
+    dimensões, mantido por triggers no banco (migração 0011) para que
+    painel e listagens não precisem de COUNT/GROUP BY na tabela principal.
+    """
+
+    # ==========================================================
+    # DIMENSÕES DO RESUMO
+    # ----------------------------------------------------------
+    # - total: chave vazia
+    # - setor / dependencia: chave = valor do campo ('' se vazio)
+    # - inventariante: chave = id, e o campo inventariante
+    #   preenchido para permitir select_related
+    # ==========================================================
+    DIMENSAO_CHOICES = [
+        ('total', 'Total'),
+        ('setor', 'Setor'),
+        ('dependencia', 'Dependência'),
+        ('inventariante', 'Inventariante'),
+    ]
+
+    dimensao = models.CharField(max_length=20, choices=DIMENSAO_CHOICES)
+    chave = models.CharField(max_length=100, blank=True, default='')
+    situacao = models.CharField(max_length=20, choices=Patrimonio.STATUS_CHOICES)
+
+    # Sem restrição de chave estrangeira e sem cascata no ORM: as
+    # linhas são geridas apenas pelos triggers de app_patrimonio,
+    # inclusive quando a exclusão de um inventariante remove seus bens.
+    inventariante = models.ForeignKey(
+        Inventariante,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+
+    quantidade = models.IntegerField(default=0)
+    valor = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = [('dimensao', 'chave', 'situacao')]
+
+    def __str__(self):
+        return f"{self.dimensao}={self.chave} / {self.situacao}: {self.quantidade}"
+
+
+class VersaoTabela(models.Model):
+    """
+    Versão dos dados de uma tabela, incrementada por triggers no banco
+    (migração 0012) a cada escrita, inclusive em lote. Serve de chave
+    para caches de fragmentos e validadores HTTP (ETag/Last-Modified).
+    """
+
+    # Nome lógico: patrimonio, inventariante ou usuario
+    tabela = models.CharField(max_length=50, primary_key=True)
+    versao = models.PositiveBigIntegerField(default=0)
+    atualizado_em = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.tabela} v{self.versao}"
+
+
+class Campanha(models.Model):
+    """
+    Campanha anual de inventário. Apenas uma fica aberta por vez: os
+    patrimônios (situação e data de inventário) refletem a campanha
+    aberta, e as encerradas ficam arquivadas em ResultadoCampanha.
+    """
+
+    # Ano de referência do inventário.
+    ano = models.PositiveSmallIntegerField(unique=True)
+
+    # Marcos temporais da campanha (encerramento nulo = aberta).
+    data_abertura = models.DateTimeField(auto_now_add=True)
+    data_encerramento = models.DateTimeField(blank=True, null=True)
+
+    # Quantidade de resultados arquivados no encerramento.
+    arquivados = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-ano']
+
+    @property
+    def aberta(self):
+        return self.data_encerramento is None
+
+    def __str__(self):
+        return f"Campanha {self.ano}{' (aberta)' if self.aberta else ''}"
+
+
+class ResultadoCampanha(models.Model):
+    """
+    Resultado de um patrimônio numa campanha encerrada: cópia compacta
+    das colunas que mudam de um ano para outro, por tombo.
+    """
+
+    campanha = models.ForeignKey(Campanha, on_delete=models.CASCADE, related_name='resultados')
+    tombo = models.IntegerField()
+    situacao = models.CharField(max_length=20, choices=Patrimonio.STATUS_CHOICES)
+    data_inventario = models.DateField(blank=True, null=True)
+    setor = models.CharField(max_length=100, blank=True, null=True)
+    valor = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+
+    # Sem restrição de chave estrangeira: o histórico permanece
+    # mesmo que o inventariante seja excluído depois.
+    inventariante = models.ForeignKey(
+        Inventariante,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+
+    class Meta:
+        # Também serve de índice (campanha, tombo) para a comparação
+        # entre campanhas.
+        unique_together = [('campanha', 'tombo')]
+
     def __str__(self):
-        return f"{self.descricao} - {self.usuario.username}"
\ No newline at end of file
+        return f"{self.campanha.ano} / {self.tombo}: {self.situacao}"
@@ -0,0 +1,108 @@
+import logging
+import time
+from contextlib import ContextDecorator
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================================
+# ORÇAMENTO DE CONSULTAS SQL
+# ----------------------------------------------------------
+# Conta as consultas e o tempo gasto em SQL num trecho de
+# código, usando connection.execute_wrapper (funciona também
+# com DEBUG=False).
+#
+# - orcamento_consultas: gerenciador de contexto/decorador
+# - OrcamentoConsultasMiddleware: mede cada requisição e
+#   registra no log as views que estouram o orçamento
+#
+# Orçamentos por nome de rota em settings.ORCAMENTO_CONSULTAS;
+# as demais rotas usam ORCAMENTO_CONSULTAS_PADRAO.
+#
+# Uso:
+#   with orcamento_consultas(maximo=5, nome="relatorio") as medidor:
+#       ...
+#   medidor.total, medidor.tempo
+# ==========================================================
+
+
+class orcamento_consultas(ContextDecorator):
+    """Mede as consultas do bloco e avisa no log se passarem de "maximo"."""
+
+    def __init__(self, maximo=None, nome="", guardar_sql=False):
+        self.maximo = maximo
+        self.nome = nome
+        self.guardar_sql = guardar_sql
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self.total = 0
+        self.tempo = 0.0
+        self.consultas = []
+
+    def _medir(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracao = time.perf_counter() - inicio
+            self.total += 1
+            self.tempo += duracao
+            if self.guardar_sql:
+                self.consultas.append((sql, duracao))
+
+    def __enter__(self):
+        self._reiniciar()
+        self._contexto = connection.execute_wrapper(self._medir)
+        self._contexto.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self._contexto.__exit__(*exc)
+        if self.excedido:
+            logger.warning(
+                "Orçamento de consultas excedido em %s: %d consultas (máximo %d), %.1f ms em SQL",
+                self.nome or "trecho", self.total, self.maximo, self.tempo * 1000,
+            )
+        return False
+
+    @property
+    def excedido(self):
+        return self.maximo is not None and self.total > self.maximo
+
+
+def orcamento_da_rota(nome_rota):
+    orcamentos = getattr(settings, "ORCAMENTO_CONSULTAS", {})
+    return orcamentos.get(nome_rota, getattr(settings, "ORCAMENTO_CONSULTAS_PADRAO", None))
+
+
+class OrcamentoConsultasMiddleware:
+    """
+    Mede consultas e tempo de SQL por requisição. Estouros vão para o
+    log "app.orcamento_consultas"; com DEBUG os números também seguem
+    no cabeçalho Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with orcamento_consultas() as medidor:
+            response = self.get_response(request)
+
+        rota = request.resolver_match.view_name if request.resolver_match else request.path
+        maximo = orcamento_da_rota(rota)
+        if maximo is not None and medidor.total > maximo:
+            logger.warning(
+                "Orçamento de consultas excedido em %s (%s): %d consultas (máximo %d), %.1f ms em SQL",
+                rota, request.path, medidor.total, maximo, medidor.tempo * 1000,
+            )
+
+        if settings.DEBUG:
+            response["Server-Timing"] = (
+                f'sql;dur={medidor.tempo * 1000:.1f};desc="{medidor.total} consultas"'
+            )
+        return response
@@ -0,0 +1,168 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+# ==========================================================
+# PAGINAÇÃO POR CURSOR (KEYSET)
+# ----------------------------------------------------------
+# Alternativa ao Paginator do Django para listas grandes:
+#
+# - Não executa COUNT(*)
+# - Não usa OFFSET: a página seguinte é obtida com um filtro
+#   "depois da última linha exibida" sobre as colunas da
+#   ordenação, resolvido pelos índices
+#
+# O cursor é o valor das colunas de ordenação da primeira ou
+# da última linha da página, serializado em JSON/base64 para
+# trafegar na querystring. A ordenação do queryset precisa
+# terminar numa coluna única (normalmente "id").
+#
+# Colunas anuláveis são tratadas como no SQLite: NULL vem
+# antes de qualquer valor na ordem crescente.
+#
+# O cursor vem do cliente: os valores são convertidos pelos
+# campos da ordenação e, se não couberem (quantidade ou tipo
+# errados), o cursor é ignorado e volta a primeira página.
+# ==========================================================
+
+
+def codificar_cursor(valores):
+    texto = json.dumps(valores, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor):
+    """Retorna a lista de valores do cursor ou None se ele for inválido."""
+    try:
+        texto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valores = json.loads(texto)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+    return valores if isinstance(valores, list) else None
+
+
+def colunas_ordenacao(queryset):
+    """Lista de (campo, descendente) da ordenação efetiva do queryset."""
+    ordenacao = queryset.query.order_by or queryset.model._meta.ordering or ["pk"]
+    colunas = []
+    for campo in ordenacao:
+        descendente = campo.startswith("-")
+        colunas.append((campo.lstrip("-"), descendente != (not queryset.query.standard_ordering)))
+    return colunas
+
+
+def _campo_ordenacao(queryset, caminho):
+    """Campo (ou anotação) do model correspondente a uma coluna da ordenação."""
+    if caminho in queryset.query.annotations:
+        return queryset.query.annotations[caminho].output_field
+    modelo = queryset.model
+    partes = caminho.split("__")
+    for parte in partes[:-1]:
+        modelo = modelo._meta.get_field(parte).related_model
+    campo = modelo._meta.pk if partes[-1] == "pk" else modelo._meta.get_field(partes[-1])
+    return campo.target_field if campo.is_relation else campo
+
+
+def _validar_cursor(queryset, colunas, valores):
+    """Valores do cursor convertidos pelos campos da ordenação, ou None se não couberem."""
+    if valores is None or len(valores) != len(colunas):
+        return None
+    try:
+        return [
+            None if valor is None else _campo_ordenacao(queryset, campo).to_python(valor)
+            for (campo, _desc), valor in zip(colunas, valores)
+        ]
+    except (FieldDoesNotExist, ValidationError, TypeError, ValueError):
+        return None
+
+
+def _depois_de(colunas, valores):
+    """
+    Filtro das linhas estritamente posteriores à linha com os
+    valores informados, segundo a ordenação (comparação
+    lexicográfica: a > x, ou a = x e b > y, ...).
+    """
+    filtro = Q(pk__in=[])
+    iguais = Q()
+    for (campo, descendente), valor in zip(colunas, valores):
+        if valor is None:
+            # NULL é o menor valor: depois dele vêm os não nulos
+            posterior = Q(pk__in=[]) if descendente else Q(**{f"{campo}__isnull": False})
+            igual = Q(**{f"{campo}__isnull": True})
+        else:
+            posterior = Q(**{f"{campo}__{'lt' if descendente else 'gt'}": valor})
+            if descendente:
+                posterior |= Q(**{f"{campo}__isnull": True})
+            igual = Q(**{campo: valor})
+        filtro |= iguais & posterior
+        iguais &= igual
+    return filtro
+
+
+class PaginaCursor:
+    """Página de resultados com os cursores para navegar a partir dela."""
+
+    def __init__(self, object_list, colunas, has_previous, has_next):
+        self.object_list = object_list
+        self.colunas = colunas
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def _cursor(self, objeto):
+        return codificar_cursor([getattr(objeto, campo) for campo, _desc in self.colunas])
+
+    @property
+    def cursor_anterior(self):
+        return self._cursor(self.object_list[0]) if self.object_list else ""
+
+    @property
+    def cursor_proximo(self):
+        return self._cursor(self.object_list[-1]) if self.object_list else ""
+
+
+def paginar_por_cursor(queryset, tamanho, apos=None, antes=None, ultima=False):
+    """
+    Retorna a página de "tamanho" linhas:
+    - apos: cursor da última linha da página anterior (próxima página)
+    - antes: cursor da primeira linha da página seguinte (página anterior)
+    - ultima: última página
+    Sem cursor válido, retorna a primeira página.
+    """
+    colunas = colunas_ordenacao(queryset)
+    valores_apos = _validar_cursor(queryset, colunas, decodificar_cursor(apos)) if apos else None
+    valores_antes = _validar_cursor(queryset, colunas, decodificar_cursor(antes)) if antes else None
+
+    if valores_antes is not None:
+        invertidas = [(campo, not descendente) for campo, descendente in colunas]
+        linhas = list(queryset.reverse().filter(_depois_de(invertidas, valores_antes))[:tamanho + 1])
+        ha_mais = len(linhas) > tamanho
+        return PaginaCursor(linhas[:tamanho][::-1], colunas, ha_mais, True)
+
+    if ultima:
+        linhas = list(queryset.reverse()[:tamanho + 1])
+        ha_mais = len(linhas) > tamanho
+        return PaginaCursor(linhas[:tamanho][::-1], colunas, ha_mais, False)
+
+    if valores_apos is not None:
+        linhas = list(queryset.filter(_depois_de(colunas, valores_apos))[:tamanho + 1])
+        return PaginaCursor(linhas[:tamanho], colunas, True, len(linhas) > tamanho)
+
+    linhas = list(queryset[:tamanho + 1])
+    return PaginaCursor(linhas[:tamanho], colunas, False, len(linhas) > tamanho)
@@ -0,0 +1,130 @@
+import re
+import statistics
+import time
+from dataclasses import dataclass, field
+
+from .busca import buscar_patrimonios
+from .models import Campanha, ImportacaoPlanilha, Patrimonio, RegistroPlanilha, ResultadoCampanha
+from .registros import registros_pendentes
+
+
+# ==========================================================
+# CONSULTAS FREQUENTES E SEUS PLANOS DE EXECUÇÃO
+# ----------------------------------------------------------
+# Registro das consultas que rodam a cada requisição ou sobre
+# a tabela inteira (listagem, admin, busca, check-in, painel).
+# Os índices de app/models.py foram escolhidos a partir delas.
+#
+# verificar_consultas() executa EXPLAIN QUERY PLAN em cada uma
+# e aponta regressões: varredura completa de uma tabela que
+# cresce com o uso ("SCAN app_patrimonio", sem índice). Tabelas
+# pequenas (inventariantes, usuários) podem ser varridas quando
+# as estatísticas do ANALYZE indicam que é mais barato.
+# Ordenação em árvore temporária é apenas informada (a busca
+# por relevância, por exemplo, ordena só as linhas
+# encontradas).
+#
+# Os valores dos filtros são fictícios: o plano não depende
+# deles, apenas da forma da consulta.
+# ==========================================================
+
+PAGINA = 7
+
+TABELAS_GRANDES = {
+    Patrimonio._meta.db_table,
+    ResultadoCampanha._meta.db_table,
+    RegistroPlanilha._meta.db_table,
+}
+
+CONSULTAS_QUENTES = {
+    # patrimonio_list: página seguinte por cursor (admin e inventariante)
+    "lista_admin": lambda: (
+        Patrimonio.objects.select_related("inventariante__user").filter(id__gt=1000).order_by("id")[:PAGINA]
+    ),
+    "lista_inventariante": lambda: (
+        Patrimonio.objects.filter(inventariante_id=1, id__gt=1000).order_by("id")[:PAGINA]
+    ),
+    "busca_texto": lambda: buscar_patrimonios(Patrimonio.objects.all(), "cadeira")[:PAGINA],
+    "busca_tombo": lambda: buscar_patrimonios(Patrimonio.objects.all(), "123")[:PAGINA],
+
+    # PatrimonioAdmin: filtros laterais e listas de valores
+    "admin_situacao": lambda: Patrimonio.objects.filter(situacao="nao_localizado").order_by("-pk")[:100],
+    "admin_setor_situacao": lambda: (
+        Patrimonio.objects.filter(setor="BJL-DG", situacao="nao_localizado").order_by("-pk")[:100]
+    ),
+    "admin_conta": lambda: Patrimonio.objects.filter(conta_contabil="142120001").order_by("-pk")[:100],
+    "admin_valores_setor": lambda: (
+        Patrimonio.objects.distinct().order_by("setor").values_list("setor", flat=True)
+    ),
+    "admin_valores_conta": lambda: (
+        Patrimonio.objects.distinct().order_by("conta_contabil").values_list("conta_contabil", flat=True)
+    ),
+
+    # Check-in, desfazer importação e comparação de campanhas
+    "checkin_tombos": lambda: Patrimonio.objects.filter(tombo__in=[1001, 1002, 1003]),
+    "importacao_lote": lambda: Patrimonio.objects.filter(importacao_id=1).order_by("id")[:2000],
+    "campanha_resultados": lambda: ResultadoCampanha.objects.filter(campanha_id=1, tombo=1001),
+
+    # Tabelas auxiliares consultadas a cada requisição
+    "fila_importacao": lambda: (
+        ImportacaoPlanilha.objects.filter(status__in=("pendente", "processando"), pk__lt=10)
+    ),
+    "registros_pendentes": lambda: registros_pendentes().order_by("id"),
+    "campanha_aberta": lambda: Campanha.objects.filter(data_encerramento__isnull=True)[:1],
+}
+
+# "SCAN app_patrimonio" (ou "SCAN TABLE app_patrimonio" em
+# versões antigas) sem "USING ..." nem tabela virtual (FTS5).
+_VARREDURA = re.compile(r"\bSCAN (?:TABLE )?(\w+)(?: AS \w+)?\s*$")
+
+
+@dataclass
+class PlanoConsulta:
+    nome: str
+    linhas: list
+    varreduras: list = field(default_factory=list)
+    ordenacao_temporaria: bool = False
+    tempo_ms: float = None
+
+
+def analisar_plano(linhas, tabelas=TABELAS_GRANDES):
+    """Retorna (tabelas grandes varridas por inteiro, usa árvore temporária)."""
+    varreduras = []
+    temporaria = False
+    for linha in linhas:
+        encontrado = _VARREDURA.search(linha)
+        if encontrado and encontrado.group(1) in tabelas:
+            varreduras.append(encontrado.group(1))
+        temporaria = temporaria or "USE TEMP B-TREE" in linha
+    return varreduras, temporaria
+
+
+def _medir(queryset, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        list(queryset.all())
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return round(statistics.median(tempos), 3)
+
+
+def verificar_consultas(nomes=None, repeticoes=0):
+    """
+    Lista de PlanoConsulta das consultas registradas (ou apenas de
+    `nomes`). Com repeticoes > 0, mede também o tempo mediano.
+    """
+    planos = []
+    for nome, consulta in CONSULTAS_QUENTES.items():
+        if nomes and nome not in nomes:
+            continue
+        queryset = consulta()
+        linhas = queryset.explain().splitlines()
+        varreduras, temporaria = analisar_plano(linhas)
+        planos.append(PlanoConsulta(
+            nome=nome,
+            linhas=linhas,
+            varreduras=varreduras,
+            ordenacao_temporaria=temporaria,
+            tempo_ms=_medir(queryset, repeticoes) if repeticoes else None,
+        ))
+    return planos
@@ -0,0 +1,135 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from openpyxl import Workbook, load_workbook
+
+from .models import RegistroPlanilha
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# ==========================================================
+# LOG DE REGISTROS COM COMPACTAÇÃO EM PLANILHA
+# ----------------------------------------------------------
+# Cada registro novo é apenas inserido na tabela
+# RegistroPlanilha (log de acréscimo, custo constante), sem
+# abrir o arquivo Excel durante a requisição.
+#
+# A compactação materializa as linhas pendentes do log em
+# registros.xlsx numa única passada:
+#
+# - O arquivo atual é lido em modo read_only (streaming)
+# - Uma nova pasta de trabalho write-only recebe as linhas
+#   existentes seguidas das pendentes
+# - O resultado substitui o original com os.replace (atômico)
+#
+# As linhas são marcadas como compactadas na mesma transação
+# da troca do arquivo, antes do os.replace: se a troca falhar,
+# a marcação é desfeita; se a troca acontecer, a transação já
+# só depende do commit. Uma nova compactação nunca regrava no
+# arquivo linhas que ele já contém.
+#
+# Uma trava de arquivo impede que duas compactações (ou a
+# exclusão da planilha) manipulem registros.xlsx ao mesmo tempo.
+# ==========================================================
+
+NOME_PLANILHA = "registros.xlsx"
+
+CABECALHO_REGISTROS = ["ID Usuário", "Username", "Nome Completo", "Descrição", "Valor"]
+
+
+def caminho_planilha():
+    return os.path.join(settings.MEDIA_ROOT, NOME_PLANILHA)
+
+
+@contextmanager
+def trava_planilha():
+    """Trava exclusiva (entre processos) sobre registros.xlsx."""
+    os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+    with open(caminho_planilha() + ".lock", "a+b") as arquivo:
+        if fcntl:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)
+        else:
+            arquivo.seek(0)
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+            else:
+                arquivo.seek(0)
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def registrar_linha(usuario, descricao, valor):
+    """Acrescenta uma linha ao log; a planilha só é reescrita na compactação."""
+    return RegistroPlanilha.objects.create(usuario=usuario, descricao=descricao, valor=valor)
+
+
+def registros_pendentes():
+    return RegistroPlanilha.objects.filter(compactado_em__isnull=True)
+
+
+def compactar_registros():
+    """
+    Materializa as linhas pendentes do log em registros.xlsx.
+    Retorna a quantidade de linhas acrescentadas.
+    """
+    with trava_planilha(), transaction.atomic():
+        pendentes = list(
+            registros_pendentes()
+            .order_by("id")
+            .values_list(
+                "id", "usuario_id", "usuario__username",
+                "usuario__first_name", "usuario__last_name",
+                "descricao", "valor",
+            )
+        )
+        if not pendentes:
+            return 0
+
+        destino = caminho_planilha()
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Registros")
+
+        if os.path.exists(destino):
+            atual = load_workbook(destino, read_only=True)
+            for row in atual.active.iter_rows(values_only=True):
+                sheet.append(row)
+            atual.close()
+        else:
+            sheet.append(CABECALHO_REGISTROS)
+
+        for _id, usuario_id, username, nome, sobrenome, descricao, valor in pendentes:
+            sheet.append([usuario_id, username, f"{nome} {sobrenome}".strip(), descricao, valor])
+
+        RegistroPlanilha.objects.filter(
+            id__in=[row[0] for row in pendentes]
+        ).update(compactado_em=timezone.now())
+
+        descritor, temporario = tempfile.mkstemp(suffix=".xlsx", dir=settings.MEDIA_ROOT)
+        os.close(descritor)
+        try:
+            workbook.save(temporario)
+            os.replace(temporario, destino)
+        except BaseException:
+            os.remove(temporario)
+            raise
+        return len(pendentes)
+
+
+def descartar_planilha():
+    """Remove registros.xlsx e o log associado, sob a mesma trava da compactação."""
+    with trava_planilha(), transaction.atomic():
+        RegistroPlanilha.objects.all().delete()
+        if os.path.exists(caminho_planilha()):
+            os.remove(caminho_planilha())
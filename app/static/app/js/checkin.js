@@ -0,0 +1,66 @@
+// ==========================================================
+// CONFERÊNCIA POR LEITOR DE CÓDIGO DE BARRAS
+// ----------------------------------------------------------
+// O leitor USB "digita" o tombo e tecla Enter. Cada leitura
+// entra numa fila; a fila é enviada em lotes (no máximo
+// data-lote-maximo tombos), um lote por vez, a cada segundo
+// ou assim que a fila enche. Assim centenas de leituras por
+// minuto viram poucas requisições, e nenhuma leitura se perde
+// enquanto um lote está a caminho.
+// ==========================================================
+(function () {
+  const fila = [];
+  let enviando = false;
+
+  function painel() {
+    return document.getElementById("checkin");
+  }
+
+  function atualizarPendentes() {
+    const contador = document.getElementById("checkin-pendentes");
+    if (contador) contador.textContent = fila.length;
+  }
+
+  function enviarLote() {
+    const el = painel();
+    if (!el || enviando || fila.length === 0) return;
+
+    const maximo = parseInt(el.dataset.loteMaximo, 10) || 500;
+    const lote = fila.splice(0, maximo);
+    enviando = true;
+    atualizarPendentes();
+
+    htmx.ajax("POST", el.dataset.url, {
+      target: "#checkin-resultados",
+      swap: "afterbegin",
+      values: { tombos: lote.join("\n") },
+    }).catch(() => {
+      // Falha de rede: devolve o lote ao início da fila
+      fila.unshift(...lote);
+    }).finally(() => {
+      enviando = false;
+      atualizarPendentes();
+      if (fila.length >= maximo) enviarLote();
+    });
+  }
+
+  // --------------------------------------------------
+  // Leitura: Enter no campo do leitor
+  // --------------------------------------------------
+  document.body.addEventListener("keydown", event => {
+    if (event.target.id !== "checkin-leitor" || event.key !== "Enter") return;
+    event.preventDefault();
+
+    const leitura = event.target.value.trim();
+    event.target.value = "";
+    if (!leitura) return;
+
+    fila.push(leitura);
+    atualizarPendentes();
+
+    const maximo = parseInt(painel().dataset.loteMaximo, 10) || 500;
+    if (fila.length >= maximo) enviarLote();
+  });
+
+  setInterval(enviarLote, 1000);
+})();
@@ -84,11 +84,22 @@ document.body.addEventListener('closeModal', function () {
  * 3) Fecha o modal corretamente
  * 4) Recarrega a página
  */
-document.body.addEventListener('planilhaAtualizada', function () {
+document.body.addEventListener('planilhaAtualizada', function (event) {
 
   const modalAberto = document.querySelector('.modal.show');
   if (!modalAberto) return;
 
+  // --------------------------------------------------
+  // Resumo da importação enviado pelo backend
+  // --------------------------------------------------
+  const resumo = event.detail || {};
+  const detalhes = resumo.inseridos !== undefined
+    ? `<div class="fw-normal small mt-1">
+         ${resumo.inseridos} inseridos · ${resumo.atualizados || 0} atualizados ·
+         ${resumo.inalterados || 0} inalterados · ${resumo.ignorados} ignorados · ${resumo.rejeitados} rejeitados
+       </div>`
+    : '';
+
   // --------------------------------------------------
   // Injeção de feedback visual ao usuário
   // --------------------------------------------------
@@ -97,6 +108,7 @@ document.body.addEventListener('planilhaAtualizada', function () {
     modalBody.innerHTML = `
       <div class="alert alert-success text-center fw-bold">
         Planilha enviada com sucesso!
+        ${detalhes}
       </div>
     `;
   }
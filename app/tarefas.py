@@ -0,0 +1,179 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .conciliacao import conciliar_planilha
+from .importacao import importar_planilha
+from .models import ImportacaoPlanilha
+from .registros import compactar_registros
+from .validacao import RelatorioErros
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================================
+# EXECUÇÃO DE IMPORTAÇÕES EM SEGUNDO PLANO
+# ----------------------------------------------------------
+# As importações são processadas por um pool de threads do
+# próprio processo, fora do ciclo da requisição HTTP.
+#
+# O pool possui um único worker: uma segunda importação
+# enviada enquanto outra está em andamento aguarda na fila,
+# evitando duas transações de escrita concorrentes no SQLite.
+#
+# Como a importação roda numa única transação, o progresso
+# parcial não é visível no banco até o commit. Por isso os
+# contadores parciais ficam em memória (_progresso) e são
+# consultados pela view de acompanhamento.
+#
+# A fila também vive apenas na memória deste processo (o
+# servidor deve rodar a aplicação num único processo). Tarefas
+# que ficaram "pendente" ou "processando" no banco sem estarem
+# na fila (servidor reiniciado no meio da importação) são
+# marcadas como "erro" quando o progresso é consultado; a
+# transação da importação interrompida já foi desfeita pelo
+# SQLite.
+# ==========================================================
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="importacao")
+
+_trava = threading.Lock()
+_progresso = {}
+_na_fila = set()
+_compactacao_agendada = threading.Event()
+
+
+def progresso_parcial(importacao_id):
+    """Retorna os contadores parciais de uma importação em andamento."""
+    with _trava:
+        return dict(_progresso.get(importacao_id, {}))
+
+
+MENSAGEM_INTERROMPIDA = "Importação interrompida pelo reinício do servidor. Envie a planilha novamente."
+
+
+def na_fila(importacao_id):
+    """Indica se a importação aguarda ou está em execução neste processo."""
+    with _trava:
+        return importacao_id in _na_fila
+
+
+def posicao_na_fila(importacao_id):
+    """Posição (1 = próxima) de uma importação que aguarda na fila."""
+    with _trava:
+        return sum(1 for outra in _na_fila if outra < importacao_id) + 1
+
+
+def marcar_interrompida(importacao_id):
+    """Marca como erro a tarefa pendente/em processamento que não está na fila."""
+    if na_fila(importacao_id):
+        return 0
+    return ImportacaoPlanilha.objects.filter(
+        pk=importacao_id, status__in=("pendente", "processando"),
+    ).update(status="erro", mensagem_erro=MENSAGEM_INTERROMPIDA, data_conclusao=timezone.now())
+
+
+def enfileirar_importacao(importacao):
+    """
+    Agenda a importação e devolve o Future da tarefa; com
+    IMPORTACAO_SINCRONA executa imediatamente (e devolve None).
+    """
+    if getattr(settings, "IMPORTACAO_SINCRONA", False):
+        executar_importacao(importacao.pk)
+        return None
+    with _trava:
+        _na_fila.add(importacao.pk)
+    return _executor.submit(executar_importacao, importacao.pk)
+
+
+def executar_importacao(importacao_id):
+    close_old_connections()
+    importacao = ImportacaoPlanilha.objects.select_related("inventariante").get(pk=importacao_id)
+
+    def registrar_progresso(resumo):
+        with _trava:
+            _progresso[importacao_id] = resumo.como_dict()
+
+    nome_relatorio = f"importacoes/{importacao_id}_erros.csv"
+    relatorio = RelatorioErros(os.path.join(settings.MEDIA_ROOT, nome_relatorio))
+
+    ImportacaoPlanilha.objects.filter(pk=importacao_id).update(
+        status="processando",
+        data_inicio=timezone.now(),
+    )
+
+    # Conciliação: CSV de diferenças em vez de gravação
+    extras = {}
+    try:
+        with relatorio:
+            if importacao.modo == "conciliar":
+                nome_diferencas = f"importacoes/{importacao_id}_conciliacao.csv"
+                resumo = conciliar_planilha(
+                    os.path.join(settings.MEDIA_ROOT, importacao.arquivo),
+                    os.path.join(settings.MEDIA_ROOT, nome_diferencas),
+                    progresso=registrar_progresso,
+                    relatorio=relatorio,
+                )
+                extras["relatorio_conciliacao"] = nome_diferencas
+            else:
+                resumo = importar_planilha(
+                    os.path.join(settings.MEDIA_ROOT, importacao.arquivo),
+                    importacao.inventariante,
+                    modo=importacao.modo,
+                    progresso=registrar_progresso,
+                    relatorio=relatorio,
+                    importacao=importacao,
+                )
+    except Exception as exc:
+        logger.exception("Falha na importação #%s", importacao_id)
+        ImportacaoPlanilha.objects.filter(pk=importacao_id).update(
+            status="erro",
+            mensagem_erro=str(exc),
+            data_conclusao=timezone.now(),
+        )
+    else:
+        ImportacaoPlanilha.objects.filter(pk=importacao_id).update(
+            status="concluida",
+            relatorio_erros=nome_relatorio if relatorio.total else "",
+            data_conclusao=timezone.now(),
+            **resumo.como_dict(),
+            **extras,
+        )
+    finally:
+        with _trava:
+            _progresso.pop(importacao_id, None)
+            _na_fila.discard(importacao_id)
+        if not getattr(settings, "IMPORTACAO_SINCRONA", False):
+            close_old_connections()
+
+
+# ==========================================================
+# COMPACTAÇÃO DO LOG DE REGISTROS
+# ----------------------------------------------------------
+# Executada no mesmo worker das importações. Pedidos feitos
+# enquanto uma compactação já aguarda na fila são descartados:
+# a compactação pendente incluirá todas as linhas do log.
+# ==========================================================
+def agendar_compactacao():
+    if getattr(settings, "IMPORTACAO_SINCRONA", False):
+        compactar_registros()
+        return
+    if _compactacao_agendada.is_set():
+        return
+    _compactacao_agendada.set()
+    _executor.submit(executar_compactacao)
+
+
+def executar_compactacao():
+    _compactacao_agendada.clear()
+    close_old_connections()
+    try:
+        compactar_registros()
+    except Exception:
+        logger.exception("Falha na compactação de registros.xlsx")
+    finally:
+        close_old_connections()
@@ -1,3 +1,1728 @@
-from django.test import TestCase
+import codecs
+import csv
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from collections import Counter
+from datetime import date, datetime
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from .autorizacao import GRUPO_PRESIDENTE, Papel, papel_do_usuario
+from .banco import ler_pragmas, pragmas_configurados
+from .busca import buscar_patrimonios, intervalos_tombo
+from .campanhas import abrir_campanha, comparar_campanhas, encerrar_campanha
+from .checkin import LOTE_MAXIMO, conferir_tombos, separar_leituras
+from .contadores import contar_patrimonios, reconciliar, totais_por_situacao
+from .dados_sinteticos import SETORES, escrever_arquivos, gerar_registros
+from .exclusao import excluir_importacao, excluir_patrimonios
+from .exportacao import CABECALHOS
+from .importacao import detectar_formato, importar_planilha, ler_linhas, validar_planilha
+from .importacao_paralela import importar_planilhas
+from .models import (
+    ImportacaoPlanilha, Inventariante, Patrimonio, RegistroPlanilha, ResultadoCampanha, ResumoInventario,
+)
+from .orcamento_consultas import orcamento_consultas
+from .paginacao import codificar_cursor, paginar_por_cursor
+from . import tarefas
+from .plano_consultas import analisar_plano, verificar_consultas
+from .registros import (
+    CABECALHO_REGISTROS, caminho_planilha, compactar_registros, descartar_planilha, fcntl, registrar_linha,
+    registros_pendentes,
+)
+from .validacao import RelatorioErros, ValidadorPlanilha, mapear_cabecalho
+from .versoes import carimbo
+
+
+# ==========================================================
+# ORÇAMENTO DE CONSULTAS DAS VIEWS DO PAINEL
+# ----------------------------------------------------------
+# Fixa o número máximo de consultas SQL de cada view de
+# app/urls_admin.py sobre uma massa de dados semeada.
+#
+# Um aumento nesses números indica, em geral, um N+1 novo
+# (acesso preguiçoso a relações dentro de laços/templates).
+# Os máximos incluem as consultas de sessão e autenticação.
+# ==========================================================
+
+MEDIA_TESTES = tempfile.mkdtemp(prefix="inventario_testes_")
+
+PATRIMONIOS_POR_INVENTARIANTE = 30
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TESTES, IMPORTACAO_SINCRONA=True)
+class OrcamentoConsultasViewsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@teste.br", "senha")
+        cls.inv_admin = Inventariante.objects.create(
+            user=cls.admin, matricula="0001", funcao="Presidente", telefone="0", presidente=True
+        )
+        cls.comum = User.objects.create_user("comum", "comum@teste.br", "senha", first_name="Comum")
+        cls.inv_comum = Inventariante.objects.create(
+            user=cls.comum, matricula="0002", funcao="Membro", telefone="0"
+        )
+
+        patrimonios = []
+        for indice in range(PATRIMONIOS_POR_INVENTARIANTE * 2):
+            patrimonios.append(Patrimonio(
+                tombo=1000 + indice,
+                descricao=f"CADEIRA GIRATÓRIA {indice}",
+                valor=100 + indice,
+                setor="BJL-DG",
+                dependencia="BLOCO A",
+                fornecedor="FORNECEDOR",
+                data_documento=date(2020, 1, 1),
+                inventariante=cls.inv_admin if indice % 2 else cls.inv_comum,
+            ))
+        Patrimonio.objects.bulk_create(patrimonios)
+        cls.patrimonio = Patrimonio.objects.get(tombo=1001)
+
+        cls.importacao = ImportacaoPlanilha.objects.create(
+            inventariante=cls.inv_admin,
+            arquivo="importacoes/teste.csv",
+            nome_original="teste.csv",
+            status="concluida",
+            linhas_processadas=10,
+            inseridos=8,
+            rejeitados=2,
+            relatorio_erros="importacoes/1_erros.csv",
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_TESTES, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.entrar(self.admin)
+
+    def entrar(self, usuario):
+        """Login com o papel já em cache (regime normal entre requisições)."""
+        self.client.force_login(usuario)
+        papel_do_usuario(usuario)
+
+    def assertMaximoConsultas(self, maximo, metodo, url, **kwargs):
+        # O orçamento de produção (ORCAMENTO_CONSULTAS) também deve
+        # comportar a rota: o middleware não pode registrar estouro
+        with orcamento_consultas() as medidor, self.assertNoLogs("app.orcamento_consultas", "WARNING"):
+            response = metodo(url, **kwargs)
+            if hasattr(response, "streaming_content"):
+                b"".join(response.streaming_content)
+        self.assertLessEqual(
+            medidor.total, maximo,
+            f"{url}: {medidor.total} consultas (máximo {maximo})",
+        )
+        return response
+
+    # ------------------------------------------------------
+    # Painel e listagens
+    # ------------------------------------------------------
+    def test_admin_dashboard(self):
+        response = self.assertMaximoConsultas(4, self.client.get, reverse("admin_dashboard"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_resumo_inventario(self):
+        response = self.assertMaximoConsultas(4, self.client.get, reverse("resumo_inventario"))
+        self.assertContains(response, "60 patrimônios")
+
+    def test_cache_fragmentos(self):
+        response = self.assertMaximoConsultas(3, self.client.get, reverse("cache_fragmentos"))
+        self.assertIn("tabela_patrimonios", response.json())
+
+    def test_close_modal(self):
+        self.assertMaximoConsultas(0, self.client.get, reverse("close_modal"))
+
+    def test_inventariantes_list(self):
+        response = self.assertMaximoConsultas(4, self.client.get, reverse("inventariantes_list"))
+        self.assertContains(response, "Comum")
+
+    def test_patrimonio_list(self):
+        response = self.assertMaximoConsultas(
+            6, self.client.get, reverse("patrimonio_list"),
+            headers={"HX-Request": "true", "HX-Target": "conteudo-patrimonios"},
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_patrimonio_list_fragmento_em_cache(self):
+        """Num acerto do cache, só sessão, usuário e versão dos dados."""
+        self.client.get(reverse("patrimonio_list"))
+        response = self.assertMaximoConsultas(4, self.client.get, reverse("patrimonio_list"))
+        self.assertEqual(response["X-Cache-Fragmento"], "acerto")
+
+    def test_patrimonio_list_busca(self):
+        self.assertMaximoConsultas(6, self.client.get, reverse("patrimonio_list"), data={"q": "cadeira"})
+        self.assertMaximoConsultas(5, self.client.get, reverse("patrimonio_list"), data={"q": "100"})
+
+    def test_patrimonio_list_inventariante_comum(self):
+        self.entrar(self.comum)
+        response = self.assertMaximoConsultas(7, self.client.get, reverse("patrimonio_list"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_patrimonio_list_sem_n_mais_1(self):
+        """O número de consultas não cresce com o tamanho da página."""
+        totais = []
+        for tamanho in (2, PATRIMONIOS_POR_INVENTARIANTE * 2):
+            with self.settings(PATRIMONIO_ITENS_POR_PAGINA=tamanho):
+                with orcamento_consultas() as medidor:
+                    self.client.get(reverse("patrimonio_list"))
+            totais.append(medidor.total)
+        self.assertEqual(totais[0], totais[1])
+
+    def test_patrimonio_exportar(self):
+        response = self.assertMaximoConsultas(
+            4, self.client.get, reverse("patrimonio_exportar"), data={"formato": "csv"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertMaximoConsultas(4, self.client.get, reverse("patrimonio_exportar"), data={"formato": "xlsx"})
+
+    # ------------------------------------------------------
+    # Patrimônio
+    # ------------------------------------------------------
+    def test_patrimonio_form(self):
+        self.assertMaximoConsultas(6, self.client.get, reverse("patrimonio_form"))
+
+    def test_patrimonio_add(self):
+        self.assertMaximoConsultas(7, self.client.get, reverse("patrimonio_add"))
+
+    def test_patrimonio_edit(self):
+        self.assertMaximoConsultas(7, self.client.get, reverse("patrimonio_edit", args=[self.patrimonio.pk]))
+
+    def test_confirmar_exclusao_patrimonio(self):
+        self.assertMaximoConsultas(
+            4, self.client.get, reverse("confirmar_exclusao_patrimonio", args=[self.patrimonio.pk])
+        )
+
+    def test_excluir_patrimonio(self):
+        response = self.assertMaximoConsultas(
+            7, self.client.post, reverse("excluir_patrimonio", args=[self.patrimonio.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Patrimonio.objects.filter(pk=self.patrimonio.pk).exists())
+
+    def test_patrimonio_update_situacao(self):
+        self.assertMaximoConsultas(
+            4, self.client.post, reverse("patrimonio_update_situacao", args=[self.patrimonio.pk]),
+            data={"situacao": "nao_localizado"},
+        )
+        self.patrimonio.refresh_from_db()
+        self.assertEqual(self.patrimonio.situacao, "nao_localizado")
+
+    def test_patrimonio_situacao_lote(self):
+        """Um único UPDATE, independentemente da quantidade de patrimônios."""
+        response = self.assertMaximoConsultas(
+            6, self.client.post, reverse("patrimonio_situacao_lote"),
+            data={"situacao": "nao_localizado", "alvo": "filtro", "registrar_data": "1"},
+        )
+        self.assertContains(response, "60 patrimônios atualizados")
+        self.assertEqual(Patrimonio.objects.filter(situacao="nao_localizado").count(), 60)
+        self.assertFalse(Patrimonio.objects.filter(data_inventario__isnull=True).exists())
+
+    def test_patrimonio_situacao_lote_escopo(self):
+        """O inventariante comum só altera os próprios patrimônios."""
+        self.entrar(self.comum)
+        alheio = Patrimonio.objects.filter(inventariante=self.inv_admin).first()
+        proprios = list(Patrimonio.objects.filter(inventariante=self.inv_comum).values_list("pk", flat=True)[:3])
+
+        self.client.post(reverse("patrimonio_situacao_lote"), {
+            "situacao": "calamidade", "alvo": "selecionados", "ids": proprios + [alheio.pk],
+        })
+        self.assertEqual(
+            set(Patrimonio.objects.filter(situacao="calamidade").values_list("pk", flat=True)), set(proprios)
+        )
+
+        self.client.post(reverse("patrimonio_situacao_lote"), {
+            "situacao": "calamidade", "alvo": "filtro", "q": "cadeira",
+        })
+        self.assertEqual(Patrimonio.objects.filter(situacao="calamidade").count(), PATRIMONIOS_POR_INVENTARIANTE)
+
+    def test_patrimonio_checkin(self):
+        self.assertMaximoConsultas(3, self.client.get, reverse("patrimonio_checkin"))
+
+        tombos = "\n".join(str(1000 + indice) for indice in range(PATRIMONIOS_POR_INVENTARIANTE * 2))
+        self.assertMaximoConsultas(
+            5, self.client.post, reverse("patrimonio_checkin"), data={"tombos": tombos}
+        )
+
+    def test_patrimonio_situacao_lote_invalido(self):
+        url = reverse("patrimonio_situacao_lote")
+        self.assertEqual(self.client.post(url, {"situacao": "perdido", "alvo": "filtro"}).status_code, 400)
+        self.assertEqual(self.client.post(url, {"situacao": "localizado"}).status_code, 400)
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+    # ------------------------------------------------------
+    # Inventariantes
+    # ------------------------------------------------------
+    def test_inventariante_add(self):
+        self.assertMaximoConsultas(3, self.client.get, reverse("inventariante_add"))
+
+    def test_inventariante_edit(self):
+        self.assertMaximoConsultas(5, self.client.get, reverse("inventariante_edit", args=[self.inv_comum.pk]))
+
+    def test_inventariante_delete_confirm(self):
+        self.assertMaximoConsultas(
+            5, self.client.get, reverse("inventariante_delete_confirm", args=[self.inv_comum.pk])
+        )
+
+    def test_inventariante_delete(self):
+        self.assertMaximoConsultas(14, self.client.post, reverse("inventariante_delete", args=[self.inv_comum.pk]))
+        self.assertFalse(Inventariante.objects.filter(pk=self.inv_comum.pk).exists())
+
+    # ------------------------------------------------------
+    # Planilhas e importação
+    # ------------------------------------------------------
+    def test_adicionar_na_planilha(self):
+        self.assertMaximoConsultas(9, self.client.get, reverse("adicionar_na_planilha"))
+
+    def test_upload_planilha(self):
+        arquivo = SimpleUploadedFile(
+            "carga.csv",
+            "Tombo;Descrição;Valor (R$);Setor\n5001;MESA;10,00;BJL-DG\n".encode("utf-8"),
+        )
+        response = self.assertMaximoConsultas(
+            12, self.client.post, reverse("upload_planilha"), data={"planilha": arquivo}
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(Patrimonio.objects.filter(tombo=5001).exists())
+
+    def test_upload_planilha_conciliar(self):
+        """Conciliação: contagens e CSV de diferenças, sem gravar nada."""
+        arquivo = SimpleUploadedFile(
+            "oficial.csv",
+            (
+                "Tombo;Descrição;Valor (R$);Setor\n"
+                "1000;CADEIRA;100,00;BJL-DG\n"
+                "1001;CADEIRA;999,00;BJL-DG\n"
+                "9999;ARMÁRIO;50,00;BJL-DG\n"
+            ).encode("utf-8"),
+        )
+        response = self.assertMaximoConsultas(
+            11, self.client.post, reverse("upload_planilha"), data={"planilha": arquivo, "modo": "conciliar"}
+        )
+        importacao = ImportacaoPlanilha.objects.get(pk=response.json()["id"])
+        self.assertEqual(
+            (importacao.somente_planilha, importacao.somente_sistema, importacao.divergentes),
+            (1, PATRIMONIOS_POR_INVENTARIANTE * 2 - 2, 1),
+        )
+        self.assertFalse(Patrimonio.objects.filter(tombo=9999).exists())
+
+        self.assertMaximoConsultas(
+            4, self.client.get, reverse("importacao_conciliacao", args=[importacao.pk])
+        )
+        with open(f"{MEDIA_TESTES}/{importacao.relatorio_conciliacao}", encoding="utf-8-sig") as diferencas:
+            linhas = diferencas.read().splitlines()
+        self.assertIn("1001;divergente;BJL-DG;BJL-DG;999,00;101,00", linhas)
+        self.assertEqual(linhas[-1], "9999;somente_planilha;BJL-DG;;50,00;")
+
+    def test_upload_planilha_invalido_nao_salva_arquivo(self):
+        for nome, modo in (("rejeitada.csv", "sobrescrever"), ("rejeitada.exe", "inserir")):
+            with self.subTest(nome=nome):
+                arquivo = SimpleUploadedFile(nome, b"Tombo;Setor\n5002;BJL-DG\n")
+                response = self.client.post(reverse("upload_planilha"), data={"planilha": arquivo, "modo": modo})
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(Path(MEDIA_TESTES, "importacoes", nome).exists())
+        self.assertFalse(ImportacaoPlanilha.objects.filter(nome_original__startswith="rejeitada").exists())
+
+    def test_upload_planilha_modal(self):
+        self.assertMaximoConsultas(3, self.client.get, reverse("upload_planilha_modal"))
+
+    def test_importacao_progresso(self):
+        self.assertMaximoConsultas(
+            4, self.client.get, reverse("importacao_progresso", args=[self.importacao.pk])
+        )
+
+    def test_importacao_relatorio(self):
+        caminho = f"{MEDIA_TESTES}/importacoes"
+        shutil.os.makedirs(caminho, exist_ok=True)
+        with open(f"{caminho}/1_erros.csv", "w") as arquivo:
+            arquivo.write("linha;coluna;mensagem\n")
+        response = self.assertMaximoConsultas(
+            4, self.client.get, reverse("importacao_relatorio", args=[self.importacao.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_excluir_planilha_confirm(self):
+        response = self.assertMaximoConsultas(4, self.client.get, reverse("excluir_planilha_confirm"))
+        self.assertContains(response, reverse("desfazer_importacao", args=[self.importacao.pk]))
+
+    def test_desfazer_importacao(self):
+        arquivo = SimpleUploadedFile(
+            "carga.csv",
+            "Tombo;Descrição;Valor (R$);Setor\n5001;MESA;10,00;BJL-DG\n5002;MESA;10,00;BJL-DG\n".encode("utf-8"),
+        )
+        importacao = ImportacaoPlanilha.objects.get(
+            pk=self.client.post(reverse("upload_planilha"), data={"planilha": arquivo}).json()["id"]
+        )
+        self.assertEqual(importacao.patrimonios.count(), 2)
+
+        response = self.assertMaximoConsultas(
+            7, self.client.post, reverse("desfazer_importacao", args=[importacao.pk])
+        )
+        self.assertContains(response, "Importação desfeita")
+        self.assertFalse(Patrimonio.objects.filter(tombo__in=[5001, 5002]).exists())
+        self.assertEqual(Patrimonio.objects.count(), PATRIMONIOS_POR_INVENTARIANTE * 2)
+
+        # Já desfeita: não pode ser desfeita de novo
+        response = self.client.post(reverse("desfazer_importacao", args=[importacao.pk]))
+        self.assertEqual(response.status_code, 409)
+
+    def test_excluir_planilha(self):
+        self.assertMaximoConsultas(7, self.client.post, reverse("excluir_planilha"))
+        self.assertFalse(Patrimonio.objects.exists())
+
+
+class OrcamentoConsultasMiddlewareTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@teste.br", "senha")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    @override_settings(ORCAMENTO_CONSULTAS={"patrimonio_list": 1})
+    def test_registra_estouro_do_orcamento(self):
+        with self.assertLogs("app.orcamento_consultas", "WARNING") as logs:
+            self.client.get(reverse("patrimonio_list"))
+        self.assertIn("patrimonio_list", logs.output[0])
+
+    @override_settings(ORCAMENTO_CONSULTAS={"patrimonio_list": 50})
+    def test_dentro_do_orcamento_nao_registra(self):
+        with self.assertNoLogs("app.orcamento_consultas", "WARNING"):
+            self.client.get(reverse("patrimonio_list"))
+
+    def test_decorador_conta_consultas(self):
+        medidor = orcamento_consultas(maximo=1, nome="teste")
+
+        @medidor
+        def duas_consultas():
+            list(User.objects.all())
+            list(Inventariante.objects.all())
+
+        with self.assertLogs("app.orcamento_consultas", "WARNING"):
+            duas_consultas()
+        self.assertEqual(medidor.total, 2)
+
+
+# ==========================================================
+# PAPEL DO USUÁRIO EM CACHE
+# ----------------------------------------------------------
+# Resolução do papel, reaproveitamento do cache entre
+# requisições e invalidação por inventariante e grupos.
+# ==========================================================
+class PapelTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user("membro", "membro@teste.br", "senha")
+        cls.inventariante = Inventariante.objects.create(
+            user=cls.usuario, matricula="0005", funcao="Membro", telefone="0"
+        )
+        cls.grupo = Group.objects.create(name=GRUPO_PRESIDENTE)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_resolve_papeis(self):
+        superusuario = User.objects.create_superuser("super", "super@teste.br", "senha")
+        sem_vinculo = User.objects.create_user("avulso", "avulso@teste.br", "senha")
+
+        self.assertEqual(papel_do_usuario(superusuario).nome, "superusuario")
+        self.assertEqual(papel_do_usuario(sem_vinculo), Papel("usuario"))
+        self.assertEqual(
+            papel_do_usuario(self.usuario), Papel("inventariante", self.inventariante.pk)
+        )
+
+    def test_papel_em_cache_consulta_apenas_a_versao(self):
+        papel_do_usuario(self.usuario)
+        with self.assertNumQueries(1):
+            self.assertFalse(papel_do_usuario(self.usuario).is_admin)
+
+    def test_invalida_em_lote_sem_sinais(self):
+        """update() e SQL direto não disparam sinais: a versão invalida o papel."""
+        self.assertFalse(papel_do_usuario(self.usuario).is_admin)
+
+        Inventariante.objects.filter(pk=self.inventariante.pk).update(presidente=True)
+        self.assertEqual(papel_do_usuario(self.usuario).nome, "presidente")
+
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE auth_user SET is_superuser = 1 WHERE id = %s", [self.usuario.pk])
+        self.usuario.refresh_from_db()
+        self.assertEqual(papel_do_usuario(self.usuario).nome, "superusuario")
+
+    def test_escrita_fora_do_papel_mantem_cache(self):
+        papel_do_usuario(self.usuario)
+        Inventariante.objects.filter(pk=self.inventariante.pk).update(telefone="1")
+        User.objects.filter(pk=self.usuario.pk).update(last_login=timezone.now())
+        with self.assertNumQueries(1):
+            papel_do_usuario(self.usuario)
+
+    def test_invalida_ao_alterar_presidente(self):
+        self.assertFalse(papel_do_usuario(self.usuario).is_admin)
+
+        self.inventariante.presidente = True
+        self.inventariante.save()
+        self.assertEqual(papel_do_usuario(self.usuario).nome, "presidente")
+
+    def test_invalida_ao_alterar_grupos(self):
+        self.assertFalse(papel_do_usuario(self.usuario).is_admin)
+
+        self.usuario.groups.add(self.grupo)
+        self.assertTrue(papel_do_usuario(self.usuario).is_admin)
+
+        self.grupo.user_set.clear()
+        self.assertFalse(papel_do_usuario(self.usuario).is_admin)
+
+        self.grupo.user_set.add(self.usuario)
+        self.assertTrue(papel_do_usuario(self.usuario).is_admin)
+
+    def test_view_administrativa_nega_acesso(self):
+        url = reverse("excluir_planilha_confirm")
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        response = self.client.get(url, headers={"HX-Request": "true"})
+        self.assertEqual(response.status_code, 200)
+
+        self.usuario.groups.add(self.grupo)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+# ==========================================================
+# CACHE DE FRAGMENTOS VERSIONADO
+# ----------------------------------------------------------
+# Toda escrita (individual, em lote ou no nome do responsável)
+# muda a versão dos dados; a página seguinte é renderizada de
+# novo, sem conteúdo obsoleto.
+# ==========================================================
+class CacheFragmentosTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@teste.br", "senha")
+        cls.inventariante = Inventariante.objects.create(
+            user=cls.admin, matricula="0006", funcao="Presidente", telefone="0", presidente=True
+        )
+        Patrimonio.objects.bulk_create([
+            Patrimonio(tombo=indice, descricao=f"MESA {indice}", inventariante=cls.inventariante)
+            for indice in range(1, 6)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def listar(self, **params):
+        return self.client.get(
+            reverse("patrimonio_list"), params,
+            headers={"HX-Request": "true", "HX-Target": "conteudo-patrimonios"},
+        )
+
+    def test_acerto_e_falta(self):
+        self.assertEqual(self.listar()["X-Cache-Fragmento"], "falta")
+        self.assertEqual(self.listar()["X-Cache-Fragmento"], "acerto")
+        self.assertEqual(self.listar(q="mesa")["X-Cache-Fragmento"], "falta")
+
+        estatisticas = self.client.get(reverse("cache_fragmentos")).json()["tabela_patrimonios"]
+        self.assertEqual((estatisticas["acertos"], estatisticas["faltas"]), (1, 2))
+
+    def test_escrita_muda_a_versao(self):
+        self.listar()
+        Patrimonio.objects.filter(tombo=1).update(descricao="ARMÁRIO")
+        response = self.listar()
+        self.assertEqual(response["X-Cache-Fragmento"], "falta")
+        self.assertContains(response, "ARMÁRIO")
+
+        self.admin.first_name = "Fulano"
+        self.admin.save()
+        response = self.listar()
+        self.assertEqual(response["X-Cache-Fragmento"], "falta")
+        self.assertContains(response, "Fulano")
+
+    def test_login_nao_muda_a_versao(self):
+        antes = carimbo("patrimonio", "inventariante", "usuario")
+        self.client.force_login(self.admin)
+        self.assertEqual(carimbo("patrimonio", "inventariante", "usuario"), antes)
+
+
+# ==========================================================
+# GET CONDICIONAL (ETAG / 304) NAS LISTAGENS HTMX
+# ==========================================================
+class GetCondicionalTests(TestCase):
+
+    HTMX = {"HX-Request": "true", "HX-Target": "conteudo-patrimonios"}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@teste.br", "senha")
+        cls.inventariante = Inventariante.objects.create(
+            user=cls.admin, matricula="0007", funcao="Presidente", telefone="0", presidente=True
+        )
+        Patrimonio.objects.create(tombo=1, descricao="MESA", inventariante=cls.inventariante)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+        papel_do_usuario(self.admin)
+
+    def test_304_sem_consultar_patrimonios(self):
+        response = self.client.get(reverse("patrimonio_list"), headers=self.HTMX)
+        self.assertIn("ETag", response)
+        self.assertIn("HX-Target", response["Vary"])
+
+        with orcamento_consultas() as medidor:
+            response = self.client.get(
+                reverse("patrimonio_list"), headers={**self.HTMX, "If-None-Match": response["ETag"]}
+            )
+        self.assertEqual(response.status_code, 304)
+        self.assertLessEqual(medidor.total, 4)
+
+    def test_escrita_invalida_etag(self):
+        etag = self.client.get(reverse("inventariantes_list"), headers={"HX-Request": "true"})["ETag"]
+
+        self.admin.email = "novo@teste.br"
+        self.admin.save()
+        response = self.client.get(
+            reverse("inventariantes_list"), headers={"HX-Request": "true", "If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "novo@teste.br")
+
+    def test_etag_varia_com_parametros(self):
+        etag = self.client.get(reverse("patrimonio_list"), headers=self.HTMX)["ETag"]
+        response = self.client.get(
+            reverse("patrimonio_list"), {"q": "mesa"}, headers={**self.HTMX, "If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_pagina_completa_sem_etag(self):
+        self.assertNotIn("ETag", self.client.get(reverse("patrimonio_list")))
+
+
+# ==========================================================
+# CONFERÊNCIA POR LEITOR (CHECK-IN)
+# ==========================================================
+class CheckinTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        usuario = User.objects.create_user("leitor", "leitor@teste.br", "senha")
+        cls.inventariante = Inventariante.objects.create(user=usuario, matricula="0008", funcao="Membro", telefone="0")
+        outro = User.objects.create_user("vizinho", "vizinho@teste.br", "senha")
+        cls.outro = Inventariante.objects.create(user=outro, matricula="0009", funcao="Membro", telefone="0")
+
+        Patrimonio.objects.bulk_create(
+            [Patrimonio(tombo=indice, situacao="nao_localizado", inventariante=cls.inventariante) for indice in (1, 2, 3)]
+            + [Patrimonio(tombo=4, inventariante=cls.outro)]
+        )
+
+    def test_classifica_leituras(self):
+        leituras = separar_leituras("1\n0002, 2;99 4 abc")
+        resultado = conferir_tombos(leituras, inventariante_id=self.inventariante.pk)
+
+        self.assertEqual(resultado.conferidos, [1, 2])
+        self.assertEqual(resultado.ja_conferidos, [2])
+        self.assertEqual(resultado.desconhecidos, [99])
+        self.assertEqual(resultado.fora_do_escopo, [4])
+        self.assertEqual(resultado.invalidos, ["abc"])
+
+        marcados = Patrimonio.objects.filter(tombo__in=[1, 2])
+        self.assertTrue(all(p.situacao == "localizado" and p.data_inventario for p in marcados))
+        self.assertEqual(Patrimonio.objects.get(tombo=3).situacao, "nao_localizado")
+
+        # Segunda leitura no mesmo dia: nada a alterar
+        self.assertEqual(conferir_tombos(["1"]).ja_conferidos, [1])
+
+    def test_lote_acima_do_maximo(self):
+        self.client.force_login(self.inventariante.user)
+        response = self.client.post(
+            reverse("patrimonio_checkin"), {"tombos": " ".join(["1"] * (LOTE_MAXIMO + 1))}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+# ==========================================================
+# EXCLUSÃO EM BLOCOS
+# ----------------------------------------------------------
+# Blocos menores que a tabela: o laço deve seguir até esgotar
+# as linhas, e os triggers manter o resumo coerente.
+# ==========================================================
+class ExclusaoTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        usuario = User.objects.create_user("carga", "carga@teste.br", "senha")
+        cls.inventariante = Inventariante.objects.create(user=usuario, matricula="0010", funcao="Membro", telefone="0")
+        cls.importacao = ImportacaoPlanilha.objects.create(
+            inventariante=cls.inventariante, arquivo="importacoes/carga.csv", status="concluida", inseridos=12
+        )
+        Patrimonio.objects.bulk_create(
+            [Patrimonio(tombo=indice, inventariante=cls.inventariante) for indice in range(1, 11)]
+            + [
+                Patrimonio(tombo=indice, inventariante=cls.inventariante, importacao=cls.importacao)
+                for indice in range(11, 23)
+            ]
+        )
+
+    def test_excluir_importacao(self):
+        self.assertEqual(excluir_importacao(self.importacao, tamanho=5, pausa=0), 12)
+
+        self.assertEqual(Patrimonio.objects.count(), 10)
+        self.assertFalse(Patrimonio.objects.filter(tombo__gt=10).exists())
+        self.assertEqual(ImportacaoPlanilha.objects.get(pk=self.importacao.pk).status, "desfeita")
+        self.assertEqual(reconciliar(corrigir=False), [])
+
+    def test_excluir_patrimonios(self):
+        self.assertEqual(excluir_patrimonios(tamanho=7, pausa=0), 22)
+
+        self.assertFalse(Patrimonio.objects.exists())
+        self.assertEqual(contar_patrimonios(), 0)
+        self.assertEqual(reconciliar(corrigir=False), [])
+
+
+# ==========================================================
+# CAMPANHAS ANUAIS
+# ----------------------------------------------------------
+# Encerrar arquiva a situação por tombo e reinicia a tabela
+# principal; a comparação usa o arquivo e a campanha aberta.
+# ==========================================================
+class CampanhaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        usuario = User.objects.create_user("anual", "anual@teste.br", "senha")
+        cls.inventariante = Inventariante.objects.create(user=usuario, matricula="0011", funcao="Membro", telefone="0")
+        Patrimonio.objects.bulk_create([
+            Patrimonio(tombo=1, situacao="localizado", data_inventario=date(2025, 5, 1), inventariante=cls.inventariante),
+            Patrimonio(tombo=2, situacao="localizado", data_inventario=date(2025, 5, 1), inventariante=cls.inventariante),
+            Patrimonio(tombo=3, situacao="nao_localizado", inventariante=cls.inventariante),
+            Patrimonio(tombo=4, situacao="calamidade", inventariante=cls.inventariante),
+        ])
+
+    def test_encerrar_e_comparar(self):
+        abrir_campanha(2025)
+        with self.assertRaises(ValueError):
+            abrir_campanha(2026)
+
+        anterior = encerrar_campanha()
+        self.assertEqual(anterior.resultados.count(), 4)
+        self.assertEqual(ResultadoCampanha.objects.get(campanha=anterior, tombo=1).data_inventario, date(2025, 5, 1))
+        self.assertEqual(
+            dict(Patrimonio.objects.values_list("tombo", "situacao")),
+            {1: "nao_localizado", 2: "nao_localizado", 3: "nao_localizado", 4: "calamidade"},
+        )
+        self.assertEqual(reconciliar(corrigir=False), [])
+
+        # Sem campanha aberta, ou aberta sem check-ins (situação
+        # reiniciada), não há o que comparar
+        with self.assertRaises(ValueError):
+            comparar_campanhas(anterior)
+        abrir_campanha(2026)
+        with self.assertRaises(ValueError):
+            comparar_campanhas(anterior)
+
+        # Campanha seguinte (aberta): tombo 1 reencontrado, 3 aparece
+        Patrimonio.objects.filter(tombo__in=[1, 3]).update(situacao="localizado")
+
+        comparacao = comparar_campanhas(anterior)
+        self.assertEqual([linha[0] for linha in comparacao.perdidos], [2])
+        self.assertEqual(comparacao.encontrados, [(3, None, "nao_localizado", "localizado")])
+
+        # Entre duas campanhas arquivadas, o resultado é o mesmo
+        atual = encerrar_campanha()
+        comparacao = comparar_campanhas(anterior, atual)
+        self.assertEqual([linha[0] for linha in comparacao.perdidos], [2])
+        self.assertEqual([linha[0] for linha in comparacao.encontrados], [3])
+
+
+# ==========================================================
+# AJUSTES DAS CONEXÕES SQLITE
+# ----------------------------------------------------------
+# settings.SQLITE_PRAGMAS aplicados na abertura da conexão.
+# ==========================================================
+class BancoTests(TestCase):
+
+    def test_pragmas_aplicados(self):
+        connection.ensure_connection()
+        atuais = ler_pragmas(connection.connection, ["busy_timeout", "cache_size"])
+        self.assertEqual(atuais, {"busy_timeout": 5000, "cache_size": -64000})
+
+    @override_settings(SQLITE_PRAGMAS={"journal_mode": "WAL; DROP TABLE app_patrimonio"})
+    def test_pragma_invalido(self):
+        with self.assertRaises(ValueError):
+            pragmas_configurados()
+
+
+# ==========================================================
+# PLANOS DAS CONSULTAS FREQUENTES
+# ----------------------------------------------------------
+# Nenhuma consulta registrada em app/plano_consultas.py pode
+# varrer uma tabela inteira (mesma regra de verificar_indices).
+# ==========================================================
+class PlanoConsultasTests(TestCase):
+
+    def test_analisar_plano(self):
+        self.assertEqual(
+            analisar_plano(["4 0 0 SCAN app_patrimonio", "9 0 0 USE TEMP B-TREE FOR DISTINCT"]),
+            (["app_patrimonio"], True),
+        )
+        self.assertEqual(
+            analisar_plano([
+                "5 0 0 SEARCH app_patrimonio USING INDEX patrimonio_situacao_idx (situacao=?)",
+                "7 0 0 SCAN app_patrimonio USING COVERING INDEX patrimonio_setor_sit_idx",
+                "10 8 0 SCAN app_patrimonio_fts VIRTUAL TABLE INDEX 0:M7",
+            ]),
+            ([], False),
+        )
+
+    def test_consultas_usam_indices(self):
+        for plano in verificar_consultas():
+            self.assertEqual(plano.varreduras, [], f"{plano.nome}: {plano.linhas}")
+
+
+# ==========================================================
+# DADOS SINTÉTICOS E SUÍTE DE BENCHMARKS
+# ----------------------------------------------------------
+# Mesma semente, mesmos dados; banco e planilhas gerados com
+# a mesma impressão digital da importação.
+# ==========================================================
+class DadosSinteticosTests(TestCase):
+
+    def setUp(self):
+        self.diretorio = Path(tempfile.mkdtemp(prefix="inventario_sinteticos_"))
+        self.addCleanup(shutil.rmtree, self.diretorio, ignore_errors=True)
+
+    def test_registros_deterministicos_e_assimetricos(self):
+        self.assertEqual(list(gerar_registros(50, semente=7)), list(gerar_registros(50, semente=7)))
+        self.assertNotEqual(list(gerar_registros(50, semente=7)), list(gerar_registros(50, semente=8)))
+
+        setores = Counter(dados["setor"] for dados in gerar_registros(3000))
+        self.assertEqual(setores.most_common(1)[0][0], SETORES[0])
+        self.assertGreater(sum(quantidade for _, quantidade in setores.most_common(5)), 3000 * 0.45)
+
+    def test_gerar_dados_sinteticos(self):
+        call_command(
+            "gerar_dados_sinteticos", patrimonios=40, inventariantes=3,
+            arquivos=self.diretorio, formatos="csv", stdout=StringIO(),
+        )
+        self.assertEqual(Patrimonio.objects.count(), 40)
+        self.assertEqual(Inventariante.objects.filter(matricula__startswith="SINT").count(), 3)
+        self.assertEqual(reconciliar(corrigir=False), [])
+
+        # A planilha gerada corresponde ao banco: nada a atualizar
+        inventariante = Inventariante.objects.first()
+        resumo = importar_planilha(self.diretorio / "patrimonios.csv", inventariante, modo="atualizar")
+        self.assertEqual((resumo.inalterados, resumo.atualizados, resumo.inseridos), (40, 0, 0))
+
+        call_command("gerar_dados_sinteticos", patrimonios=0, limpar=True, stdout=StringIO())
+        self.assertFalse(Patrimonio.objects.exists())
+        self.assertFalse(User.objects.filter(username__startswith="sintetico").exists())
+
+    def test_arquivos_com_mesmas_linhas(self):
+        caminhos = escrever_arquivos(self.diretorio, 15, ("xlsx", "csv"))
+        for caminho in caminhos.values():
+            resumo = importar_planilha(caminho, None, modo="validar")
+            self.assertEqual((resumo.linhas_processadas, resumo.rejeitados), (15, 0))
+
+    def test_benchmark_desempenho(self):
+        User.objects.create_superuser("bench", "bench@teste.br", "senha")
+        call_command("gerar_dados_sinteticos", patrimonios=30, inventariantes=2, stdout=StringIO())
+        saida = self.diretorio / "resultado.json"
+
+        call_command(
+            "benchmark_desempenho", repeticoes=1, linhas_importacao=10, saida=saida,
+            comparar=None, stdout=StringIO(),
+        )
+        resultado = json.loads(saida.read_text(encoding="utf-8"))
+        self.assertEqual(resultado["banco"]["patrimonios"], 30)
+        self.assertIn("listagem_fragmento_acerto", resultado["resultados"])
+        self.assertGreater(resultado["resultados"]["importacao_csv_validar"]["linhas_por_s"], 0)
+
+        # Nada gravado pelos casos de importação
+        self.assertEqual(Patrimonio.objects.count(), 30)
+
+        stdout = StringIO()
+        call_command("benchmark_desempenho", repeticoes=1, casos="busca", comparar=saida, stdout=stdout)
+        self.assertIn("Comparação com", stdout.getvalue())
+
+
+# ==========================================================
+# IMPORTAÇÃO PARALELA (import_planilhas)
+# ----------------------------------------------------------
+# Leitura no pool de processos, gravação única; cada arquivo
+# é tudo ou nada e fica no histórico de importações.
+# ==========================================================
+@override_settings(MEDIA_ROOT=MEDIA_TESTES)
+class ImportacaoParalelaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        usuario = User.objects.create_user("campi", "campi@teste.br", "senha")
+        cls.inventariante = Inventariante.objects.create(user=usuario, matricula="0012", funcao="Membro", telefone="0")
+
+    def setUp(self):
+        self.diretorio = Path(tempfile.mkdtemp(prefix="inventario_lote_"))
+        self.addCleanup(shutil.rmtree, self.diretorio, ignore_errors=True)
+        escrever_arquivos(self.diretorio, 25, ("csv",), semente=1, tombo_inicial=1000, nome="campus_a")
+        escrever_arquivos(self.diretorio, 30, ("xlsx",), semente=2, tombo_inicial=2000, nome="campus_b")
+
+    def test_importar_diretorio(self):
+        (self.diretorio / "quebrada.xlsx").write_bytes(b"nao e xlsx")
+        (self.diretorio / "~$campus_b.xlsx").write_bytes(b"trava")
+
+        stdout = StringIO()
+        call_command(
+            "import_planilhas", str(self.diretorio), inventariante="0012", processos=2,
+            linhas_por_transacao=20, stdout=stdout,
+        )
+
+        self.assertEqual(Patrimonio.objects.count(), 55)
+        self.assertEqual(Patrimonio.objects.filter(importacao__nome_original="campus_b.xlsx").count(), 30)
+        self.assertEqual(
+            dict(ImportacaoPlanilha.objects.values_list("nome_original", "status")),
+            {"campus_a.csv": "concluida", "campus_b.xlsx": "concluida", "quebrada.xlsx": "erro"},
+        )
+        self.assertIn("linhas/s", stdout.getvalue())
+        self.assertEqual(reconciliar(corrigir=False), [])
+
+        # Reimportação: nada a gravar
+        arquivos = importar_planilhas(sorted(self.diretorio.glob("campus_*")), self.inventariante, modo="atualizar")
+        self.assertEqual([arquivo.resumo.inalterados for arquivo in arquivos], [25, 30])
+
+    def test_arquivo_nao_confirmado_e_desfeito(self):
+        def interromper(arquivo):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            importar_planilhas(
+                sorted(self.diretorio.glob("campus_*")), self.inventariante,
+                processos=1, linhas_por_transacao=10, ao_confirmar=interromper,
+            )
+
+        confirmada = ImportacaoPlanilha.objects.get(status="concluida")
+        self.assertEqual(ImportacaoPlanilha.objects.filter(status="erro").count(), 1)
+        self.assertEqual(Patrimonio.objects.count(), confirmada.inseridos)
+        self.assertEqual(reconciliar(corrigir=False), [])
+
+    def test_atualizar_falha_no_meio_do_arquivo(self):
+        Patrimonio.objects.bulk_create([
+            Patrimonio(tombo=tombo, descricao="ORIGINAL", inventariante=self.inventariante)
+            for tombo in range(900001, 900005)
+        ])
+        caminho = self.diretorio / "alterada.csv"
+        caminho.write_text(
+            "Tombo;Descrição\n" + "".join(f"{tombo};ALTERADA\n" for tombo in range(900001, 900005)),
+            encoding="utf-8",
+        )
+
+        def ler_e_falhar(arquivo, tamanho_lote):
+            lotes = validar_planilha(arquivo, tamanho_lote)
+            yield next(lotes)
+            raise ValueError("planilha corrompida")
+
+        # O pool criado por fork herda a substituição
+        with mock.patch("app.importacao.validar_planilha", ler_e_falhar):
+            arquivos = importar_planilhas(
+                [caminho], self.inventariante, modo="atualizar",
+                processos=1, tamanho_lote=2, linhas_por_transacao=1,
+                contexto=multiprocessing.get_context("fork"),
+            )
+
+        self.assertIn("planilha corrompida", arquivos[0].mensagem_erro)
+        self.assertEqual(ImportacaoPlanilha.objects.get().status, "erro")
+        self.assertEqual(
+            set(Patrimonio.objects.values_list("descricao", flat=True)), {"ORIGINAL"}
+        )
+
+    def test_inserir_falha_no_meio_do_arquivo(self):
+        quebrada = self.diretorio / "quebrada.csv"
+        quebrada.write_text(
+            "Tombo;Descrição\n" + "".join(f"{tombo};MESA\n" for tombo in range(900001, 900007)),
+            encoding="utf-8",
+        )
+        validar = validar_planilha
+
+        def falhar_na_quebrada(arquivo, tamanho_lote):
+            lotes = validar(arquivo, tamanho_lote)
+            if not str(arquivo).endswith("quebrada.csv"):
+                yield from lotes
+                return
+            yield next(lotes)
+            yield next(lotes)
+            raise ValueError("planilha corrompida")
+
+        with mock.patch("app.importacao.validar_planilha", falhar_na_quebrada):
+            importar_planilhas(
+                [quebrada, *sorted(self.diretorio.glob("campus_*"))], self.inventariante,
+                processos=2, tamanho_lote=2, linhas_por_transacao=1,
+                contexto=multiprocessing.get_context("fork"),
+            )
+
+        falha = ImportacaoPlanilha.objects.get(nome_original="quebrada.csv")
+        self.assertEqual(falha.status, "erro")
+        self.assertIn("planilha corrompida", falha.mensagem_erro)
+        self.assertFalse(Patrimonio.objects.filter(tombo__gte=900001).exists())
+        self.assertEqual(
+            sorted(ImportacaoPlanilha.objects.filter(status="concluida").values_list("nome_original", "inseridos")),
+            [("campus_a.csv", 25), ("campus_b.xlsx", 30)],
+        )
+        self.assertEqual(Patrimonio.objects.count(), 55)
+        self.assertEqual(reconciliar(corrigir=False), [])
+
+    def test_arquivo_corrompido_com_spawn(self):
+        # Método de início do Windows e do macOS: processos sem herança do pai
+        (self.diretorio / "corrompida.xlsx").write_bytes(b"nao e xlsx")
+
+        arquivos = importar_planilhas(
+            sorted(self.diretorio.iterdir()), self.inventariante, processos=2,
+            contexto=multiprocessing.get_context("spawn"),
+        )
+
+        self.assertEqual(
+            [(Path(arquivo.caminho).name, arquivo.importacao.status) for arquivo in arquivos],
+            [("campus_a.csv", "concluida"), ("campus_b.xlsx", "concluida"), ("corrompida.xlsx", "erro")],
+        )
+        self.assertTrue(arquivos[2].mensagem_erro)
+        self.assertFalse(Patrimonio.objects.filter(importacao=arquivos[2].importacao).exists())
+        self.assertEqual(Patrimonio.objects.count(), 55)
+
+
+# ==========================================================
+# RESUMO DO INVENTÁRIO MANTIDO POR TRIGGERS
+# ----------------------------------------------------------
+# Após escritas individuais e em lote, o resumo deve coincidir
+# com a agregação real da tabela de patrimônios.
+# ==========================================================
+class ResumoInventarioTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        usuario = User.objects.create_user("inv", "inv@teste.br", "senha")
+        cls.inventariante = Inventariante.objects.create(user=usuario, matricula="0003", funcao="Membro", telefone="0")
+        outro = User.objects.create_user("outro", "outro@teste.br", "senha")
+        cls.outro = Inventariante.objects.create(user=outro, matricula="0004", funcao="Membro", telefone="0")
+
+        Patrimonio.objects.bulk_create([
+            Patrimonio(tombo=indice, valor=10, setor=f"SETOR {indice % 3}", inventariante=cls.inventariante)
+            for indice in range(1, 31)
+        ])
+
+    def test_resumo_acompanha_escritas(self):
+        self.assertEqual(contar_patrimonios(), 30)
+
+        patrimonio = Patrimonio.objects.get(tombo=1)
+        patrimonio.situacao = "nao_localizado"
+        patrimonio.valor = 99
+        patrimonio.save()
+
+        Patrimonio.objects.filter(tombo__lte=10).update(inventariante=self.outro)
+        Patrimonio.objects.filter(setor="SETOR 2").update(situacao="calamidade")
+        Patrimonio.objects.filter(tombo__gt=25).delete()
+
+        self.assertEqual(reconciliar(corrigir=False), [])
+        self.assertEqual(contar_patrimonios(self.outro), 10)
+        self.assertEqual(contar_patrimonios(), 25)
+        self.assertEqual(totais_por_situacao()["nao_localizado"], 1)
+
+    def test_reconciliar_corrige_divergencias(self):
+        ResumoInventario.objects.filter(dimensao="total").update(quantidade=1)
+        self.assertTrue(reconciliar())
+        self.assertEqual(reconciliar(corrigir=False), [])
+        self.assertEqual(contar_patrimonios(), 30)
+
+
+# ==========================================================
+# VALIDAÇÃO DE DATAS DA PLANILHA
+# ----------------------------------------------------------
+# Datas nativas, seriais do Excel e texto são aceitos; valores
+# fora da faixa rejeitam apenas a linha, sem abortar o lote.
+# ==========================================================
+class ValidacaoDatasTests(TestCase):
+
+    def validar(self, *valores):
+        validador = ValidadorPlanilha()
+        list(validador.linhas_de_dados([(1, ["Tombo", "Descrição", "Data Aquisição"])]))
+        return validador.validar_lote([
+            (numero, [numero, "MESA", valor]) for numero, valor in enumerate(valores, start=2)
+        ])
+
+    def datas(self, resultado):
+        return {numero: dados["data_documento"] for numero, dados in resultado.registros}
+
+    def test_datas_aceitas(self):
+        resultado = self.validar(
+            45000, "45000", 45000.75,
+            "15/03/2023", "2023-03-15", "2023-03-15T10:30:00", "2023-03-15 10:30:00",
+            datetime(2023, 3, 15, 10, 30),
+        )
+        self.assertEqual(resultado.erros, [])
+        self.assertEqual(set(self.datas(resultado).values()), {date(2023, 3, 15)})
+
+    def test_datas_fora_da_faixa_rejeitam_a_linha(self):
+        invalidos = ["20200101", 20200101, -5, 0, 10 ** 12, "31/02/2020", date(1500, 1, 1)]
+        resultado = self.validar(*invalidos, "15/03/2023")
+
+        self.assertEqual(resultado.rejeitados, len(invalidos))
+        self.assertEqual({erro["erro"] for erro in resultado.erros}, {"Data inválida"})
+        self.assertEqual(self.datas(resultado), {len(invalidos) + 2: date(2023, 3, 15)})
+
+    def test_importacao_segue_com_data_invalida(self):
+        diretorio = Path(tempfile.mkdtemp(prefix="inventario_datas_"))
+        self.addCleanup(shutil.rmtree, diretorio, ignore_errors=True)
+        caminho = diretorio / "datas.csv"
+        caminho.write_text(
+            "Tombo;Descrição;Data Aquisição\n1;MESA;20200101\n2;CADEIRA;15/03/2023\n", encoding="utf-8"
+        )
+        usuario = User.objects.create_user("datas", "datas@teste.br", "senha")
+        inventariante = Inventariante.objects.create(user=usuario, matricula="0013", funcao="Membro", telefone="0")
+
+        resumo = importar_planilha(caminho, inventariante)
+
+        self.assertEqual((resumo.inseridos, resumo.rejeitados), (1, 1))
+        self.assertEqual(Patrimonio.objects.get().data_documento, date(2023, 3, 15))
+
+
+# ==========================================================
+# CABEÇALHO, TOMBOS, VALORES E RELATÓRIO DE ERROS
+# ==========================================================
+class ValidacaoPlanilhaTests(TestCase):
+
+    def test_cabecalho_com_aliases_fora_de_ordem_e_colunas_extras(self):
+        self.assertEqual(
+            mapear_cabecalho(["Observação", "Valor (R$)", "Nº Patrimônio", "Especificação", "LOCALIZAÇÃO"]),
+            {"valor": 1, "tombo": 2, "descricao": 3, "setor": 4},
+        )
+        # Sem tombo ou com menos de três colunas reconhecidas não é cabeçalho
+        self.assertIsNone(mapear_cabecalho(["Descrição", "Valor", "Setor"]))
+        self.assertIsNone(mapear_cabecalho(["Tombo", "Valor"]))
+
+    def test_titulo_acima_do_cabecalho(self):
+        validador = ValidadorPlanilha()
+        linhas = list(validador.linhas_de_dados([
+            (1, ["Inventário 2025 — Campus Bom Jesus", None, None]),
+            (2, [None, None, None]),
+            (3, ["Setor", "Tombo", "Descrição", "Extra"]),
+            (4, ["BJL-DG", "101", "MESA", "x"]),
+        ]))
+        self.assertEqual(linhas, [(4, ["BJL-DG", "101", "MESA", "x"])])
+
+        resultado = validador.validar_lote(linhas)
+        self.assertEqual(resultado.erros, [])
+        dados = resultado.registros[0][1]
+        self.assertEqual((dados["tombo"], dados["descricao"], dados["setor"]), (101, "MESA", "BJL-DG"))
+
+    def test_tombo_repetido_em_lotes_diferentes(self):
+        validador = ValidadorPlanilha()
+        list(validador.linhas_de_dados([(1, ["Tombo", "Descrição", "Setor"])]))
+
+        primeiro = validador.validar_lote([(2, ["101", "MESA", "A"]), (3, ["102", "MESA", "A"])])
+        segundo = validador.validar_lote([(4, ["102", "MESA", "B"]), (5, ["103", "MESA", "B"])])
+
+        self.assertEqual([numero for numero, _dados in primeiro.registros], [2, 3])
+        self.assertEqual([numero for numero, _dados in segundo.registros], [5])
+        self.assertEqual(
+            segundo.erros, [{"linha": 4, "coluna": "tombo", "valor": "102", "erro": "Tombo repetido na planilha"}]
+        )
+
+    def test_valor_em_formato_brasileiro(self):
+        validador = ValidadorPlanilha()
+        list(validador.linhas_de_dados([(1, ["Tombo", "Descrição", "Valor"])]))
+        valores = ["1.234,56", "R$ 1.234,56", "1234,56", "1234.56", 1234.56, "10"]
+        resultado = validador.validar_lote([
+            (numero, [numero, "MESA", valor]) for numero, valor in enumerate(valores + ["1,2,3"], start=2)
+        ])
+
+        self.assertEqual(
+            [float(dados["valor"]) for _numero, dados in resultado.registros],
+            [1234.56] * 5 + [10.0],
+        )
+        self.assertEqual([(erro["linha"], erro["erro"]) for erro in resultado.erros], [(8, "Valor inválido")])
+
+    def test_relatorio_de_erros(self):
+        diretorio = Path(tempfile.mkdtemp(prefix="inventario_relatorio_"))
+        self.addCleanup(shutil.rmtree, diretorio, ignore_errors=True)
+        caminho = diretorio / "erros.csv"
+
+        with RelatorioErros(caminho) as relatorio:
+            relatorio.registrar([])
+            self.assertFalse(caminho.exists())
+            relatorio.registrar([{"linha": 4, "coluna": "tombo", "valor": "abc", "erro": "Tombo inválido"}])
+            relatorio.registrar([{"linha": 9, "coluna": "valor", "valor": "1;2", "erro": "Valor inválido"}])
+        self.assertEqual(relatorio.total, 2)
+
+        conteudo = caminho.read_bytes()
+        self.assertTrue(conteudo.startswith(codecs.BOM_UTF8))
+        self.assertEqual(conteudo.decode("utf-8-sig").splitlines(), [
+            "linha;coluna;valor;erro",
+            "4;tombo;abc;Tombo inválido",
+            '9;valor;"1;2";Valor inválido',
+        ])
+
+
+# ==========================================================
+# LEITORES DE ARQUIVOS TEXTO
+# ----------------------------------------------------------
+# CSV (delimitador e codificação detectados), TSV e largura
+# fixa (colunas pelas calhas em branco do arquivo).
+# ==========================================================
+class LeitoresTextoTests(TestCase):
+
+    def setUp(self):
+        self.diretorio = Path(tempfile.mkdtemp(prefix="inventario_leitores_"))
+        self.addCleanup(shutil.rmtree, self.diretorio, ignore_errors=True)
+
+    def escrever(self, nome, conteudo, codificacao="utf-8"):
+        caminho = self.diretorio / nome
+        caminho.write_bytes(conteudo.encode(codificacao))
+        return caminho
+
+    def test_csv_ponto_e_virgula_em_cp1252(self):
+        caminho = self.escrever("bens.csv", "Tombo;Descrição\n1;Mesa de reunião\n", "cp1252")
+        self.assertEqual(detectar_formato(caminho), "csv")
+        self.assertEqual(list(ler_linhas(caminho)), [(1, ["Tombo", "Descrição"]), (2, ["1", "Mesa de reunião"])])
+
+    def test_csv_virgula_com_aspas(self):
+        caminho = self.escrever("bens.csv", 'Tombo,Descrição,Valor\n1,"Mesa, 120x60","1.234,56"\n')
+        self.assertEqual(list(ler_linhas(caminho))[1], (2, ["1", "Mesa, 120x60", "1.234,56"]))
+
+    def test_tsv_por_extensao_e_por_conteudo(self):
+        conteudo = "Tombo\tDescrição\n1\tMesa; redonda\n"
+        for nome in ("bens.tsv", "bens.txt"):
+            caminho = self.escrever(nome, conteudo)
+            self.assertEqual(detectar_formato(caminho), "tsv")
+            self.assertEqual(list(ler_linhas(caminho))[1], (2, ["1", "Mesa; redonda"]))
+
+    def test_largura_fixa_valores_alinhados_a_direita(self):
+        caminho = self.escrever("bens.txt", (
+            "Relatório de bens\n"
+            "Tombo   Descrição            Valor  Setor\n"
+            "101     Mesa              1.234,56  BJL\n"
+            "102     Cadeira giratória    10,00  BJL-DG\n"
+        ))
+        self.assertEqual(detectar_formato(caminho), "largura_fixa")
+        self.assertEqual(list(ler_linhas(caminho))[2:], [
+            (3, ["101", "Mesa", "1.234,56", "BJL"]),
+            (4, ["102", "Cadeira giratória", "10,00", "BJL-DG"]),
+        ])
+
+        resumo = importar_planilha(caminho, None, modo="validar")
+        self.assertEqual((resumo.linhas_processadas, resumo.rejeitados), (2, 0))
+
+    def test_largura_fixa_sem_calha_e_rejeitada(self):
+        caminho = self.escrever("bens.txt", (
+            "Tombo   Descrição    Valor\n"
+            "101     Mesa de reunião oval\n"
+        ))
+        with self.assertRaisesMessage(ValueError, "Largura fixa ambígua"):
+            list(ler_linhas(caminho))
+
+    def test_largura_fixa_sem_cabecalho(self):
+        caminho = self.escrever("bens.prn", "101  Mesa redonda  10,00\n102  Cadeira  20,00\n")
+        self.assertEqual(list(ler_linhas(caminho)), [
+            (1, ["101", "Mesa redonda", "10,00"]),
+            (2, ["102", "Cadeira", "20,00"]),
+        ])
+
+
+# ==========================================================
+# PAGINAÇÃO POR CURSOR
+# ==========================================================
+class PaginacaoCursorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@teste.br", "senha")
+        inventariante = Inventariante.objects.create(user=cls.admin, matricula="0007")
+        Patrimonio.objects.bulk_create(
+            Patrimonio(tombo=tombo, descricao=f"MESA {tombo}", inventariante=inventariante)
+            for tombo in range(1, 8)
+        )
+        cls.ids = list(Patrimonio.objects.order_by("id").values_list("id", flat=True))
+
+    def paginar(self, **kwargs):
+        return paginar_por_cursor(Patrimonio.objects.order_by("id"), 3, **kwargs)
+
+    def test_navegacao_para_frente_e_para_tras(self):
+        primeira = self.paginar()
+        segunda = self.paginar(apos=primeira.cursor_proximo)
+        terceira = self.paginar(apos=segunda.cursor_proximo)
+        self.assertEqual([p.id for p in primeira], self.ids[:3])
+        self.assertEqual([p.id for p in segunda], self.ids[3:6])
+        self.assertEqual([p.id for p in terceira], self.ids[6:])
+        self.assertEqual((primeira.has_previous(), primeira.has_next()), (False, True))
+        self.assertEqual((terceira.has_previous(), terceira.has_next()), (True, False))
+
+        voltou = self.paginar(antes=segunda.cursor_anterior)
+        self.assertEqual([p.id for p in voltou], self.ids[:3])
+        self.assertFalse(voltou.has_previous())
+
+        ultima = self.paginar(ultima=True)
+        self.assertEqual([p.id for p in ultima], self.ids[4:])
+        self.assertEqual((ultima.has_previous(), ultima.has_next()), (True, False))
+
+    def test_ordenacao_por_anotacao_da_busca(self):
+        # Cursor com a relevância (FTS5) ou o acerto exato do tombo
+        for termo in ("mesa", "1"):
+            with self.subTest(termo=termo):
+                busca = buscar_patrimonios(Patrimonio.objects.all(), termo)
+                vistos, pagina = [], paginar_por_cursor(busca, 2)
+                while True:
+                    vistos += [p.id for p in pagina]
+                    if not pagina.has_next():
+                        break
+                    pagina = paginar_por_cursor(busca, 2, apos=pagina.cursor_proximo)
+                self.assertEqual(vistos, [p.id for p in busca])
+
+    def test_cursor_adulterado_volta_a_primeira_pagina(self):
+        for cursor in (
+            "WyJhYmMiXQ",                        # ["abc"]
+            "W3siYSI6MX1d",                      # [{"a": 1}]
+            codificar_cursor([[1]]),
+            codificar_cursor([1, 2]),            # colunas a mais
+            codificar_cursor([]),
+            codificar_cursor({"id": 1}),
+            "%%%",
+        ):
+            with self.subTest(cursor=cursor):
+                for parametro in ("apos", "antes"):
+                    pagina = self.paginar(**{parametro: cursor})
+                    self.assertEqual([p.id for p in pagina], self.ids[:3])
+
+    def test_cursor_em_texto_e_convertido(self):
+        pagina = self.paginar(apos=codificar_cursor([str(self.ids[2])]))
+        self.assertEqual([p.id for p in pagina], self.ids[3:6])
+
+    def test_view_com_cursor_adulterado(self):
+        self.client.force_login(self.admin)
+        for parametro in ("apos", "antes"):
+            for cursor in ("WyJhYmMiXQ", "W3siYSI6MX1d"):
+                response = self.client.get(reverse("patrimonio_list"), {parametro: cursor})
+                self.assertEqual(response.status_code, 200)
+
+
+# ==========================================================
+# BUSCA TEXTUAL (FTS5)
+# ==========================================================
+class BuscaTextoTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("inv", password="senha")
+        cls.inventariante = Inventariante.objects.create(user=user, matricula="0001")
+        cls.cadeira = Patrimonio.objects.create(
+            tombo=10, descricao="Cadeira giratória Não patrimoniada", setor="BJL-DG",
+            inventariante=cls.inventariante,
+        )
+        cls.mesa = Patrimonio.objects.create(
+            tombo=11, descricao="Mesa de reunião", setor="BJL-DG", fornecedor="Móveis Ação",
+            inventariante=cls.inventariante,
+        )
+
+    def buscar(self, termo):
+        return set(buscar_patrimonios(Patrimonio.objects.all(), termo).values_list("id", flat=True))
+
+    def test_insensivel_a_acentos(self):
+        self.assertEqual(self.buscar("nao"), {self.cadeira.pk})
+        self.assertEqual(self.buscar("REUNIAO"), {self.mesa.pk})
+        self.assertEqual(self.buscar("acao"), {self.mesa.pk})
+
+    def test_varios_termos_com_prefixo(self):
+        self.assertEqual(self.buscar("cad gir"), {self.cadeira.pk})
+        self.assertEqual(self.buscar("bjl dg"), {self.cadeira.pk, self.mesa.pk})
+        self.assertEqual(self.buscar("cad reun"), set())
+
+    def test_resultados_com_relevancia(self):
+        resultado = buscar_patrimonios(Patrimonio.objects.all(), "mesa")
+        self.assertIsNotNone(resultado.get().relevancia)
+
+    def test_indice_consultado_uma_vez(self):
+        # Sem subconsulta correlacionada por linha, também no filtro do cursor
+        busca = buscar_patrimonios(Patrimonio.objects.all(), "bjl")
+        primeira = paginar_por_cursor(busca, 1)
+        with CaptureQueriesContext(connection) as consultas:
+            segunda = paginar_por_cursor(busca, 1, apos=primeira.cursor_proximo)
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(len(segunda), 1)
+
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + consultas[0]["sql"])
+            plano = "\n".join(str(linha[-1]) for linha in cursor.fetchall())
+        self.assertNotIn("CORRELATED", plano)
+        self.assertEqual(plano.count("app_patrimonio_fts"), 1, plano)
+
+    def test_atualizar_resultado_da_busca(self):
+        resultado = buscar_patrimonios(Patrimonio.objects.all(), "cadeira")
+        Patrimonio.objects.filter(pk__in=resultado.values("pk")).update(situacao="calamidade")
+        self.assertEqual(
+            list(Patrimonio.objects.filter(situacao="calamidade").values_list("pk", flat=True)), [self.cadeira.pk]
+        )
+
+    def test_sem_fts_usa_icontains(self):
+        with mock.patch("app.busca.fts_disponivel", return_value=False):
+            self.assertEqual(self.buscar("giratória"), {self.cadeira.pk})
+            self.assertEqual(self.buscar("bjl-dg"), {self.cadeira.pk, self.mesa.pk})
+            # icontains não ignora acentos
+            self.assertEqual(self.buscar("giratoria"), set())
+
+    def test_termo_sem_palavras_usa_icontains(self):
+        self.assertEqual(self.buscar("-"), {self.cadeira.pk, self.mesa.pk})
+
+    def test_indice_acompanha_insercao_alteracao_e_exclusao(self):
+        # Triggers da migração 0009
+        novo = Patrimonio.objects.create(tombo=12, descricao="Armário", inventariante=self.inventariante)
+        self.assertEqual(self.buscar("armario"), {novo.pk})
+
+        Patrimonio.objects.filter(pk=novo.pk).update(descricao="Estante")
+        self.assertEqual(self.buscar("armario"), set())
+        self.assertEqual(self.buscar("estante"), {novo.pk})
+
+        Patrimonio.objects.bulk_create([
+            Patrimonio(tombo=13, descricao="Estante de aço", inventariante=self.inventariante),
+        ])
+        self.assertEqual(len(self.buscar("estante")), 2)
+
+        novo.delete()
+        self.assertEqual(len(self.buscar("estante")), 1)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM app_patrimonio_fts WHERE app_patrimonio_fts MATCH %s", ['"estante"']
+            )
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+# ==========================================================
+# BUSCA POR TOMBO
+# ==========================================================
+class BuscaTomboTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("inv", password="senha")
+        inventariante = Inventariante.objects.create(user=user, matricula="0001")
+        Patrimonio.objects.bulk_create(
+            Patrimonio(tombo=tombo, descricao="Mesa", inventariante=inventariante)
+            for tombo in (1, 11, 12, 13, 112, 120, 125, 129, 130, 1200, 1299, 1300, 12000)
+        )
+        Patrimonio.objects.create(
+            descricao="Sem tombo", numero_documento="NF 12", inventariante=inventariante
+        )
+
+    def tombos(self, termo):
+        return [p.tombo for p in buscar_patrimonios(Patrimonio.objects.all(), termo)]
+
+    def test_acerto_exato_primeiro_e_faixas_do_prefixo(self):
+        # Sem tombo, encontrado pelo número do documento: NULL vem antes na ordem
+        self.assertEqual(self.tombos("12"), [12, None, 120, 125, 129, 1200, 1299, 12000])
+
+    def test_apenas_tombos_com_o_prefixo(self):
+        self.assertEqual(self.tombos("129"), [129, 1299])
+        self.assertEqual(self.tombos("121"), [])
+
+    def test_intervalos_tombo(self):
+        self.assertEqual(intervalos_tombo("12")[:3], [(12, 12), (120, 129), (1200, 1299)])
+        self.assertEqual(intervalos_tombo("012"), [])
+
+
+# ==========================================================
+# IMPORTAÇÃO NO MODO "ATUALIZAR"
+# ----------------------------------------------------------
+# Linhas com hash inalterado são ignoradas; as alteradas
+# gravam apenas os campos que mudaram, sem trocar a
+# importação de origem.
+# ==========================================================
+class ImportacaoAtualizarTests(TestCase):
+
+    CABECALHO = "Tombo;Descrição;Valor (R$);Setor\n"
+
+    @classmethod
+    def setUpTestData(cls):
+        usuario = User.objects.create_user("carga", "carga@teste.br", "senha")
+        cls.inventariante = Inventariante.objects.create(user=usuario, matricula="0010")
+
+    def setUp(self):
+        self.diretorio = Path(tempfile.mkdtemp(prefix="inventario_atualizar_"))
+        self.addCleanup(shutil.rmtree, self.diretorio, ignore_errors=True)
+
+        self.primeira = ImportacaoPlanilha.objects.create(inventariante=self.inventariante, modo="inserir")
+        importar_planilha(
+            self.escrever("1;MESA;10,00;BJL-DG\n2;CADEIRA;20,00;BJL-DG\n"),
+            self.inventariante, importacao=self.primeira,
+        )
+        Patrimonio.objects.filter(tombo=2).update(situacao="nao_localizado")
+
+    def escrever(self, linhas):
+        caminho = self.diretorio / "carga.csv"
+        caminho.write_text(self.CABECALHO + linhas, encoding="utf-8")
+        return caminho
+
+    def test_atualizar(self):
+        segunda = ImportacaoPlanilha.objects.create(inventariante=self.inventariante, modo="atualizar")
+        caminho = self.escrever("1;MESA;10,00;BJL-DG\n2;CADEIRA;20,00;BJL-PROEN\n3;ARMÁRIO;30,00;BJL-DG\n")
+
+        with mock.patch.object(
+            Patrimonio.objects, "bulk_update", wraps=Patrimonio.objects.bulk_update
+        ) as bulk_update:
+            resumo = importar_planilha(caminho, self.inventariante, modo="atualizar", importacao=segunda)
+
+        self.assertEqual((resumo.inseridos, resumo.atualizados, resumo.inalterados), (1, 1, 1))
+
+        # Apenas a linha alterada, apenas os campos alterados
+        bulk_update.assert_called_once()
+        objetos, campos = bulk_update.call_args.args
+        self.assertEqual([p.tombo for p in objetos], [2])
+        self.assertEqual(campos, ["hash_linha", "setor"])
+
+        alterado = Patrimonio.objects.get(tombo=2)
+        self.assertEqual((alterado.setor, alterado.situacao), ("BJL-PROEN", "nao_localizado"))
+        self.assertEqual(alterado.importacao, self.primeira)
+        self.assertEqual(Patrimonio.objects.get(tombo=1).importacao, self.primeira)
+        self.assertEqual(Patrimonio.objects.get(tombo=3).importacao, segunda)
+
+    def test_reimportacao_identica_nao_grava(self):
+        caminho = self.escrever("1;MESA;10,00;BJL-DG\n2;CADEIRA;20,00;BJL-DG\n")
+        hashes = dict(Patrimonio.objects.values_list("tombo", "hash_linha"))
+
+        with mock.patch.object(Patrimonio.objects, "bulk_update") as bulk_update:
+            resumo = importar_planilha(caminho, self.inventariante, modo="atualizar")
+
+        bulk_update.assert_not_called()
+        self.assertEqual((resumo.inseridos, resumo.atualizados, resumo.inalterados), (0, 0, 2))
+        self.assertEqual(dict(Patrimonio.objects.values_list("tombo", "hash_linha")), hashes)
+
+
+# ==========================================================
+# EXPORTAÇÃO CSV E XLSX
+# ==========================================================
+class ExportacaoTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@teste.br", "senha")
+        inventariante_admin = Inventariante.objects.create(user=cls.admin, matricula="0001")
+        cls.comum = User.objects.create_user("comum", "comum@teste.br", "senha")
+        inventariante_comum = Inventariante.objects.create(user=cls.comum, matricula="0002")
+        Patrimonio.objects.create(
+            tombo=1, descricao="Mesa; redonda", valor="1234.50", setor="BJL-DG",
+            data_documento=date(2024, 3, 5), situacao="nao_localizado", inventariante=inventariante_admin,
+        )
+        Patrimonio.objects.create(tombo=2, descricao="Cadeira", inventariante=inventariante_comum)
+        Patrimonio.objects.create(tombo=3, descricao="Cadeira", inventariante=inventariante_admin)
+
+    def setUp(self):
+        cache.clear()
+
+    def exportar(self, usuario, **parametros):
+        self.client.force_login(usuario)
+        response = self.client.get(reverse("patrimonio_exportar"), parametros)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def linhas_csv(self, usuario, **parametros):
+        conteudo = self.exportar(usuario, formato="csv", **parametros)
+        self.assertTrue(conteudo.startswith(codecs.BOM_UTF8))
+        return list(csv.reader(conteudo.decode("utf-8-sig").splitlines(), delimiter=";"))
+
+    def test_csv(self):
+        linhas = self.linhas_csv(self.admin)
+        self.assertEqual(linhas[0], CABECALHOS)
+        self.assertEqual(len(linhas), 4)
+
+        mesa = dict(zip(CABECALHOS, linhas[1]))
+        self.assertEqual(mesa["Tombo"], "1")
+        self.assertEqual(mesa["Descrição"], "Mesa; redonda")
+        self.assertEqual(mesa["Valor (R$)"], "1234,50")
+        self.assertEqual(mesa["Data Documento"], "05/03/2024")
+        self.assertEqual(mesa["Data Ateste"], "")
+        self.assertEqual(mesa["Situação"], "Não Localizado")
+        self.assertEqual(mesa["Inventariante"], "admin")
+
+    def test_csv_com_filtros(self):
+        self.assertEqual([linha[0] for linha in self.linhas_csv(self.admin, q="cadeira")[1:]], ["2", "3"])
+        self.assertEqual([linha[0] for linha in self.linhas_csv(self.comum)[1:]], ["2"])
+        self.assertEqual(self.linhas_csv(self.comum, q="mesa")[1:], [])
+
+    def test_xlsx(self):
+        planilha = load_workbook(BytesIO(self.exportar(self.admin, formato="xlsx")), read_only=True)
+        linhas = list(planilha["Patrimônios"].iter_rows(values_only=True))
+        self.assertEqual(list(linhas[0]), CABECALHOS)
+        self.assertEqual(len(linhas), 4)
+
+        mesa = dict(zip(CABECALHOS, linhas[1]))
+        self.assertEqual(mesa["Tombo"], 1)
+        self.assertEqual(mesa["Valor (R$)"], 1234.5)
+        self.assertEqual(mesa["Data Documento"], datetime(2024, 3, 5))
+        self.assertEqual(mesa["Situação"], "Não Localizado")
+
+    def test_xlsx_com_filtros(self):
+        planilha = load_workbook(
+            BytesIO(self.exportar(self.comum, formato="xlsx", q="cadeira")), read_only=True
+        )
+        self.assertEqual([linha[0] for linha in planilha["Patrimônios"].iter_rows(min_row=2, values_only=True)], [2])
+
+
+# ==========================================================
+# LOG DE REGISTROS E COMPACTAÇÃO EM registros.xlsx
+# ==========================================================
+class RegistrosPlanilhaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser("admin", "admin@teste.br", "senha", first_name="Ana")
+        Inventariante.objects.create(user=cls.usuario, matricula="0001")
+
+    def setUp(self):
+        media = tempfile.mkdtemp(prefix="inventario_registros_")
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=media, IMPORTACAO_SINCRONA=True)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def registrar(self, quantidade):
+        for indice in range(quantidade):
+            registrar_linha(self.usuario, f"Item {indice}", indice + 0.5)
+
+    def linhas_planilha(self):
+        planilha = load_workbook(caminho_planilha(), read_only=True)
+        try:
+            return list(planilha.active.iter_rows(values_only=True))
+        finally:
+            planilha.close()
+
+    def test_compactar(self):
+        self.registrar(3)
+        self.assertEqual(compactar_registros(), 3)
+
+        linhas = self.linhas_planilha()
+        self.assertEqual(list(linhas[0]), CABECALHO_REGISTROS)
+        self.assertEqual(linhas[1:], [
+            (self.usuario.pk, "admin", "Ana", f"Item {indice}", indice + 0.5) for indice in range(3)
+        ])
+        self.assertFalse(registros_pendentes().exists())
+
+        # Segunda execução sem pendentes: nada muda
+        modificado = os.path.getmtime(caminho_planilha())
+        self.assertEqual(compactar_registros(), 0)
+        self.assertEqual(os.path.getmtime(caminho_planilha()), modificado)
+        self.assertEqual(len(self.linhas_planilha()), 4)
+
+        self.registrar(2)
+        self.assertEqual(compactar_registros(), 2)
+        self.assertEqual(len(self.linhas_planilha()), 6)
+
+    def test_falha_na_troca_nao_marca_nem_duplica(self):
+        self.registrar(2)
+        with mock.patch("app.registros.os.replace", side_effect=OSError("disco cheio")):
+            with self.assertRaises(OSError):
+                compactar_registros()
+        self.assertEqual(registros_pendentes().count(), 2)
+        self.assertFalse(os.path.exists(caminho_planilha()))
+        self.assertEqual([nome for nome in os.listdir(settings.MEDIA_ROOT) if nome.endswith(".xlsx")], [])
+
+        # Trava liberada após a exceção
+        if fcntl:
+            with open(caminho_planilha() + ".lock", "a+b") as trava:
+                fcntl.flock(trava.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                fcntl.flock(trava.fileno(), fcntl.LOCK_UN)
+
+        self.assertEqual(compactar_registros(), 2)
+        self.assertEqual(len(self.linhas_planilha()), 3)
+
+    @override_settings(PLANILHA_COMPACTAR_A_CADA=2)
+    def test_compactacao_agendada_ao_atingir_o_limite(self):
+        self.client.force_login(self.usuario)
+        self.client.get(reverse("adicionar_na_planilha"))
+        self.assertFalse(os.path.exists(caminho_planilha()))
+        self.assertEqual(registros_pendentes().count(), 1)
+
+        self.client.get(reverse("adicionar_na_planilha"))
+        self.assertEqual(len(self.linhas_planilha()), 3)
+        self.assertFalse(registros_pendentes().exists())
+
+    def test_descartar_planilha(self):
+        self.registrar(2)
+        compactar_registros()
+        self.registrar(1)
+
+        descartar_planilha()
+        self.assertFalse(os.path.exists(caminho_planilha()))
+        self.assertFalse(RegistroPlanilha.objects.exists())
+        descartar_planilha()
+
+
+# ==========================================================
+# FILA DE IMPORTAÇÕES EM SEGUNDO PLANO
+# ----------------------------------------------------------
+# Executor real (IMPORTACAO_SINCRONA=False): a thread da fila
+# usa outra conexão, por isso TransactionTestCase.
+# ==========================================================
+@override_settings(MEDIA_ROOT=MEDIA_TESTES, IMPORTACAO_SINCRONA=False)
+class ImportacaoAssincronaTests(TransactionTestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin", "admin@teste.br", "senha")
+        Inventariante.objects.create(user=self.admin, matricula="0001")
+        self.client.force_login(self.admin)
+
+    def enviar(self, nome, linhas):
+        arquivo = SimpleUploadedFile(nome, ("Tombo;Descrição;Setor\n" + linhas).encode("utf-8"))
+        response = self.client.post(reverse("upload_planilha"), data={"planilha": arquivo})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["status"], "pendente")
+        return response.json()["id"]
+
+    def progresso(self, pk):
+        return self.client.get(reverse("importacao_progresso", args=[pk]), headers={"HX-Request": "true"})
+
+    def test_fila_em_ordem_com_acompanhamento(self):
+        # Segura o worker até as duas planilhas estarem na fila
+        liberar = threading.Event()
+        bloqueio = tarefas._executor.submit(liberar.wait, 30)
+        primeira = self.enviar("primeira.csv", "7001;MESA;BJL\n")
+        segunda = self.enviar("segunda.csv", "7001;MESA NOVA;BJL\n7002;CADEIRA;BJL\n")
+
+        self.assertContains(self.progresso(primeira), "posição 1")
+        self.assertContains(self.progresso(segunda), "posição 2")
+
+        liberar.set()
+        bloqueio.result(timeout=30)
+        tarefas._executor.submit(lambda: None).result(timeout=30)
+
+        importacoes = {i.pk: i for i in ImportacaoPlanilha.objects.all()}
+        self.assertEqual(
+            [(importacoes[pk].status, importacoes[pk].inseridos, importacoes[pk].rejeitados) for pk in (primeira, segunda)],
+            [("concluida", 1, 0), ("concluida", 1, 1)],
+        )
+        self.assertLessEqual(importacoes[primeira].data_conclusao, importacoes[segunda].data_inicio)
+        self.assertEqual(Patrimonio.objects.get(tombo=7001).descricao, "MESA")
+
+        response = self.progresso(segunda)
+        self.assertContains(response, "Importação concluída")
+        self.assertNotContains(response, "hx-trigger=\"every 1s\"")
+
+    def test_tarefa_perdida_no_reinicio(self):
+        importacao = ImportacaoPlanilha.objects.create(
+            inventariante=self.admin.inventariante, arquivo="importacoes/perdida.csv", status="processando"
+        )
+        response = self.progresso(importacao.pk)
+        self.assertContains(response, tarefas.MENSAGEM_INTERROMPIDA)
+        self.assertNotContains(response, "spinner-border")
+        self.assertEqual(ImportacaoPlanilha.objects.get(pk=importacao.pk).status, "erro")
@@ -6,6 +6,8 @@ from .views_admin import close_modal
 urlpatterns = [
     # Rota para o painel administrativo principal (dashboard).
     path('admin-dashboard/', views_admin.admin_dashboard, name='admin_dashboard'),
+    path('admin-dashboard/resumo/', views_admin.resumo_inventario, name='resumo_inventario'),
+    path('cache/fragmentos/', views_admin.cache_fragmentos, name='cache_fragmentos'),
     
     # Rota para fechamento de modal (interação dinâmica).
     path("close-modal/", close_modal, name="close_modal"),
@@ -13,6 +15,7 @@ urlpatterns = [
     # Rotas para listagens dinâmicas via HTMX.
     path('inventariantes/', views_admin.inventariantes_list, name='inventariantes_list'),
     path('patrimonios/', views_admin.patrimonio_list, name='patrimonio_list'),
+    path('patrimonios/exportar/', views_admin.patrimonio_exportar, name='patrimonio_exportar'),
 
     # Rotas relacionadas ao gerenciamento de patrimônio.
     path('patrimonio/form/', views_admin.patrimonio_form, name='patrimonio_form'),  # Exibição do formulário.
@@ -21,6 +24,8 @@ urlpatterns = [
     path('patrimonio/<int:pk>/confirmar-exclusao/', views_admin.confirmar_exclusao_patrimonio, name='confirmar_exclusao_patrimonio'),  # Confirmação de exclusão.
     path('patrimonio/<int:pk>/excluir/', views_admin.excluir_patrimonio, name='excluir_patrimonio'),  # Exclusão definitiva.
     path('patrimonio/<int:pk>/update_situacao/', views_admin.patrimonio_update_situacao, name='patrimonio_update_situacao'),
+    path('patrimonios/situacao-lote/', views_admin.patrimonio_situacao_lote, name='patrimonio_situacao_lote'),
+    path('patrimonios/checkin/', views_admin.patrimonio_checkin, name='patrimonio_checkin'),
 
     # Rotas relacionadas ao gerenciamento de inventariantes.
     path('inventariante/adicionar/', views_admin.inventariante_add, name='inventariante_add'),  # Inclusão de novo inventariante.
@@ -36,6 +41,10 @@ urlpatterns = [
     path("planilha/adicionar/", views_admin.adicionar_na_planilha,name="adicionar_na_planilha"),
     path("patrimonios/upload-planilha/", views_admin.upload_planilha,name="upload_planilha"),
     path("planilha/modal/", views_admin.upload_planilha_modal,name="upload_planilha_modal"),
+    path("planilha/importacao/<int:pk>/progresso/", views_admin.importacao_progresso, name="importacao_progresso"),
+    path("planilha/importacao/<int:pk>/relatorio/", views_admin.importacao_relatorio, name="importacao_relatorio"),
+    path("planilha/importacao/<int:pk>/conciliacao/", views_admin.importacao_conciliacao, name="importacao_conciliacao"),
+    path("planilha/importacao/<int:pk>/desfazer/", views_admin.desfazer_importacao, name="desfazer_importacao"),
     
     # ROTAS DE EXCLUSÃO DE PLANILHA
     path("excluir-planilha-confirm/", views_admin.excluir_planilha_confirm, name="excluir_planilha_confirm"), 
@@ -0,0 +1,354 @@
+import csv
+import unicodedata
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+import pandas as pd
+
+from .models import Patrimonio
+
+
+# ==========================================================
+# VALIDAÇÃO DE PLANILHAS
+# ----------------------------------------------------------
+# Etapa executada sobre cada lote de linhas lidas, antes de
+# qualquer gravação no banco de dados.
+#
+# - As colunas são localizadas pelo nome do cabeçalho, e não
+#   pela posição (tolerando colunas extras ou deslocadas)
+# - A conversão de tombo, valor e datas é vetorizada com
+#   pandas (um lote inteiro por operação)
+# - Tombos repetidos dentro da planilha são sinalizados
+# - Cada problema encontrado vira uma linha do relatório de
+#   erros, que pode ser baixado pelo usuário
+# ==========================================================
+
+# Ordem legada das colunas (A → K), usada quando a planilha
+# não possui cabeçalho reconhecível.
+COLUNAS_PLANILHA = [
+    "tombo",             # Coluna A → Tombo
+    "descricao",         # Coluna B → Descrição
+    "valor",             # Coluna C → Valor
+    "conta_contabil",    # Coluna D → Conta Contábil
+    "setor",             # Coluna E → Setor
+    "empenho",           # Coluna F → Empenho
+    "fornecedor",        # Coluna G → Fornecedor
+    "numero_documento",  # Coluna H → Nº Documento
+    "data_documento",    # Coluna I → Data Documento
+    "data_ateste",       # Coluna J → Data Ateste
+    "dependencia",       # Coluna K → Dependência
+]
+
+COLUNAS_TEXTO = [
+    "descricao", "conta_contabil", "setor", "empenho",
+    "fornecedor", "numero_documento", "dependencia",
+]
+
+COLUNAS_DATA = ["data_documento", "data_ateste"]
+
+# Nomes aceitos no cabeçalho para cada campo (já normalizados:
+# minúsculos, sem acentos e sem pontuação).
+CABECALHOS = {
+    "tombo": ["tombo", "patrimonio", "n patrimonio", "no patrimonio", "numero patrimonio", "numero do patrimonio"],
+    "descricao": ["descricao", "descricao do bem", "especificacao"],
+    "valor": ["valor", "valor r", "valor rs", "valor do bem", "valor de aquisicao"],
+    "conta_contabil": ["conta contabil", "conta"],
+    "setor": ["setor", "localizacao", "local"],
+    "empenho": ["empenho", "n empenho", "no empenho", "numero empenho"],
+    "fornecedor": ["fornecedor", "cnpj fornecedor"],
+    "numero_documento": ["numero documento", "numero do documento", "n documento", "no documento", "documento"],
+    "data_documento": ["data documento", "data do documento", "data aquisicao", "data de aquisicao"],
+    "data_ateste": ["data ateste", "data do ateste", "data de ateste"],
+    "dependencia": ["dependencia"],
+}
+
+# Quantidade máxima de linhas iniciais (títulos) percorridas
+# em busca do cabeçalho.
+LINHAS_BUSCA_CABECALHO = 10
+
+# Limites impostos pelos campos do modelo.
+TOMBO_MAXIMO = 2147483647
+VALOR_MAXIMO = 99999999.99
+
+# Origem das datas seriais do Excel (sistema 1900) e faixa de
+# seriais válidos (1 = 31/12/1899 até 2958465 = 31/12/9999).
+ORIGEM_DATA_EXCEL = "1899-12-30"
+SERIAL_EXCEL_MAXIMO = 2958465
+
+# Faixa de datas aceitas (a mesma dos seriais do Excel).
+DATA_MINIMA = pd.Timestamp("1899-12-31")
+DATA_MAXIMA = pd.Timestamp("9999-12-31")
+
+# Formatos aceitos para datas em texto.
+FORMATOS_DATA = ["%d/%m/%Y", "%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"]
+
+
+def normalizar_cabecalho(texto):
+    """Minúsculas, sem acentos e apenas letras/números separados por espaço."""
+    texto = unicodedata.normalize("NFKD", str(texto or ""))
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).lower()
+    texto = "".join(c if c.isalnum() else " " for c in texto)
+    return " ".join(texto.split())
+
+
+_ALIASES = {
+    alias: campo
+    for campo, aliases in CABECALHOS.items()
+    for alias in aliases
+}
+
+
+def mapear_cabecalho(row):
+    """
+    Retorna {campo: índice da coluna} quando a linha é um cabeçalho
+    reconhecível (contém o tombo e ao menos mais duas colunas).
+    """
+    mapa = {}
+    for indice, valor in enumerate(row):
+        campo = _ALIASES.get(normalizar_cabecalho(valor))
+        if campo and campo not in mapa:
+            mapa[campo] = indice
+
+    if "tombo" in mapa and len(mapa) >= 3:
+        return mapa
+    return None
+
+
+MAPA_POSICIONAL = {campo: indice for indice, campo in enumerate(COLUNAS_PLANILHA)}
+
+
+@dataclass
+class ResultadoLote:
+    """Saída da validação de um lote."""
+
+    # Pares (número da linha, dados convertidos) aptos à gravação.
+    registros: list = field(default_factory=list)
+
+    # Problemas encontrados: {linha, coluna, valor, erro}.
+    erros: list = field(default_factory=list)
+
+    # Linhas totalmente vazias.
+    ignorados: int = 0
+
+    # Linhas descartadas por conterem ao menos um erro.
+    rejeitados: int = 0
+
+
+# ==========================================================
+# VALIDADOR
+# ----------------------------------------------------------
+# Mantém o estado entre lotes: mapeamento de colunas obtido do
+# cabeçalho e tombos já vistos (para detectar repetições).
+# ==========================================================
+class ValidadorPlanilha:
+
+    def __init__(self):
+        self.mapa = None
+        self.tombos_vistos = set()
+
+    # ------------------------------------------------------
+    # Localiza o cabeçalho e devolve apenas linhas de dados.
+    # Sem cabeçalho reconhecível, adota a ordem legada A → K
+    # descartando a primeira linha.
+    # ------------------------------------------------------
+    def linhas_de_dados(self, linhas):
+        iniciais = []
+        for numero, row in linhas:
+            if self.mapa is not None:
+                yield numero, row
+                continue
+
+            mapa = mapear_cabecalho(row)
+            if mapa:
+                self.mapa = mapa
+                iniciais = []
+                continue
+
+            iniciais.append((numero, row))
+            if len(iniciais) >= LINHAS_BUSCA_CABECALHO:
+                self.mapa = MAPA_POSICIONAL
+                yield from iniciais[1:]
+
+        if self.mapa is None:
+            self.mapa = MAPA_POSICIONAL
+            yield from iniciais[1:]
+
+    # ------------------------------------------------------
+    # Validação vetorizada de um lote de linhas de dados.
+    # ------------------------------------------------------
+    def validar_lote(self, lote):
+        resultado = ResultadoLote()
+        if not lote:
+            return resultado
+
+        numeros = [numero for numero, _row in lote]
+        bruto = pd.DataFrame(
+            {
+                campo: [
+                    row[indice] if indice < len(row) else None
+                    for _numero, row in lote
+                ]
+                for campo, indice in self.mapa.items()
+            },
+            index=numeros,
+            dtype=object,
+        )
+        for campo in COLUNAS_PLANILHA:
+            if campo not in bruto:
+                bruto[campo] = None
+
+        # Números inteiros lidos como float (ex.: conta contábil) perdem o ".0"
+        for campo in COLUNAS_TEXTO:
+            coluna = bruto[campo]
+            inteiros = coluna.map(lambda v: isinstance(v, float) and v.is_integer())
+            if inteiros.any():
+                bruto[campo] = coluna.mask(inteiros, coluna[inteiros].map(int))
+
+        # Representação textual de todas as células, base das conversões
+        texto = bruto.apply(lambda coluna: coluna.astype("string").str.strip())
+
+        # Linhas vazias
+        preenchido = texto.notna() & (texto != "")
+        vazias = ~preenchido.any(axis=1)
+        resultado.ignorados = int(vazias.sum())
+        bruto, texto, preenchido = bruto[~vazias], texto[~vazias], preenchido[~vazias]
+
+        convertido = pd.DataFrame(index=bruto.index)
+        erros = []
+
+        def sinalizar(mascara, campo, mensagem):
+            mascara = mascara.fillna(False).to_numpy(dtype=bool)
+            for numero in bruto.index[mascara]:
+                erros.append({
+                    "linha": numero,
+                    "coluna": campo,
+                    "valor": bruto.at[numero, campo],
+                    "erro": mensagem,
+                })
+
+        # ---------------- Tombo ----------------
+        tombo = pd.to_numeric(texto["tombo"], errors="coerce")
+        tombo_valido = tombo.notna() & (tombo % 1 == 0) & (tombo > 0) & (tombo <= TOMBO_MAXIMO)
+        sinalizar(~preenchido["tombo"], "tombo", "Tombo ausente")
+        sinalizar(preenchido["tombo"] & ~tombo_valido, "tombo", "Tombo inválido")
+
+        tombo = tombo.where(tombo_valido)
+        repetido = tombo_valido & (
+            tombo.duplicated(keep="first") | tombo.isin(self.tombos_vistos)
+        )
+        sinalizar(repetido, "tombo", "Tombo repetido na planilha")
+        self.tombos_vistos.update(int(t) for t in tombo[tombo_valido & ~repetido])
+        convertido["tombo"] = tombo
+
+        # ---------------- Valor ----------------
+        # Aceita números e texto nos formatos "1.234,56", "1234,56",
+        # "1234.56" e "R$ 1.234,56".
+        valor_texto = texto["valor"].str.replace(r"[R$\s]", "", regex=True)
+        formato_br = valor_texto.str.contains(",", regex=False, na=False)
+        valor_texto = valor_texto.mask(
+            formato_br,
+            valor_texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False),
+        )
+        valor = pd.to_numeric(valor_texto, errors="coerce")
+        sinalizar(preenchido["valor"] & valor.isna(), "valor", "Valor inválido")
+        sinalizar(valor.abs() > VALOR_MAXIMO, "valor", "Valor acima do limite")
+        convertido["valor"] = valor.where(valor.abs() <= VALOR_MAXIMO)
+
+        # ---------------- Datas ----------------
+        # Aceita datas nativas, seriais do Excel e texto em
+        # dd/mm/aaaa ou aaaa-mm-dd (com ou sem hora). Seriais fora da
+        # faixa do Excel (ex.: 20200101) e datas fora de DATA_MINIMA
+        # e DATA_MAXIMA são rejeitados na linha, sem abortar o lote.
+        for campo in COLUNAS_DATA:
+            coluna = bruto[campo]
+            eh_data = coluna.map(lambda v: hasattr(v, "year"))
+            nativa = pd.to_datetime(coluna.where(eh_data), errors="coerce")
+            serial = pd.to_numeric(coluna.where(~eh_data), errors="coerce")
+            serial = serial.where((serial >= 1) & (serial <= SERIAL_EXCEL_MAXIMO))
+            do_serial = pd.to_datetime(serial, unit="D", origin=ORIGEM_DATA_EXCEL, errors="coerce")
+            data = nativa.fillna(do_serial)
+            for formato in FORMATOS_DATA:
+                data = data.fillna(pd.to_datetime(texto[campo], format=formato, errors="coerce"))
+            data = data.where((data >= DATA_MINIMA) & (data <= DATA_MAXIMA))
+            sinalizar(preenchido[campo] & data.isna(), campo, "Data inválida")
+            convertido[campo] = data
+
+        # ---------------- Textos ----------------
+        for campo in COLUNAS_TEXTO:
+            valor_texto = texto[campo].fillna("")
+
+            limite = Patrimonio._meta.get_field(campo).max_length
+            if limite:
+                sinalizar(valor_texto.str.len() > limite, campo, f"Texto excede {limite} caracteres")
+            convertido[campo] = valor_texto
+
+        # ---------------- Resultado ----------------
+        linhas_com_erro = {erro["linha"] for erro in erros}
+        resultado.erros = sorted(erros, key=lambda erro: erro["linha"])
+        resultado.rejeitados = len(linhas_com_erro)
+
+        validos = convertido[~convertido.index.isin(linhas_com_erro)]
+        colunas = _colunas_do_modelo(validos)
+        resultado.registros = [
+            (numero, dict(zip(COLUNAS_PLANILHA, valores)))
+            for numero, *valores in zip(validos.index, *(colunas[campo] for campo in COLUNAS_PLANILHA))
+        ]
+
+        return resultado
+
+
+def _colunas_do_modelo(validos):
+    """Converte cada coluna do pandas em lista com os tipos gravados no banco."""
+    colunas = {
+        "tombo": validos["tombo"].astype("int64").tolist(),
+        "valor": [
+            None if pd.isna(valor) else Decimal(f"{valor:.2f}")
+            for valor in validos["valor"].tolist()
+        ],
+    }
+    for campo in COLUNAS_DATA:
+        colunas[campo] = [
+            None if pd.isna(data) else data.date()
+            for data in validos[campo].tolist()
+        ]
+    for campo in COLUNAS_TEXTO:
+        colunas[campo] = validos[campo].tolist()
+    return colunas
+
+
+# ==========================================================
+# RELATÓRIO DE ERROS
+# ----------------------------------------------------------
+# Grava os erros em CSV (separador ";" e BOM UTF-8, formato
+# aberto diretamente pelo Excel em pt-BR). O arquivo só é
+# criado se houver ao menos um erro.
+# ==========================================================
+class RelatorioErros:
+    CABECALHO = ["linha", "coluna", "valor", "erro"]
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.total = 0
+        self._arquivo = None
+        self._writer = None
+
+    def registrar(self, erros):
+        if not erros:
+            return
+        if self._writer is None:
+            self._arquivo = open(self.caminho, "w", newline="", encoding="utf-8-sig")
+            self._writer = csv.DictWriter(self._arquivo, fieldnames=self.CABECALHO, delimiter=";")
+            self._writer.writeheader()
+        self._writer.writerows(erros)
+        self.total += len(erros)
+
+    def fechar(self):
+        if self._arquivo:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.fechar()
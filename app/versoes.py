@@ -0,0 +1,60 @@
+from django.db import connection
+
+from .models import VersaoTabela
+
+
+# ==========================================================
+# VERSÃO DOS DADOS
+# ----------------------------------------------------------
+# Lê as versões mantidas em VersaoTabela pelos triggers da
+# migração 0012 (patrimonio, inventariante, usuario) e da
+# migração 0018 (papel).
+#
+# carimbo() resume as versões de algumas tabelas numa string
+# curta, usada como parte de chaves de cache: qualquer escrita
+# muda o carimbo, e as entradas antigas deixam de ser lidas
+# (sem invalidação chave a chave).
+#
+# Fora do SQLite (sem triggers) não há versões: as funções
+# retornam None e quem as usa deve simplesmente não usar cache.
+# ==========================================================
+
+
+def versoes_disponiveis():
+    return connection.vendor == "sqlite"
+
+
+def versoes(*tabelas):
+    """{tabela: (versao, atualizado_em)} numa única consulta, ou None."""
+    if not versoes_disponiveis():
+        return None
+    return {
+        tabela: (versao, atualizado_em)
+        for tabela, versao, atualizado_em in VersaoTabela.objects
+        .filter(tabela__in=tabelas)
+        .values_list("tabela", "versao", "atualizado_em")
+    }
+
+
+def carimbo(*tabelas):
+    """
+    Retorna (carimbo, atualizado_em): versões das tabelas, como
+    "patrimonio.12-usuario.3-<instante>", e o instante da última alteração
+    entre elas. (None, None) se as versões não estiverem disponíveis.
+    """
+    atuais = versoes(*tabelas)
+    if not atuais or len(atuais) < len(tabelas):
+        return None, None
+    texto = "-".join(f"{tabela}.{atuais[tabela][0]}" for tabela in sorted(tabelas))
+    atualizado_em = max(atualizado_em for _versao, atualizado_em in atuais.values())
+    # O instante entra no carimbo para que uma versão revertida por
+    # rollback (ou banco restaurado) não coincida com outra já usada.
+    return f"{texto}-{atualizado_em.timestamp():.3f}", atualizado_em
+
+
+def carimbo_da_requisicao(request, *tabelas):
+    """carimbo() lido uma única vez por requisição (validadores HTTP e cache)."""
+    memoria = request.__dict__.setdefault("_carimbos", {})
+    if tabelas not in memoria:
+        memoria[tabelas] = carimbo(*tabelas)
+    return memoria[tabelas]
@@ -1,46 +1,67 @@
-from openpyxl import load_workbook, Workbook
 from django.conf import settings
 import os
 import json
 from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponse
+from django.http import HttpResponse, FileResponse, Http404, JsonResponse, StreamingHttpResponse
 from django.template.loader import render_to_string
-from django.contrib.auth.decorators import login_required, user_passes_test
+from django.contrib.auth.decorators import login_required
 from django.core.files.storage import FileSystemStorage
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Max
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.utils import timezone
+from .busca import buscar_patrimonios
+from .checkin import LOTE_MAXIMO, conferir_tombos, separar_leituras
+from .cache_fragmentos import estatisticas_fragmentos, fragmento_em_cache
+from .condicional import listagem_condicional
+from .contadores import contar_patrimonios, montar_resumo
+from .exclusao import excluir_importacao, excluir_patrimonios
+from .exportacao import exportar_csv, exportar_xlsx
+from .importacao import EXTENSOES_ACEITAS
+from .paginacao import paginar_por_cursor
 from .forms import PatrimonioForm, InventarianteUserForm
-from .models import Inventariante, Patrimonio
+from .registros import descartar_planilha, registrar_linha, registros_pendentes
+from .tarefas import (
+    agendar_compactacao, enfileirar_importacao, marcar_interrompida, posicao_na_fila, progresso_parcial,
+)
+from .versoes import carimbo_da_requisicao
+from .models import ImportacaoPlanilha, Inventariante, Patrimonio
 from .decorators import admin_required
-from .decorators import presidente_ou_superuser
 
 
 # ==========================================================
 # DASHBOARD ADMINISTRATIVO
 # Função responsável por apresentar a página inicial do painel
 # administrativo, acessível apenas mediante autenticação.
+#
+# Para presidentes e superusuários, exibe o resumo do
+# inventário (ver resumo_inventario).
 # ==========================================================
 @login_required
 def admin_dashboard(request):
-    return render(request, "app_inventario/admin_dashboard.html")
+    context = {}
+    if request.papel.is_admin:
+        context["resumo"] = montar_resumo()
+    return render(request, "app_inventario/admin_dashboard.html", context)
 
 
 # ==========================================================
-# FUNÇÃO DE AUTORIZAÇÃO
+# RESUMO DO INVENTÁRIO (FRAGMENTO HTMX)
 # ----------------------------------------------------------
-# Responsável por centralizar a regra de autorização aplicada
-# às rotinas administrativas sensíveis do sistema.
+# Progresso do inventário por situação, setor, dependência e
+# inventariante, com valor total. Lido de ResumoInventario,
+# mantido por triggers a cada escrita em Patrimonio: uma única
+# consulta, sem COUNT/GROUP BY na tabela principal.
 #
-# O acesso é concedido exclusivamente a:
-# - Superusuário
-# - Inventariante com flag 'presidente=True'
+# O fragmento se atualiza sozinho a cada poucos segundos.
 # ==========================================================
-def presidente_ou_superuser(user):
-    return (
-        user.is_authenticated and (
-            user.is_superuser or
-            (hasattr(user, "inventariante") and user.inventariante.presidente)
-        )
+@login_required
+@admin_required
+def resumo_inventario(request):
+    return render(
+        request,
+        "app_inventario/partials/resumo_inventario.html",
+        {"resumo": montar_resumo()}
     )
 
 
@@ -57,10 +78,12 @@ def close_modal(request):
 # LISTAGEM DE INVENTARIANTES
 # Apresenta a lista completa de inventariantes cadastrados.
 # A consulta não implementa filtragem e é destinada ao painel.
+# Recargas HTMX sem alterações recebem 304 (ver app/condicional.py).
 # ==========================================================
 @login_required
+@listagem_condicional("inventariante", "usuario")
 def inventariantes_list(request):
-    inventariantes = Inventariante.objects.all()
+    inventariantes = Inventariante.objects.select_related("user")
     return render(
         request,
         "app_inventario/partials/inventariantes_list.html",
@@ -75,7 +98,7 @@ def inventariantes_list(request):
 # ==========================================================
 @login_required
 def inventariante_list_partial(request):
-    inventariantes = Inventariante.objects.all()
+    inventariantes = Inventariante.objects.select_related("user")
     return render(
         request,
         "app_inventario/partials/inventariante_list.html",
@@ -195,24 +218,19 @@ def inventariante_delete_confirm(request, pk):
 # ==========================================================
 # EXCLUSÃO DE INVENTARIANTE
 # ----------------------------------------------------------
-# Realiza a remoção tanto do registro Inventariante quanto do
-# usuário associado, caso exista, e aciona recarga dinâmica da
+# Remove o usuário associado, o que exclui em cascata o
+# registro Inventariante, e aciona recarga dinâmica da
 # listagem via HTMX.
 # ==========================================================
 @admin_required
 def inventariante_delete(request, pk):
-    inventariante = get_object_or_404(Inventariante, pk=pk)
+    inventariante = get_object_or_404(Inventariante.objects.select_related("user"), pk=pk)
 
     if request.method == "POST":
-        try:
-            if inventariante.user:
-                inventariante.user.delete()
-        except Exception:
-            pass
-
-        inventariante.delete()
+        # Excluir o usuário remove também o inventariante (CASCADE)
+        inventariante.user.delete()
 
-        inventariantes = Inventariante.objects.all()
+        inventariantes = Inventariante.objects.select_related("user")
         html = render_to_string(
             "app_inventario/partials/inventariantes_list.html",
             {"inventariantes": inventariantes},
@@ -238,79 +256,222 @@ def inventariante_delete(request, pk):
 # ==========================================================
 
 # ==========================================================
-# LISTA DE PATRIMÔNIOS
+# FILTRO DE PATRIMÔNIOS DO USUÁRIO
 # ----------------------------------------------------------
-# Implementa busca, paginação e segregação dos resultados com
-# base no perfil do usuário (administrador ou inventariante).
+# Aplica a segregação por perfil e a busca textual. Compartilhado
+# pela listagem e pela exportação, garantindo que ambas
+# devolvam exatamente o mesmo conjunto de registros.
+#
+# Sem busca, a ordem é por id; com busca, por relevância
+# (ver app/busca.py).
+#
+# Retorna (queryset, is_admin).
 # ==========================================================
-@login_required
-def patrimonio_list(request):
-    # Recupera parâmetros de busca e paginação
-    search_query = request.GET.get('q')
-    pagina_numero = request.GET.get('page', 1)
-
+def filtrar_patrimonios(request, search_query):
     # ------------------------------------------------------
-    # Regra de permissão unificada:
-    # - Superusuário
-    # - Inventariante Presidente
+    # Papel resolvido pelo PapelMiddleware (em cache):
+    # - Superusuário / Presidente: todos os patrimônios
+    # - Inventariante: apenas os próprios
     # ------------------------------------------------------
-    is_admin = (
-        request.user.is_superuser or
-        (hasattr(request.user, "inventariante") and request.user.inventariante.presidente)
-    )
+    papel = request.papel
+    is_admin = papel.is_admin
 
     # ------------------------------------------------------
     # Definição do Queryset base
     # ------------------------------------------------------
-    if is_admin:
-        patrimonios = Patrimonio.objects.all()
-    else:
-        inventariante = get_object_or_404(Inventariante, user=request.user)
-        patrimonios = Patrimonio.objects.filter(inventariante=inventariante)
+    # O responsável (inventariante.user) é exibido em cada linha
+    patrimonios = Patrimonio.objects.select_related("inventariante__user")
+    if not is_admin:
+        if papel.inventariante_id is None:
+            raise Http404
+        patrimonios = patrimonios.filter(inventariante_id=papel.inventariante_id)
 
     # ------------------------------------------------------
-    # Filtro de busca textual
+    # Filtro de busca textual (índice FTS5)
     # ------------------------------------------------------
     if search_query:
-        patrimonios = patrimonios.filter(
-            Q(tombo__icontains=search_query) |
-            Q(descricao__icontains=search_query) |
-            Q(setor__icontains=search_query) |
-            Q(dependencia__icontains=search_query) |
-            Q(fornecedor__icontains=search_query) |
-            Q(numero_documento__icontains=search_query) |
-            Q(conta_contabil__icontains=search_query)
+        patrimonios = buscar_patrimonios(patrimonios, search_query)
+    else:
+        patrimonios = patrimonios.order_by("id")
+
+    return patrimonios, is_admin
+
+
+# ==========================================================
+# PAGINAÇÃO DE PATRIMÔNIOS
+# ----------------------------------------------------------
+# Modo definido em settings.PATRIMONIO_PAGINACAO:
+# - "cursor": keyset (parâmetros apos / antes / ultima), sem
+#   COUNT(*) nem OFFSET (ver app/paginacao.py)
+# - "offset": Paginator do Django (parâmetro page); quando o
+#   total já é conhecido (contadores), o COUNT(*) é evitado
+#
+# Retorna (página, paginacao_cursor).
+# ==========================================================
+def paginar_patrimonios(request, patrimonios, total=None):
+    tamanho = settings.PATRIMONIO_ITENS_POR_PAGINA
+
+    if settings.PATRIMONIO_PAGINACAO == "cursor":
+        pagina = paginar_por_cursor(
+            patrimonios,
+            tamanho,
+            apos=request.GET.get("apos"),
+            antes=request.GET.get("antes"),
+            ultima=request.GET.get("ultima") == "1",
         )
+        return pagina, True
 
-    # ------------------------------------------------------
-    # Paginação (6 itens por página)
-    # ------------------------------------------------------
-    paginator = Paginator(patrimonios.order_by('id'), 6)
+    paginator = Paginator(patrimonios, tamanho)
+    if total is not None:
+        paginator.count = total
     try:
-        lista_patrimonios = paginator.page(pagina_numero)
+        pagina = paginator.page(request.GET.get("page", 1))
     except (PageNotAnInteger, EmptyPage):
-        lista_patrimonios = paginator.page(1)
+        pagina = paginator.page(1)
+    return pagina, False
+
 
+# ==========================================================
+# RENDERIZAÇÃO DA TABELA DE PATRIMÔNIOS
+# ----------------------------------------------------------
+# Fragmento tabela_patrimonios.html com total (contadores, só
+# sem busca) e a página corrente. Usado pela listagem e pela
+# atualização de situação em lote.
+# ==========================================================
+def renderizar_tabela_patrimonios(request, patrimonios, search_query, is_admin, mensagem=None):
     # ------------------------------------------------------
-    # Contexto unificado
+    # Total sem busca: lido dos contadores mantidos no banco
     # ------------------------------------------------------
-    context = {
-        "pagina": "patrimonio",
-        "lista_patrimonios": lista_patrimonios,
-        "search_query": search_query or "",
-        "is_admin": is_admin,
-        "user": request.user,
-    }
-    
+    total_patrimonios = None
+    if not search_query:
+        total_patrimonios = contar_patrimonios(
+            None if is_admin else request.papel.inventariante_id
+        )
+
+    # ------------------------------------------------------
+    # Paginação (cursor ou offset, conforme configuração)
+    # ------------------------------------------------------
+    lista_patrimonios, paginacao_cursor = paginar_patrimonios(
+        request, patrimonios, total=total_patrimonios
+    )
+
+    return render_to_string(
+        "app_inventario/partials/tabela_patrimonios.html",
+        {
+            "lista_patrimonios": lista_patrimonios,
+            "paginacao_cursor": paginacao_cursor,
+            "total_patrimonios": total_patrimonios,
+            "search_query": search_query or "",
+            "is_admin": is_admin,
+            "situacoes": Patrimonio.STATUS_CHOICES,
+            "mensagem": mensagem,
+        },
+        request=request,
+    )
+
+
+# ==========================================================
+# LISTA DE PATRIMÔNIOS
+# ----------------------------------------------------------
+# Implementa busca, paginação e segregação dos resultados com
+# base no perfil do usuário (administrador ou inventariante).
+#
+# O fragmento da tabela fica em cache por (escopo, busca,
+# página/cursor), sob o carimbo de versão de patrimônios,
+# inventariantes e usuários (ver app/cache_fragmentos.py):
+# num acerto, nenhuma consulta de patrimônios é feita.
+# Recargas HTMX sem alterações recebem 304 antes disso
+# (ver app/condicional.py).
+# ==========================================================
+@login_required
+@listagem_condicional("patrimonio", "inventariante", "usuario")
+def patrimonio_list(request):
+    # Recupera parâmetro de busca
+    search_query = request.GET.get('q')
+
+    patrimonios, is_admin = filtrar_patrimonios(request, search_query)
+
+    # ------------------------------------------------------
+    # Fragmento da tabela (cache versionado)
+    # ------------------------------------------------------
+    versao, _atualizado_em = carimbo_da_requisicao(request, "patrimonio", "inventariante", "usuario")
+    tabela_html, acerto = fragmento_em_cache(
+        "tabela_patrimonios",
+        versao,
+        (
+            "todos" if is_admin else request.papel.inventariante_id,
+            search_query or "",
+            settings.PATRIMONIO_PAGINACAO,
+            settings.PATRIMONIO_ITENS_POR_PAGINA,
+            [request.GET.get(parametro) for parametro in ("apos", "antes", "ultima", "page")],
+        ),
+        lambda: renderizar_tabela_patrimonios(request, patrimonios, search_query, is_admin),
+    )
+
     # ------------------------------------------------------
     # Lógica HTMX:
-    # - Se o alvo for apenas a tabela, renderiza parcial
+    # - Se o alvo for apenas a tabela, devolve o fragmento
     # - Caso contrário, renderiza página completa
     # ------------------------------------------------------
     if request.headers.get('HX-Target') == 'conteudo-patrimonios':
-        return render(request, "app_inventario/partials/tabela_patrimonios.html", context)
-    
-    return render(request, "app_inventario/patrimonio_list.html", context)
+        response = HttpResponse(tabela_html)
+    else:
+        response = render(request, "app_inventario/patrimonio_list.html", {
+            "pagina": "patrimonio",
+            "tabela_html": tabela_html,
+            "search_query": search_query or "",
+            "is_admin": is_admin,
+            "user": request.user,
+        })
+
+    if acerto is not None:
+        response["X-Cache-Fragmento"] = "acerto" if acerto else "falta"
+    return response
+
+
+# ==========================================================
+# ESTATÍSTICAS DO CACHE DE FRAGMENTOS
+# ----------------------------------------------------------
+# Acertos, faltas e taxa de acerto por fragmento, em JSON,
+# para ajuste do cache. Restrito a administradores.
+# ==========================================================
+@login_required
+@admin_required
+def cache_fragmentos(request):
+    return JsonResponse(estatisticas_fragmentos())
+
+
+# ==========================================================
+# EXPORTAÇÃO DE PATRIMÔNIOS
+# ----------------------------------------------------------
+# Exporta a lista filtrada (mesma busca "q" e mesmo escopo
+# de usuário da listagem) em CSV ou XLSX.
+#
+# - CSV: StreamingHttpResponse, primeiros bytes enviados
+#   imediatamente e memória constante
+# - XLSX: pasta de trabalho write-only gravada em arquivo
+#   temporário e enviada em blocos (ver app/exportacao.py)
+# ==========================================================
+@login_required
+def patrimonio_exportar(request):
+    formato = request.GET.get("formato", "csv")
+    if formato not in ("csv", "xlsx"):
+        return HttpResponse(status=400)
+
+    patrimonios, _is_admin = filtrar_patrimonios(request, request.GET.get("q"))
+    nome_arquivo = f"patrimonios_{timezone.localdate():%Y%m%d}.{formato}"
+
+    if formato == "xlsx":
+        return FileResponse(
+            exportar_xlsx(patrimonios),
+            as_attachment=True,
+            filename=nome_arquivo,
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+    response = StreamingHttpResponse(exportar_csv(patrimonios), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{nome_arquivo}"'
+    return response
 
 
 # ==========================================================
@@ -342,7 +503,7 @@ def patrimonio_form(request):
 # Restrito a superusuário ou inventariante presidente.
 # ==========================================================
 @login_required
-@user_passes_test(presidente_ou_superuser)
+@admin_required
 def patrimonio_add(request):
     inventariante = get_object_or_404(Inventariante, user=request.user)
     if request.method == "POST":
@@ -360,7 +521,7 @@ def patrimonio_add(request):
 # Restrito a superusuário ou inventariante presidente.
 # ==========================================================
 @login_required
-@user_passes_test(presidente_ou_superuser)
+@admin_required
 def patrimonio_edit(request, pk):
     patrimonio = get_object_or_404(Patrimonio, pk=pk)
     if request.method == "POST":
@@ -380,7 +541,7 @@ def patrimonio_edit(request, pk):
 # Restrito a superusuário ou inventariante presidente.
 # ==========================================================
 @login_required
-@user_passes_test(presidente_ou_superuser)
+@admin_required
 def confirmar_exclusao_patrimonio(request, pk):
     patrimonio = get_object_or_404(Patrimonio, pk=pk)
     return render(request, "app_inventario/partials/confirmar_exclusao_patrimonio.html", {"patrimonio": patrimonio})
@@ -392,7 +553,7 @@ def confirmar_exclusao_patrimonio(request, pk):
 # Restrito a superusuário ou inventariante presidente.
 # ==========================================================
 @login_required
-@user_passes_test(presidente_ou_superuser)
+@admin_required
 def excluir_patrimonio(request, pk):
     if request.method != "POST":
         return HttpResponse(status=405)
@@ -400,23 +561,11 @@ def excluir_patrimonio(request, pk):
     patrimonio = get_object_or_404(Patrimonio, pk=pk)
     patrimonio.delete()
     
-    # Recarrega a lista para atualizar a tabela via HTMX
-    is_admin = presidente_ou_superuser(request.user)
-    patrimonios_all = Patrimonio.objects.all().order_by('id')
-    paginator = Paginator(patrimonios_all, 6)
-    lista_patrimonios = paginator.page(1)
-
-    context = {
-        "lista_patrimonios": lista_patrimonios,
-        "is_admin": is_admin,
-    }
+    # Recarrega a lista (primeira página) para atualizar a tabela via HTMX
+    patrimonios, is_admin = filtrar_patrimonios(request, None)
 
     # Renderiza apenas o fragmento da tabela
-    html = render_to_string(
-        "app_inventario/partials/tabela_patrimonios.html", 
-        context, 
-        request=request
-    )
+    html = renderizar_tabela_patrimonios(request, patrimonios, None, is_admin)
     
     response = HttpResponse(html)
     # Dispara os eventos para fechar o modal e avisar o frontend
@@ -435,12 +584,13 @@ def excluir_patrimonio(request, pk):
 # Fluxo:
 # 1) Recebe requisição POST via HTMX
 # 2) Remove o arquivo "registros.xlsx" do diretório MEDIA_ROOT
-# 3) Exclui todos os registros da tabela Patrimonio
+# 3) Exclui todos os registros da tabela Patrimonio, em blocos
+#    com DELETE direto (app/exclusao.py)
 # 4) Dispara evento HTMX "planilhaExcluida" para feedback
 #    visual e recarregamento da página
 # ==========================================================
 @login_required
-@user_passes_test(presidente_ou_superuser)
+@admin_required
 def excluir_planilha(request):
     # ------------------------------------------------------
     # Validação do método HTTP
@@ -449,20 +599,15 @@ def excluir_planilha(request):
         return HttpResponse(status=405)
 
     # ------------------------------------------------------
-    # Caminho absoluto da planilha
-    # ------------------------------------------------------
-    caminho_planilha = os.path.join(settings.MEDIA_ROOT, "registros.xlsx")
-
-    # ------------------------------------------------------
-    # Remoção do arquivo físico, se existir
+    # Remoção do arquivo físico, se existir, e do log de
+    # registros que o alimenta (sob a trava da compactação)
     # ------------------------------------------------------
-    if os.path.exists(caminho_planilha):
-        os.remove(caminho_planilha)
+    descartar_planilha()
 
     # ------------------------------------------------------
     # Exclusão de todos os registros de patrimônio no banco
     # ------------------------------------------------------
-    Patrimonio.objects.all().delete()
+    excluir_patrimonios()
 
     # ------------------------------------------------------
     # Retorno da resposta + disparo de evento HTMX
@@ -479,13 +624,22 @@ def excluir_planilha(request):
 # ----------------------------------------------------------
 # Exibe modal solicitando confirmação prévia antes de proceder
 # à remoção definitiva da planilha e dos registros vinculados.
+#
+# Lista também os últimos uploads que podem ser desfeitos,
+# como alternativa a excluir todos os registros.
 # ==========================================================
 @login_required
-@user_passes_test(presidente_ou_superuser)
+@admin_required
 def excluir_planilha_confirm(request):
+    importacoes = (
+        ImportacaoPlanilha.objects
+        .filter(status="concluida", modo__in=("inserir", "atualizar"), inseridos__gt=0)
+        .order_by("-pk")[:5]
+    )
     return render(
         request,
-        "app_inventario/partials/excluir_planilha_confirm.html"
+        "app_inventario/partials/excluir_planilha_confirm.html",
+        {"importacoes": importacoes}
     )
 
 
@@ -493,84 +647,46 @@ def excluir_planilha_confirm(request):
 # ==========================================================
 # REGISTRO EM PLANILHA
 # ----------------------------------------------------------
-# View responsável por inserir dados em uma planilha Excel,
-# associando explicitamente o registro ao inventariante
+# View responsável por registrar uma nova linha da planilha
+# Excel, associando explicitamente o registro ao inventariante
 # autenticado e criando também o registro no banco de dados.
 # Esta funcionalidade é restrita ao painel administrativo.
+#
+# A linha não é gravada diretamente em registros.xlsx: ela
+# entra no log RegistroPlanilha e a planilha é materializada
+# pela compactação (app/registros.py), em segundo plano.
 # ==========================================================
 @login_required
 def adicionar_na_planilha(request):
     """
-    Registra uma nova linha em planilha Excel, criando o arquivo
-    automaticamente caso ainda não exista no diretório media.
-    Além disso, insere o registro no banco de dados Patrimonio.
+    Registra uma nova linha no log da planilha Excel e insere
+    o registro correspondente no banco de dados Patrimonio.
     """
 
     #  Recupera usuário e inventariante vinculado
     usuario = request.user
     inventariante = get_object_or_404(Inventariante, user=usuario)
 
-    # Define caminho absoluto do arquivo Excel
-    caminho_planilha = os.path.join(
-        settings.MEDIA_ROOT,  # usar MEDIA_ROOT em vez de BASE_DIR
-        "registros.xlsx"
-    )
+    with transaction.atomic():
+        # Acréscimo no log (custo constante, sem abrir o arquivo)
+        registrar_linha(usuario, "Descrição do registro", 150.00)
 
-    # Verifica se a planilha já existe
-    if os.path.exists(caminho_planilha):
-        # Abre planilha existente
-        workbook = load_workbook(caminho_planilha)
-        sheet = workbook.active
-    else:
-        # Cria nova planilha
-        workbook = Workbook()
-        sheet = workbook.active
-        sheet.title = "Registros"
-
-        # Cabeçalho inicial
-        sheet.append([
-            "ID Usuário",
-            "Username",
-            "Nome Completo",
-            "Descrição",
-            "Valor"
-        ])
-
-    # Montagem da nova linha
-    nova_linha = [
-        usuario.id,
-        usuario.username,
-        usuario.get_full_name(),
-        "Descrição do registro",
-        150.00
-    ]
-
-    # Inserção e salvamento na planilha
-    sheet.append(nova_linha)
-    workbook.save(caminho_planilha)
-
-    # Inserção no banco de dados Patrimonio
-    # Gera número de patrimônio automaticamente:
-    # pega o último ID e soma 1
-    ultimo = Patrimonio.objects.order_by("-id").first()
-    if ultimo:
-        patrimonio_numero = ultimo.patrimonio + 1
-    else:
-        patrimonio_numero = 1
-
-    descricao = "Descrição do registro"
-    setor = "Setor padrão"
-    dependencia = "Dependência padrão"
-    situacao = "localizado"
-
-    Patrimonio.objects.create(
-        patrimonio=patrimonio_numero,
-        descricao=descricao,
-        setor=setor,
-        dependencia=dependencia,
-        situacao=situacao,
-        inventariante=inventariante
-    )
+        # Inserção no banco de dados Patrimonio
+        # Gera número de tombo automaticamente:
+        # pega o maior tombo e soma 1
+        ultimo_tombo = Patrimonio.objects.aggregate(maior=Max("tombo"))["maior"]
+
+        Patrimonio.objects.create(
+            tombo=(ultimo_tombo or 0) + 1,
+            descricao="Descrição do registro",
+            setor="Setor padrão",
+            dependencia="Dependência padrão",
+            situacao="localizado",
+            inventariante=inventariante
+        )
+
+    if registros_pendentes().count() >= settings.PLANILHA_COMPACTAR_A_CADA:
+        agendar_compactacao()
 
     # Retorno da resposta
     return HttpResponse("Registro salvo com sucesso")
@@ -578,32 +694,20 @@ def adicionar_na_planilha(request):
 # ==========================================================
 # REGISTRO DE PLANILHA (UPLOAD MANUAL)
 # ----------------------------------------------------------
-# View responsável exclusivamente pelo processamento 
+# View responsável exclusivamente pelo recebimento
 # da planilha oficial de registros do sistema.
 #
 # Funcionalidade restrita a usuários com perfil:
 # - Presidente
 # - Superusuário
 #
-# Após o processamento:
-# - Os dados são inseridos no banco de dados
-# - A tabela de patrimônios é renderizada e devolvida
-#   diretamente ao frontend via HTMX
+# O processamento não ocorre na requisição:
+# - O arquivo é salvo e uma ImportacaoPlanilha é criada
+# - A tarefa entra na fila do worker (app/tarefas.py)
+# - O modal passa a consultar o fragmento de progresso
 # ==========================================================
-import json
-import os
-from django.http import HttpResponse
-from django.shortcuts import get_object_or_404
-from django.template.loader import render_to_string
-from django.core.files.storage import FileSystemStorage
-from django.core.paginator import Paginator
-from django.contrib.auth.decorators import login_required, user_passes_test
-from openpyxl import load_workbook
-from .models import Inventariante, Patrimonio
-from .utils import presidente_ou_superuser  # supondo que você tenha esse helper
-
 @login_required
-@user_passes_test(presidente_ou_superuser)
+@admin_required
 def upload_planilha(request):
     if request.method != "POST":
         return HttpResponse(status=405)
@@ -612,20 +716,14 @@ def upload_planilha(request):
         return HttpResponse(status=400)
 
     planilha = request.FILES["planilha"]
+    if os.path.splitext(planilha.name)[1].lower() not in EXTENSOES_ACEITAS:
+        return HttpResponse("Formato de arquivo não suportado.", status=400)
 
-    # ------------------------------------------------------
-    # Garante diretório de mídia e salva arquivo enviado
-    # ------------------------------------------------------
-    os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
-    caminho_planilha = os.path.join(settings.MEDIA_ROOT, "registros.xlsx")
-    fs = FileSystemStorage(location=settings.MEDIA_ROOT)
-    fs.save("registros.xlsx", planilha)
-
-    # ------------------------------------------------------
-    # Abre planilha com openpyxl
-    # ------------------------------------------------------
-    workbook = load_workbook(caminho_planilha)
-    sheet = workbook.active
+    # Validado antes de salvar: uma requisição rejeitada não deixa
+    # arquivo órfão em MEDIA_ROOT
+    modo = request.POST.get("modo", "inserir")
+    if modo not in dict(ImportacaoPlanilha.MODO_CHOICES):
+        return HttpResponse(status=400)
 
     # ------------------------------------------------------
     # Recupera inventariante vinculado ao usuário logado
@@ -633,77 +731,169 @@ def upload_planilha(request):
     inventariante = get_object_or_404(Inventariante, user=request.user)
 
     # ------------------------------------------------------
-    # Itera linhas a partir da segunda (linha 1 em branco)
+    # Garante diretório de mídia e salva arquivo enviado
     # ------------------------------------------------------
-    for row in sheet.iter_rows(min_row=2, values_only=True):
-        if not any(row):  # ignora linhas totalmente vazias
-            continue
-
-        # 🔹 Leitura por índices fixos (colunas da planilha)
-        patrimonio_numero = row[0]   # Coluna A → Tombo
-        descricao = row[1]           # Coluna B → Descrição
-        valor = row[2]               # Coluna C → Valor
-        conta_contabil = row[3]      # Coluna D → Conta Contábil
-        setor = row[4]               # Coluna E → Setor
-        empenho = row[5]             # Coluna F → Empenho
-        fornecedor = row[6]          # Coluna G → Fornecedor
-        numero_documento = row[7]    # Coluna H → Nº Documento
-        data_documento = row[8]      # Coluna I → Data Documento
-        data_ateste = row[9]         # Coluna J → Data Ateste
-        dependencia = row[10]        # Coluna K → Dependência
-
-        print("Linha lida:", patrimonio_numero, descricao, valor, conta_contabil,
-              setor, empenho, fornecedor, numero_documento, data_documento,
-              data_ateste, dependencia)  # Debug
-
-        # --------------------------------------------------
-        # Valida número do patrimônio (tombo)
-        # --------------------------------------------------
-        try:
-            patrimonio_numero = int(patrimonio_numero)
-        except (TypeError, ValueError):
-            continue
-
-        # --------------------------------------------------
-        # Cria registro no banco vinculado ao inventariante
-        # --------------------------------------------------
-        Patrimonio.objects.create(
-            tombo=patrimonio_numero,
-            descricao=descricao or "",
-            valor=valor or None,
-            conta_contabil=conta_contabil or "",
-            setor=setor or "",
-            empenho=empenho or "",
-            fornecedor=fornecedor or "",
-            numero_documento=numero_documento or "",
-            data_documento=data_documento or None,
-            data_ateste=data_ateste or None,
-            dependencia=dependencia or "",
-            inventariante=inventariante,
-            situacao="localizado"  # default
-        )
+    os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+    fs = FileSystemStorage(location=settings.MEDIA_ROOT)
+    nome_salvo = fs.save(f"importacoes/{planilha.name}", planilha)
 
     # ------------------------------------------------------
-    # Após inserir os registros, renderiza a tabela atualizada
+    # Cria a tarefa e a envia para a fila de processamento
     # ------------------------------------------------------
-    patrimonios = Patrimonio.objects.all().order_by("id")
-    paginator = Paginator(patrimonios, 6)
-    lista_patrimonios = paginator.page(1)
-
-    context = {
-        "pagina": "patrimonio",
-        "lista_patrimonios": lista_patrimonios,
-        "search_query": "",
-        "is_admin": True,
-        "user": request.user,
+    importacao = ImportacaoPlanilha.objects.create(
+        inventariante=inventariante,
+        arquivo=nome_salvo,
+        nome_original=planilha.name,
+        modo=modo,
+    )
+    enfileirar_importacao(importacao)
+
+    # Clientes fora do HTMX recebem apenas o identificador da tarefa
+    if not request.headers.get("HX-Request"):
+        return JsonResponse({"id": importacao.pk, "status": importacao.status}, status=202)
+
+    return importacao_progresso(request, importacao.pk)
+
+
+# ==========================================================
+# PROGRESSO DA IMPORTAÇÃO
+# ----------------------------------------------------------
+# Fragmento leve consultado periodicamente pelo modal de upload.
+# Exibe linhas processadas, vazão (linhas/s) e erros.
+#
+# Ao término da tarefa, o fragmento deixa de se auto-atualizar
+# e dispara o evento HTMX "planilhaAtualizada" com o resumo.
+# ==========================================================
+@login_required
+@admin_required
+def importacao_progresso(request, pk):
+    importacao = get_object_or_404(ImportacaoPlanilha, pk=pk)
+
+    # Tarefa perdida num reinício do servidor: sai do estado de espera
+    if importacao.status in ("pendente", "processando") and marcar_interrompida(importacao.pk):
+        importacao.refresh_from_db()
+
+    # Contadores parciais (em memória) enquanto a tarefa processa
+    contadores = {
+        "linhas_processadas": importacao.linhas_processadas,
+        "inseridos": importacao.inseridos,
+        "atualizados": importacao.atualizados,
+        "inalterados": importacao.inalterados,
+        "ignorados": importacao.ignorados,
+        "rejeitados": importacao.rejeitados,
+        "somente_planilha": importacao.somente_planilha,
+        "somente_sistema": importacao.somente_sistema,
+        "divergentes": importacao.divergentes,
     }
+    if importacao.status == "processando":
+        contadores.update(progresso_parcial(importacao.pk))
+
+    # Vazão média desde o início do processamento
+    vazao = None
+    if importacao.data_inicio:
+        fim = importacao.data_conclusao or timezone.now()
+        segundos = (fim - importacao.data_inicio).total_seconds()
+        if segundos > 0:
+            vazao = round(contadores["linhas_processadas"] / segundos)
+
+    # Posição na fila para tarefas que ainda não começaram
+    posicao_fila = None
+    if importacao.status == "pendente":
+        posicao_fila = posicao_na_fila(importacao.pk)
 
-    html = render_to_string("app_inventario/partials/tabela_patrimonios.html", context, request=request)
+    html = render_to_string(
+        "app_inventario/partials/importacao_progresso.html",
+        {
+            "importacao": importacao,
+            "contadores": contadores,
+            "vazao": vazao,
+            "posicao_fila": posicao_fila,
+        },
+        request=request
+    )
     response = HttpResponse(html)
-    response["HX-Trigger"] = json.dumps({"planilhaAtualizada": True})
+
+    # Com relatório de erros ou nos modos sem gravação, o modal
+    # permanece aberto para que o usuário possa baixar o relatório.
+    if (
+        importacao.status == "concluida"
+        and importacao.modo not in ("validar", "conciliar")
+        and not importacao.relatorio_erros
+    ):
+        response["HX-Trigger"] = json.dumps({
+            "planilhaAtualizada": {
+                "inseridos": importacao.inseridos,
+                "atualizados": importacao.atualizados,
+                "inalterados": importacao.inalterados,
+                "ignorados": importacao.ignorados,
+                "rejeitados": importacao.rejeitados,
+            }
+        })
     return response
 
 
+# ==========================================================
+# DESFAZER IMPORTAÇÃO
+# ----------------------------------------------------------
+# Exclui os patrimônios inseridos por um upload concluído
+# (modos inserir e atualizar), pelo lote gravado em cada
+# registro. Responde com o progresso atualizado da importação.
+# ==========================================================
+@login_required
+@admin_required
+def desfazer_importacao(request, pk):
+    if request.method != "POST":
+        return HttpResponse(status=405)
+
+    importacao = get_object_or_404(ImportacaoPlanilha, pk=pk)
+    if not importacao.pode_desfazer:
+        return HttpResponse(status=409)
+
+    excluir_importacao(importacao)
+    return importacao_progresso(request, importacao.pk)
+
+
+# ==========================================================
+# RELATÓRIO DE ERROS DA IMPORTAÇÃO
+# ----------------------------------------------------------
+# Download do CSV com os erros encontrados por linha.
+# ==========================================================
+@login_required
+@admin_required
+def importacao_relatorio(request, pk):
+    importacao = get_object_or_404(ImportacaoPlanilha, pk=pk)
+    if not importacao.relatorio_erros:
+        raise Http404("Importação sem relatório de erros.")
+
+    return FileResponse(
+        open(os.path.join(settings.MEDIA_ROOT, importacao.relatorio_erros), "rb"),
+        as_attachment=True,
+        filename=f"importacao_{importacao.pk}_erros.csv",
+        content_type="text/csv",
+    )
+
+
+# ==========================================================
+# DIFERENÇAS DA CONCILIAÇÃO
+# ----------------------------------------------------------
+# Download do CSV gerado no modo "conciliar": tombos somente
+# na planilha, somente no sistema e com setor/valor divergentes.
+# ==========================================================
+@login_required
+@admin_required
+def importacao_conciliacao(request, pk):
+    importacao = get_object_or_404(ImportacaoPlanilha, pk=pk)
+    if not importacao.relatorio_conciliacao:
+        raise Http404("Importação sem conciliação.")
+
+    return FileResponse(
+        open(os.path.join(settings.MEDIA_ROOT, importacao.relatorio_conciliacao), "rb"),
+        as_attachment=True,
+        filename=f"conciliacao_{importacao.pk}.csv",
+        content_type="text/csv",
+    )
+
+
 # ==========================================================
 # ATUALIZAÇÃO RÁPIDA DE SITUAÇÃO DE PATRIMÔNIO
 # ----------------------------------------------------------
@@ -741,8 +931,91 @@ def patrimonio_update_situacao(request, pk):
         {"p": patrimonio}
     )
 
+
+# ==========================================================
+# CONFERÊNCIA POR LEITOR (CHECK-IN)
+# ----------------------------------------------------------
+# GET: tela de leitura. As leituras do leitor de código de
+# barras são acumuladas no navegador (static/app/js/checkin.js)
+# e enviadas em lotes.
+#
+# POST: recebe um lote em "tombos" (até LOTE_MAXIMO leituras)
+# e devolve o resumo do lote, acrescentado ao histórico da
+# tela. O escopo é o mesmo da listagem (ver app/checkin.py).
+# ==========================================================
 @login_required
-@user_passes_test(presidente_ou_superuser)
+def patrimonio_checkin(request):
+    papel = request.papel
+    if not papel.is_admin and papel.inventariante_id is None:
+        raise Http404
+
+    if request.method != "POST":
+        return render(request, "app_inventario/partials/checkin.html", {"lote_maximo": LOTE_MAXIMO})
+
+    leituras = separar_leituras(request.POST.get("tombos"))
+    if len(leituras) > LOTE_MAXIMO:
+        return HttpResponse(f"Envie no máximo {LOTE_MAXIMO} leituras por lote.", status=400)
+
+    resultado = conferir_tombos(leituras, None if papel.is_admin else papel.inventariante_id)
+    return render(
+        request,
+        "app_inventario/partials/checkin_resultado.html",
+        {"resultado": resultado, "horario": timezone.localtime()},
+    )
+
+
+# ==========================================================
+# ATUALIZAÇÃO DE SITUAÇÃO EM LOTE
+# ----------------------------------------------------------
+# Define a situação (e, opcionalmente, a data do inventário)
+# de vários patrimônios num único UPDATE:
+# - alvo=selecionados: ids marcados na tabela ("ids")
+# - alvo=filtro: todos os resultados da busca atual ("q")
+#
+# O escopo é o mesmo da listagem: o inventariante comum só
+# altera os próprios bens. Devolve a tabela re-renderizada
+# (primeira página da busca) com a quantidade alterada.
+# ==========================================================
+@login_required
+def patrimonio_situacao_lote(request):
+    if request.method != "POST":
+        return HttpResponse(status=405)
+
+    situacao = request.POST.get("situacao")
+    if situacao not in dict(Patrimonio.STATUS_CHOICES):
+        return HttpResponse("Situação inválida.", status=400)
+
+    search_query = request.POST.get("q", "")
+    patrimonios, is_admin = filtrar_patrimonios(request, search_query)
+
+    alvo = request.POST.get("alvo", "selecionados")
+    if alvo == "selecionados":
+        ids = [valor for valor in request.POST.getlist("ids") if valor.isdigit()]
+        if not ids:
+            return HttpResponse("Nenhum patrimônio selecionado.", status=400)
+        selecionados = patrimonios.filter(pk__in=ids)
+    elif alvo == "filtro":
+        selecionados = patrimonios
+    else:
+        return HttpResponse(status=400)
+
+    campos = {"situacao": situacao}
+    if request.POST.get("registrar_data"):
+        campos["data_inventario"] = timezone.localdate()
+    else:
+        # Sem data a gravar, linhas já na situação não são reescritas
+        selecionados = selecionados.exclude(situacao=situacao)
+
+    # Por pk: o UPDATE não leva a junção com o índice da busca
+    alterados = Patrimonio.objects.filter(pk__in=selecionados.values("pk")).update(**campos)
+
+    mensagem = f"{alterados} patrimônio{'s' if alterados != 1 else ''} atualizado{'s' if alterados != 1 else ''}."
+    return HttpResponse(
+        renderizar_tabela_patrimonios(request, patrimonios, search_query, is_admin, mensagem)
+    )
+
+@login_required
+@admin_required
 def upload_planilha_modal(request):
     """
     Retorna o template que contém o formulário do modal.